@@ -1,50 +1,77 @@
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_security import Security, SQLAlchemyUserDatastore
 from flask_restful import Api
+from flask_migrate import Migrate
 from backend.config import Config
+from backend.database import init_engines, route_reads_to_replica
+from backend.assets import (
+    build_assets_command,
+    init_assets,
+    render_index,
+    serve_static,
+)
+from backend.metrics import init_metrics, instrument_api
+from backend.compression import init_compression
+from backend.serialization import init_json
 from backend.extensions import cache  # Import cache from extensions
 from backend.models import db, User, Role
 from backend.create_initial_data import create_initial_data
 from backend.routes import auth_bp, main_bp, init_jwt
+from backend.query_plans import check_query_plans_command
+from backend.ratings import backfill_ratings_command
 from backend.resources import (
     UserResource,
     ServiceResource,
     RequestServiceResource,
     RateServiceResource,
+    LeaderboardResource,
     ServiceRequestResource,
+    ServiceRequestFeedResource,
     AdminServiceRequestsResource,
+    AdminAnalyticsResource,
     UserProfileResource,
     ExportCSVResource,
+    ExportStatusStreamResource,
+    ImportResource,
+    DocumentResource,
     DownloadCSVResource,
 )
 
-app = Flask(
-    __name__, static_folder="frontend/static", template_folder="frontend/templates"
-)
+# /static is served by backend.assets (fingerprinted build, then the sources)
+app = Flask(__name__, static_folder=None, template_folder="frontend/templates")
 app.config.from_object(Config)
 
 # Initialize caching
-cache.init_app(
-    app, config={"CACHE_TYPE": "redis", "CACHE_REDIS_URL": "redis://localhost:6379/0"}
-)
+cache.init_app(app)
 
 # Initialize extensions
 db.init_app(app)
+init_engines(app, db)
+init_metrics(app, db)  # SQL timing, Server-Timing header and /metrics
+init_compression(app)  # runs before the metrics hook, so it is timed
+if app.config["SQLALCHEMY_READ_DATABASE_URI"]:
+    app.before_request(route_reads_to_replica)
+migrate = Migrate(app, db, directory="migrations", render_as_batch=True)
 user_datastore = SQLAlchemyUserDatastore(db, User, Role)
 security = Security(app, user_datastore)
 
 # Initialize JWT
 jwt = init_jwt(app)
 
+# CLI: flask --app app check-query-plans
+app.cli.add_command(check_query_plans_command)
+# CLI: flask --app app backfill-ratings
+app.cli.add_command(backfill_ratings_command)
+# CLI: flask --app app build-assets
+app.cli.add_command(build_assets_command)
+
 # Register Blueprints
 app.register_blueprint(auth_bp, url_prefix="/auth")
 app.register_blueprint(main_bp)
 
 
-# Serve static files
-@app.route("/static/<path:filename>")
-def serve_static(filename):
-    return send_from_directory("frontend/static", filename)
+# Serve static files: fingerprinted, precompressed and long-cached once built
+init_assets(app)
 
 
 # Serve vue files
@@ -52,12 +79,14 @@ def serve_static(filename):
 @app.route("/<path:path>")
 def serve_vue(path):
     if path and ("static/" in path or "js/" in path or "css/" in path):
-        return send_from_directory("frontend/static", path)
-    return send_from_directory("frontend/templates", "index.html")
+        return serve_static(path)
+    return render_index()
 
 
 # Api registrations
 api = Api(app)
+init_json(app, api)
+instrument_api(api)
 api.add_resource(
     UserResource,
     "/api/users",
@@ -80,22 +109,33 @@ api.add_resource(
     RateServiceResource,
     "/api/request-service/<int:request_id>/rate",
 )
+api.add_resource(LeaderboardResource, "/api/services/<int:service_id>/leaderboard")
 api.add_resource(
     ServiceRequestResource,
     "/api/service-requests",
     "/api/service-requests/<int:request_id>/accept",
 )
+api.add_resource(ServiceRequestFeedResource, "/api/service-requests/stream")
 api.add_resource(AdminServiceRequestsResource, "/api/admin/service-requests")
+api.add_resource(AdminAnalyticsResource, "/api/admin/analytics")
 api.add_resource(UserProfileResource, "/api/user-profile")
 api.add_resource(
     ExportCSVResource, "/admin/api/export-csv", "/admin/api/export-csv/<string:task_id>"
 )
+api.add_resource(
+    ExportStatusStreamResource, "/admin/api/export-csv/<string:task_id>/stream"
+)
+api.add_resource(
+    ImportResource,
+    "/admin/api/import/<string:kind>",
+    "/admin/api/import/tasks/<string:task_id>",
+)
+api.add_resource(DocumentResource, "/api/documents/<string:document_id>")
 api.add_resource(DownloadCSVResource, "/download/<filename>")
 
 
 # main app
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
         create_initial_data(app)
     app.run(debug=True)
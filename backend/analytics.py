@@ -0,0 +1,228 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+from flask import current_app
+from sqlalchemy import Date, case, delete, event, func, select
+from backend.catalog_cache import services_catalog
+from backend.database import RoutingSession
+from backend.models import (
+    db,
+    RequestDailyRollup,
+    RequestTotalRollup,
+    RollupDirtyDay,
+    RollupState,
+    Service,
+    ServiceRequest,
+)
+
+ROLLUP = "service_requests"
+BUCKET = ("service_id", "status")
+
+
+def _day(column):
+    return func.date(column, type_=Date)
+
+
+def _daily_buckets(*criteria):
+    """SELECT of (day, service_id, status, count, revenue) over service requests"""
+    status = func.coalesce(ServiceRequest.status, "Pending")
+    return (
+        select(
+            _day(ServiceRequest.created_at),
+            ServiceRequest.service_id,
+            status,
+            func.count(ServiceRequest.id),
+            func.coalesce(
+                func.sum(case((status == "Completed", Service.price), else_=0)), 0
+            ),
+        )
+        .outerjoin(Service, Service.id == ServiceRequest.service_id)
+        .where(*criteria)
+        .group_by(_day(ServiceRequest.created_at), ServiceRequest.service_id, status)
+    )
+
+
+def _rebuild():
+    """Recompute both rollups from scratch"""
+    db.session.execute(delete(RequestDailyRollup))
+    db.session.execute(delete(RequestTotalRollup))
+    db.session.execute(delete(RollupDirtyDay))
+    db.session.execute(
+        RequestDailyRollup.__table__.insert().from_select(
+            ["day", *BUCKET, "request_count", "revenue"], _daily_buckets()
+        )
+    )
+    daily = RequestDailyRollup.__table__.c
+    db.session.execute(
+        RequestTotalRollup.__table__.insert().from_select(
+            [*BUCKET, "request_count", "revenue"],
+            select(
+                daily.service_id,
+                daily.status,
+                func.sum(daily.request_count),
+                func.sum(daily.revenue),
+            ).group_by(daily.service_id, daily.status),
+        )
+    )
+
+
+def _refresh_day(day, counts, revenue):
+    """Recompute the buckets of `day`, adding the changes to `counts`/`revenue`"""
+    start = datetime.combine(day, time.min)
+    for bucket in RequestDailyRollup.query.filter_by(day=day):
+        counts[bucket.service_id, bucket.status] -= bucket.request_count
+        revenue[bucket.service_id, bucket.status] -= bucket.revenue
+    db.session.execute(delete(RequestDailyRollup).where(RequestDailyRollup.day == day))
+
+    rows = db.session.execute(
+        _daily_buckets(
+            ServiceRequest.created_at >= start,
+            ServiceRequest.created_at < start + timedelta(days=1),
+        )
+    ).all()
+    for _, service_id, status, request_count, bucket_revenue in rows:
+        counts[service_id, status] += request_count
+        revenue[service_id, status] += bucket_revenue
+    if rows:
+        db.session.execute(
+            RequestDailyRollup.__table__.insert(),
+            [
+                dict(zip(["day", *BUCKET, "request_count", "revenue"], row))
+                for row in rows
+            ],
+        )
+
+
+def _apply_to_totals(counts, revenue):
+    for service_id, status in counts.keys() | revenue.keys():
+        total = db.session.get(RequestTotalRollup, (service_id, status))
+        if total is None:
+            total = RequestTotalRollup(
+                service_id=service_id, status=status, request_count=0, revenue=0.0
+            )
+            db.session.add(total)
+        total.request_count += counts[service_id, status]
+        total.revenue += revenue[service_id, status]
+        if total.request_count <= 0:
+            db.session.delete(total)
+
+
+def refresh_rollups():
+    """Bring the request rollups up to date, in one transaction.
+
+    Only the days of requests inserted or updated since the high-water
+    mark, or deleted since the last run, are recomputed; the all-time
+    totals are adjusted by the difference. The first run rebuilds both.
+    Returns the number of days recomputed (None after a rebuild).
+    """
+    state = db.session.get(RollupState, ROLLUP) or RollupState(name=ROLLUP)
+    cutoff = datetime.utcnow() - timedelta(
+        seconds=current_app.config["ANALYTICS_ROLLUP_LAG"]
+    )
+
+    if state.high_water_mark is None:
+        _rebuild()
+        days = None
+    else:
+        days = set(
+            db.session.scalars(
+                select(_day(ServiceRequest.created_at))
+                .where(
+                    ServiceRequest.updated_at > state.high_water_mark,
+                    ServiceRequest.updated_at <= cutoff,
+                )
+                .distinct()
+            )
+        )
+        deleted = db.session.execute(
+            select(RollupDirtyDay.id, RollupDirtyDay.day)
+        ).all()
+        days.update(day for _, day in deleted)
+
+        counts, revenue = Counter(), Counter()
+        for day in sorted(days):
+            _refresh_day(day, counts, revenue)
+        _apply_to_totals(counts, revenue)
+        if deleted:
+            db.session.execute(
+                delete(RollupDirtyDay).where(
+                    RollupDirtyDay.id.in_([dirty_id for dirty_id, _ in deleted])
+                )
+            )
+
+    state.high_water_mark = cutoff
+    db.session.add(state)
+    db.session.commit()
+    return None if days is None else len(days)
+
+
+def mark_deleted(session, requests):
+    """Note the days of deleted `requests` for the next refresh.
+
+    Deleted rows leave no updated_at behind. ORM deletes are noted by the
+    after_flush hook below; bulk DELETE statements must call this.
+    """
+    days = {request.created_at.date() for request in requests if request.created_at}
+    if days:
+        session.execute(
+            RollupDirtyDay.__table__.insert(), [{"day": day} for day in days]
+        )
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_deleted_requests(session, flush_context):
+    """Deleted rows leave no updated_at behind, so note their days instead"""
+    mark_deleted(
+        session, [obj for obj in session.deleted if isinstance(obj, ServiceRequest)]
+    )
+
+
+def summary(days):
+    """Dashboard figures from the rollups.
+
+    Totals read the all-time rollup, whose size depends on the catalog
+    (services x statuses), not on history; the daily series reads `days`
+    rows per service and status through the rollup's primary key.
+    """
+    by_status, by_service = Counter(), {}
+    revenue = 0.0
+    for total in RequestTotalRollup.query:
+        by_status[total.status] += total.request_count
+        service = by_service.setdefault(
+            total.service_id, {"requests": 0, "revenue": 0.0}
+        )
+        service["requests"] += total.request_count
+        service["revenue"] = round(service["revenue"] + total.revenue, 2)
+        revenue += total.revenue
+
+    first_day = datetime.utcnow().date() - timedelta(days=days - 1)
+    series = (
+        db.session.query(
+            RequestDailyRollup.day,
+            func.sum(RequestDailyRollup.request_count),
+            func.sum(RequestDailyRollup.revenue),
+        )
+        .filter(RequestDailyRollup.day >= first_day)
+        .group_by(RequestDailyRollup.day)
+        .order_by(RequestDailyRollup.day)
+    )
+    state = db.session.get(RollupState, ROLLUP)
+    names = {service["id"]: service["name"] for service in services_catalog.get()}
+
+    return {
+        "requests": sum(by_status.values()),
+        "revenue": round(revenue, 2),
+        "by_status": dict(by_status),
+        "by_service": [
+            {"id": service_id, "name": names.get(service_id), **figures}
+            for service_id, figures in sorted(by_service.items())
+        ],
+        "by_day": [
+            {"day": day.isoformat(), "requests": requests, "revenue": round(total, 2)}
+            for day, requests, total in series
+        ],
+        "updated_through": (
+            state.high_water_mark.isoformat()
+            if state and state.high_water_mark
+            else None
+        ),
+    }
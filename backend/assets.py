@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import click
+from flask import (
+    current_app,
+    make_response,
+    render_template,
+    request,
+    send_file,
+    session,
+)
+from flask.cli import with_appcontext
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional: .gz variants only
+    brotli = None
+
+MANIFEST = "manifest.json"
+SKIPPED_DIRS = {"uploads"}  # user content, never fingerprinted
+COMPRESSIBLE = {".js", ".css", ".html", ".svg", ".json", ".ico", ".txt", ".map"}
+# Variants tried in order when the client accepts them: (encoding, suffix)
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def fingerprint(path, digest):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:12]}{ext}"
+
+
+def _write_variants(path):
+    """Write .gz (and .br) next to `path` when they are actually smaller"""
+    with open(path, "rb") as f:
+        body = f.read()
+    variants = [(".gz", gzip.compress(body, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", brotli.compress(body, quality=11)))
+    for suffix, compressed in variants:
+        if len(compressed) < len(body) * 0.9:
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+
+
+def build_assets(source, target):
+    """Copy every file of `source` to `target` under a content-hashed name,
+    with precompressed variants, and write the manifest mapping the two.
+
+    Returns the manifest.
+    """
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    manifest = {}
+    for folder, dirs, files in os.walk(source):
+        if folder == source:
+            dirs[:] = [name for name in dirs if name not in SKIPPED_DIRS]
+        for name in sorted(files):
+            path = os.path.join(folder, name)
+            logical = os.path.relpath(path, source).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            hashed = fingerprint(logical, digest)
+
+            built = os.path.join(target, hashed)
+            os.makedirs(os.path.dirname(built), exist_ok=True)
+            shutil.copyfile(path, built)
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                _write_variants(built)
+            manifest[logical] = hashed
+
+    with open(os.path.join(target, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(app):
+    path = os.path.join(app.root_path, app.config["STATIC_BUILD_FOLDER"], MANIFEST)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:  # not built: serve the source files as they are
+        return {}
+
+
+def asset_url(path):
+    """URL of a static file, fingerprinted when the assets have been built"""
+    manifest = current_app.extensions["assets"]
+    return "/static/" + manifest.get(path, path)
+
+
+def render_index():
+    """The single-page app shell, revalidated on every load since the asset
+    URLs in it change with each build"""
+    response = make_response(render_template("index.html"))
+    response.cache_control.no_cache = True
+    return response
+
+
+def _offload(path, mimetype):
+    """Empty response telling the front proxy to send `path` itself"""
+    response = current_app.response_class(mimetype=mimetype)
+    if current_app.config["STATIC_SENDFILE"] == "x-accel-redirect":
+        internal = os.path.relpath(path, current_app.root_path).replace(os.sep, "/")
+        response.headers["X-Accel-Redirect"] = (
+            current_app.config["STATIC_ACCEL_PREFIX"] + internal
+        )
+    else:
+        response.headers["X-Sendfile"] = path
+    return response
+
+
+def _send(path, mimetype, encoding=None):
+    if current_app.config["STATIC_SENDFILE"]:
+        response = _offload(path, mimetype)
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def serve_static(filename):
+    """Fingerprinted build output is cached for a year, precompressed when
+    the client allows; anything else is revalidated on every use."""
+    # The identity loader reads the session on every request, which would
+    # add Vary: Cookie; no asset depends on it, so caches may share them
+    session.accessed = False
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    build = os.path.join(
+        current_app.root_path, current_app.config["STATIC_BUILD_FOLDER"]
+    )
+    built = safe_join(build, filename)
+    if built and filename != MANIFEST and os.path.isfile(built):
+        response = None
+        for encoding, suffix in PRECOMPRESSED:
+            if request.accept_encodings[encoding] and os.path.isfile(built + suffix):
+                response = _send(built + suffix, mimetype, encoding)
+                break
+        response = response or _send(built, mimetype)
+        response.vary.add("Accept-Encoding")
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+    source = safe_join(
+        os.path.join(current_app.root_path, current_app.config["STATIC_SOURCE_FOLDER"]),
+        filename,
+    )
+    if not source or not os.path.isfile(source):
+        raise NotFound()
+    response = _send(source, mimetype)
+    response.cache_control.no_cache = True
+    return response
+
+
+@click.command("build-assets")
+@with_appcontext
+def build_assets_command():
+    """Fingerprint and precompress the static files into STATIC_BUILD_FOLDER."""
+    target = os.path.join(
+        current_app.root_path, current_app.config["STATIC_BUILD_FOLDER"]
+    )
+    source = os.path.join(
+        current_app.root_path, current_app.config["STATIC_SOURCE_FOLDER"]
+    )
+    manifest = build_assets(source, target)
+    current_app.extensions["assets"] = manifest
+    click.echo(f"Built {len(manifest)} assets into {target}")
+
+
+def init_assets(app):
+    """Serve /static from the built assets and expose asset_url to templates"""
+    app.extensions["assets"] = load_manifest(app)
+    app.add_url_rule("/static/<path:filename>", "static", serve_static)
+    app.jinja_env.globals["asset_url"] = asset_url
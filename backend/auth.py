@@ -0,0 +1,55 @@
+from functools import wraps
+from flask_jwt_extended import current_user, get_jwt, verify_jwt_in_request
+from werkzeug.local import LocalProxy
+from backend.models import db, User
+
+
+class _RequestUser:
+    """Loads the token's user on first use and keeps it for the request"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.loaded = False
+        self.user = None
+
+    def __call__(self):
+        if not self.loaded:
+            self.user = db.session.get(User, int(self.user_id))
+            self.loaded = True
+        return self.user
+
+
+def load_request_user(jwt_header, jwt_data):
+    """user_lookup_loader: a lazy proxy, so routes that only need the role
+    claim never query the user table"""
+    return LocalProxy(_RequestUser(jwt_data["sub"]))
+
+
+def current_role():
+    """Role of the logged-in user, read from the token claims.
+
+    Tokens issued before the role claim existed fall back to the database.
+    """
+    role = get_jwt().get("role")
+    if role is None and current_user:
+        role = current_user.role.name
+    return role
+
+
+def role_required(*roles, error="Unauthorized", locations=None):
+    """Require a valid JWT whose role is one of `roles`.
+
+    `locations` overrides where the token is read from (JWT_TOKEN_LOCATION).
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request(locations=locations)
+            if current_role() not in roles:
+                return {"error": error}, 403
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
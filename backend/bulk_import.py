@@ -0,0 +1,202 @@
+import csv
+import json
+import re
+from itertools import islice
+from uuid import uuid4
+from sqlalchemy import func
+from backend.catalog_cache import services_catalog, users_catalog
+from backend.models import db, Role, Service, User
+from backend.passwords import hash_passwords
+
+IMPORT_CHUNK_SIZE = 1000  # records validated and inserted per round trip
+MAX_REPORTED_ERRORS = 100  # rejected records listed in the task result
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def read_records(path):
+    """Yield (line number, record dict) from a CSV or JSONL file, one at a time"""
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield line_number, record
+    else:
+        with open(path, encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+
+
+def _text(record, field, required=True, max_length=None):
+    value = record.get(field)
+    value = str(value).strip() if value is not None else ""
+    if required and not value:
+        raise InvalidRecord(f"{field} is required")
+    if max_length and len(value) > max_length:
+        raise InvalidRecord(f"{field} is longer than {max_length} characters")
+    return value or None
+
+
+class ServiceImporter:
+    name = "services"
+    catalog = services_catalog
+
+    def validate(self, record):
+        try:
+            price = float(record.get("price"))
+        except (TypeError, ValueError):
+            raise InvalidRecord("price must be a number")
+        if price < 0:
+            raise InvalidRecord("price must not be negative")
+        available = record.get("available")
+        if available is None or str(available).strip() == "":
+            available = True  # column left out or cell left blank
+        elif isinstance(available, str):
+            available = available.strip().lower() in TRUE_VALUES
+        return {
+            "name": _text(record, "name", max_length=100),
+            "description": _text(record, "description", required=False),
+            "price": price,
+            "available": bool(available),
+        }
+
+    def prepare(self, rows, errors):
+        return rows
+
+    def insert(self, rows):
+        db.session.execute(Service.__table__.insert(), rows)
+
+
+class ProfessionalImporter:
+    name = "professionals"
+    catalog = users_catalog
+
+    def __init__(self):
+        self.role_id = Role.query.filter_by(name="professional").one().id
+        services = db.session.query(Service.id, Service.name).all()
+        self.service_ids = {service_id for service_id, _ in services}
+        self.service_names = {name.lower(): service_id for service_id, name in services}
+        self.seen_emails = set()
+        self.seen_usernames = set()
+
+    def validate(self, record):
+        email = _text(record, "email", max_length=120).lower()
+        if not EMAIL_PATTERN.match(email):
+            raise InvalidRecord("email is not valid")
+        username = _text(record, "username", max_length=100)
+        if email in self.seen_emails or username in self.seen_usernames:
+            raise InvalidRecord("duplicate email or username in the file")
+        row = {
+            "username": username,
+            "email": email,
+            "password": _text(record, "password"),
+            "contact_number": _text(
+                record, "contact_number", required=False, max_length=15
+            ),
+            "service_id": self._service_id(record),
+        }
+        self.seen_emails.add(email)
+        self.seen_usernames.add(username)
+        return row
+
+    def _service_id(self, record):
+        service = record.get("service_id") or record.get("service")
+        if service is None or str(service).strip() == "":
+            raise InvalidRecord("service_id or service is required")
+        service = str(service).strip()
+        if service.isdigit() and int(service) in self.service_ids:
+            return int(service)
+        if service.lower() in self.service_names:
+            return self.service_names[service.lower()]
+        raise InvalidRecord(f"unknown service {service!r}")
+
+    def prepare(self, rows, errors):
+        """Drop users that already exist, then hash the passwords in parallel"""
+        emails = [row["email"] for _, row in rows]
+        usernames = [row["username"] for _, row in rows]
+        taken = set()
+        for email, username in db.session.query(User.email, User.username).filter(
+            func.lower(User.email).in_(emails) | User.username.in_(usernames)
+        ):
+            taken.update((email.lower(), username))
+
+        fresh = []
+        for line_number, row in rows:
+            if row["email"] in taken or row["username"] in taken:
+                errors.append((line_number, "email or username already registered"))
+            else:
+                fresh.append((line_number, row))
+
+        hashes = hash_passwords([row["password"] for _, row in fresh])
+        for (_, row), password_hash in zip(fresh, hashes):
+            row.update(
+                password=password_hash,
+                role_id=self.role_id,
+                flagged=False,
+                fs_uniquifier=uuid4().hex,
+            )
+        return fresh
+
+    def insert(self, rows):
+        db.session.execute(User.__table__.insert(), rows)
+
+
+IMPORTERS = {
+    importer.name: importer for importer in (ServiceImporter, ProfessionalImporter)
+}
+
+
+def import_records(kind, path, progress=None):
+    """Validate and insert the records of `path` in chunks.
+
+    Each chunk is checked, prepared and written with one executemany and
+    one commit; rejected records are collected rather than failing the
+    import. The cached catalog is invalidated once, at the end.
+    """
+    importer = IMPORTERS[kind]()
+    records = read_records(path)
+    inserted, errors = 0, []
+
+    while chunk := list(islice(records, IMPORT_CHUNK_SIZE)):
+        rows = []
+        for line_number, record in chunk:
+            try:
+                if not isinstance(record, dict):
+                    raise InvalidRecord("not a JSON object")
+                rows.append((line_number, importer.validate(record)))
+            except InvalidRecord as e:
+                errors.append((line_number, str(e)))
+
+        rows = importer.prepare(rows, errors)
+        if rows:
+            importer.insert([row for _, row in rows])
+            db.session.commit()
+        inserted += len(rows)
+
+        if progress:
+            progress(inserted, len(errors))
+
+    if inserted:
+        importer.catalog.invalidate()
+
+    errors.sort()
+    return {
+        "kind": kind,
+        "inserted": inserted,
+        "rejected": len(errors),
+        "errors": [
+            {"line": line_number, "error": error}
+            for line_number, error in errors[:MAX_REPORTED_ERRORS]
+        ],
+    }
@@ -0,0 +1,177 @@
+import time
+from threading import Lock
+from sqlalchemy import Float, cast, func, select
+from backend.database import read_from_primary
+from backend.extensions import cache
+from backend.etags import bump_version, data_version
+from backend.metrics import record_cache, timed
+from backend.models import db, Document, ProfessionalRating, Role, Service, User
+
+
+class CatalogCache:
+    """Generation-versioned, two-tier cache for a catalog listing.
+
+    Entries live in Redis under "<name>:v<generation>". Invalidating bumps
+    the generation with an atomic INCR instead of deleting the key, so a
+    rebuild that raced with a write can only ever fill an outdated key.
+    A small in-process tier keeps hot entries for `local_ttl` seconds,
+    and a Redis lock lets a single worker rebuild a missing entry while
+    the others wait for its result. Rebuilds read from the primary: a
+    lagging replica would fill the new generation with the old data.
+    """
+
+    LOCK_TIMEOUT = 30  # seconds a rebuild may hold the lock
+    WAIT_STEP = 0.05  # seconds between polls while another worker rebuilds
+    WAIT_ATTEMPTS = 40
+
+    def __init__(self, name, build, timeout, local_ttl=5):
+        self.name = name
+        self.build = build
+        self.timeout = timeout
+        self.local_ttl = local_ttl
+        self._local = {}  # versioned key -> (expires_at, value)
+        self._local_lock = Lock()
+
+    def generation(self):
+        return data_version(self.name)
+
+    def key(self, generation):
+        return f"{self.name}:v{generation}"
+
+    def get(self):
+        with timed("cache"):
+            key = self.key(self.generation())
+
+            value = self._local_get(key)
+            if value is not None:
+                record_cache(self.name, "local")
+                return value
+
+            value = cache.get(key)
+        if value is not None:
+            record_cache(self.name, "redis")
+        else:
+            record_cache(self.name, "miss")
+            value = self._rebuild(key)
+
+        self._local_set(key, value)
+        return value
+
+    def invalidate(self):
+        """Move readers to a new generation; old entries expire on their own"""
+        bump_version(self.name)
+
+    def _rebuild(self, key):
+        lock_key = f"{key}:lock"
+        if cache.add(lock_key, True, timeout=self.LOCK_TIMEOUT):
+            try:
+                value = self._build()
+                cache.set(key, value, timeout=self.timeout)
+            finally:
+                cache.delete(lock_key)
+            return value
+
+        # Another worker is rebuilding this generation: wait for its result
+        for _ in range(self.WAIT_ATTEMPTS):
+            time.sleep(self.WAIT_STEP)
+            value = cache.get(key)
+            if value is not None:
+                return value
+
+        return self._build()  # the rebuild is taking too long, don't fail
+
+    def _build(self):
+        with read_from_primary():
+            return self.build()
+
+    def _local_get(self, key):
+        with self._local_lock:
+            entry = self._local.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _local_set(self, key, value):
+        now = time.monotonic()
+        with self._local_lock:
+            self._local = {k: v for k, v in self._local.items() if v[0] > now}
+            self._local[key] = (now + self.local_ttl, value)
+
+
+def build_users():
+    """All users with their role, offered service and average rating, in one
+    joined query"""
+    ratings = (
+        select(
+            ProfessionalRating.professional_id,
+            (
+                cast(func.sum(ProfessionalRating.rating_sum), Float)
+                / func.sum(ProfessionalRating.rating_count)
+            ).label("average"),
+        )
+        .where(ProfessionalRating.rating_count > 0)
+        .group_by(ProfessionalRating.professional_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(
+            User.id,
+            User.username,
+            User.email,
+            User.flagged,
+            User.document_path,
+            User.document_id,
+            Document.status,
+            Role.name,
+            Service.name,
+            ratings.c.average,
+        )
+        .join(Role, User.role_id == Role.id)
+        .outerjoin(Service, User.service_id == Service.id)
+        .outerjoin(Document, User.document_id == Document.sha256)
+        .outerjoin(ratings, ratings.c.professional_id == User.id)
+        .all()
+    )
+    return [
+        {
+            "id": user_id,
+            "username": username,
+            "email": email,
+            "role": role,
+            "flagged": flagged,
+            "document_path": document_path if role == "professional" else None,
+            "document_id": document_id if role == "professional" else None,
+            "document_status": document_status if role == "professional" else None,
+            "service_offered": service_name if role == "professional" else None,
+            "average_rating": round(average, 2) if average is not None else None,
+        }
+        for (
+            user_id,
+            username,
+            email,
+            flagged,
+            document_path,
+            document_id,
+            document_status,
+            role,
+            service_name,
+            average,
+        ) in rows
+    ]
+
+
+def build_services():
+    return [
+        {
+            "id": service.id,
+            "name": service.name,
+            "description": service.description,
+            "price": service.price,
+            "available": service.available,
+        }
+        for service in Service.query.all()
+    ]
+
+
+users_catalog = CatalogCache("all_users", build_users, timeout=300)
+services_catalog = CatalogCache("all_services", build_services, timeout=600)
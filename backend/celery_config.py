@@ -30,6 +30,22 @@ def make_celery(app):
                 minute="*/2", day_of_month=28
             ),  # Runs every 2 minutes on 28th of month
         },
+        "prune-revoked-tokens-hourly": {
+            "task": "backend.tasks.prune_revoked_tokens",
+            "schedule": crontab(minute=0),  # Runs at the start of every hour
+        },
+        "prune-exports-hourly": {
+            "task": "backend.tasks.prune_exports",
+            "schedule": crontab(minute=30),  # Runs at half past every hour
+        },
+        "prune-documents-hourly": {
+            "task": "backend.tasks.prune_documents",
+            "schedule": crontab(minute=45),  # Runs at a quarter to every hour
+        },
+        "refresh-analytics-rollups": {
+            "task": "backend.tasks.refresh_analytics_rollups",
+            "schedule": crontab(minute="*/5"),  # Runs every 5 minutes
+        },
     }
 
     celery.conf.update(app.config)
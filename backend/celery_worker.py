@@ -1,14 +1,22 @@
 from flask import Flask
 from backend.config import Config
 from backend.celery_config import make_celery
-from backend.models import db
+from backend.models import db, Role, User
+from backend.database import init_engines
+from backend.extensions import cache
+from backend.events import export_channel, publish
+from backend.exports import EXPORT_FOLDER
 from flask_mail import Mail, Message
-import csv
+from flask_security import Security, SQLAlchemyUserDatastore
+from celery import group
+from jinja2 import Environment
+from sqlalchemy import case, func
+from smtplib import SMTPServerDisconnected
 import os
 from datetime import datetime
 
-# EXPORT_FOLDER = "frontend/static/exports"
-EXPORT_FOLDER = "backend/exports"  # Move to a backend-accessible directory
+IMPORT_FOLDER = "backend/imports"  # uploads waiting for the import task
+REPORT_CHUNK_SIZE = 500  # customers handled by one monthly report subtask
 
 
 app = Flask(__name__)
@@ -18,97 +26,197 @@ celery = make_celery(app)
 
 # Initialize extensions
 db.init_app(app)
+init_engines(app, db)
+cache.init_app(app)
 mail = Mail(app)
+Security(app, SQLAlchemyUserDatastore(db, User, Role))  # password hashing for imports
+
+
+for folder in (EXPORT_FOLDER, IMPORT_FOLDER):
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+
+def send_message(connection, msg):
+    """Send `msg` over a shared SMTP connection, reconnecting once if the
+    server dropped it (idle timeouts on long batches)"""
+    try:
+        connection.send(msg)
+    except SMTPServerDisconnected:
+        connection.host = connection.configure_host()
+        connection.send(msg)
+
+
+def export_status(state, info):
+    """What clients see of an export task in `state` (`info` is its result or meta)"""
+    if state == "SUCCESS":
+        return {"status": "Completed", "file": f"/download/{info}"}
+    if state == "FAILURE":
+        return {"status": "Failed", "error": str(info)}
+    if state == "PROGRESS":
+        meta = info or {}
+        total = meta.get("total") or 0
+        current = meta.get("current", 0)
+        return {
+            "status": "In Progress",
+            "current": current,
+            "total": total,
+            "percent": round(current * 100 / total, 1) if total else 100.0,
+        }
+    if state == "PENDING":
+        return {"status": "Pending"}
+    return {"status": state}
+
+
+def _report_progress(task, current, total):
+    """Record export progress for pollers and push it to open status streams"""
+    meta = {"current": current, "total": total}
+    task.update_state(state="PROGRESS", meta=meta)
+    publish(export_channel(task.request.id), "status", export_status("PROGRESS", meta))
+
+
+class ExportTask(celery.Task):
+    """Pushes the final state of an export to open status streams"""
+
+    def on_success(self, retval, task_id, args, kwargs):
+        with app.app_context():
+            publish(export_channel(task_id), "status", export_status("SUCCESS", retval))
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        with app.app_context():
+            publish(export_channel(task_id), "status", export_status("FAILURE", exc))
+
+
+@celery.task(bind=True, base=ExportTask, name="backend.tasks.export_service_requests")
+def export_service_requests(
+    self, compress=False, incremental=False, export_format="csv", filters=None
+):
+    """Exports service requests matching `filters` as CSV, JSONL (both
+    optionally gzipped) or XLSX.
+
+    Nothing is written when a file for the same data watermark already
+    exists. Progress is recorded in the task state as PROGRESS
+    {current, total} and pushed to export status streams.
+    """
+    with app.app_context():
+        from backend.exports import cached_export, plan_export, write_export
+
+        plan = plan_export(compress, incremental, export_format, filters)
+        if not cached_export(plan):
+            write_export(
+                plan, lambda current, total: _report_progress(self, current, total)
+            )
+        return plan.filename
 
 
-if not os.path.exists(EXPORT_FOLDER):
-    os.makedirs(EXPORT_FOLDER)
+def import_status(state, info):
+    """What clients see of an import task in `state` (`info` is its result or meta)"""
+    if state == "SUCCESS":
+        return {"status": "Completed", **info}
+    if state == "FAILURE":
+        return {"status": "Failed", "error": str(info)}
+    if state == "PROGRESS":
+        return {"status": "In Progress", **(info or {})}
+    if state == "PENDING":
+        return {"status": "Pending"}
+    return {"status": state}
 
 
-@celery.task(name="backend.tasks.export_service_requests")
-def export_service_requests():
-    """Exports completed service requests as CSV."""
+@celery.task(bind=True, name="backend.tasks.import_records")
+def import_records(self, kind, path):
+    """Bulk-import services or professionals from an uploaded CSV/JSONL file.
+
+    Progress is recorded as PROGRESS {inserted, rejected} after each chunk;
+    the upload is removed once the import is done.
+    """
     with app.app_context():
-        from backend.models import ServiceRequest
-
-        # file_path = os.path.join(
-        #     EXPORT_FOLDER,
-        #     f"service_requests_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv",
-        # )
-        filename = f"service_requests_{datetime.now().strftime('%Y%m%d%H%M%S')}.csv"
-        file_path = os.path.join(EXPORT_FOLDER, filename)
-
-        with open(file_path, "w", newline="") as csvfile:
-            fieldnames = [
-                "Service ID",
-                "Service Name",
-                "Customer Name",
-                "Professional Name",
-                "Rating",
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            completed_requests = ServiceRequest.query.filter_by(
-                status="Completed"
-            ).all()
-            for request in completed_requests:
-                writer.writerow(
-                    {
-                        "Service ID": request.service.id,
-                        "Service Name": request.service.name,
-                        "Customer Name": request.customer.username,
-                        "Professional Name": (
-                            request.professional.username
-                            if request.professional
-                            else "N/A"
-                        ),
-                        "Rating": request.rating,
-                    }
-                )
+        from backend.bulk_import import import_records as run_import
 
-        # return file_path
-        return filename
+        def progress(inserted, rejected):
+            self.update_state(
+                state="PROGRESS", meta={"inserted": inserted, "rejected": rejected}
+            )
+
+        try:
+            return run_import(kind, path, progress)
+        finally:
+            os.remove(path)
+
+
+@celery.task(name="backend.tasks.validate_document")
+def validate_document(sha256):
+    """Check an uploaded professional document off the request path."""
+    with app.app_context():
+        from backend.documents import validate_document as validate
+
+        status = validate(sha256)
+
+    return f"Document {sha256} is {status}"
 
 
 @celery.task(name="backend.tasks.send_daily_reminders")
 def send_daily_reminders():
-    """Send daily reminders to service professionals about unassigned service requests."""
+    """Send daily reminders to service professionals about unassigned service requests.
+
+    A professional is only mailed again once a newer request has arrived
+    for their service than the one recorded in their reminder watermark.
+    """
     with app.app_context():
 
-        from backend.models import ServiceRequest, User
+        from backend.models import ProfessionalReminder, ServiceRequest, User
 
-        # Fetch all pending service requests that are **not assigned** to a professional
-        pending_requests = ServiceRequest.query.filter_by(
-            status="Pending", professional_id=None
-        ).all()
+        # Count pending, unassigned requests per service in the database
+        pending_by_service = {
+            service_id: (pending_count, latest_id)
+            for service_id, pending_count, latest_id in db.session.query(
+                ServiceRequest.service_id,
+                func.count(ServiceRequest.id),
+                func.max(ServiceRequest.id),
+            )
+            .filter(
+                ServiceRequest.status == "Pending",
+                ServiceRequest.professional_id.is_(None),
+            )
+            .group_by(ServiceRequest.service_id)
+        }
 
-        if not pending_requests:
+        if not pending_by_service:
             print("No unassigned service requests.")
             return
 
-        # Dictionary to track how many requests are pending per service
-        service_request_count = {}
-        for request in pending_requests:
-            service_request_count[request.service_id] = (
-                service_request_count.get(request.service_id, 0) + 1
+        # Find professionals offering those services, with their watermark
+        professionals = (
+            db.session.query(User, ProfessionalReminder)
+            .outerjoin(
+                ProfessionalReminder,
+                ProfessionalReminder.professional_id == User.id,
             )
-
-        # Find professionals offering those services
-        professionals = User.query.filter(
-            User.service_id.in_(service_request_count.keys())
-        ).all()
+            .filter(User.service_id.in_(pending_by_service.keys()))
+            .all()
+        )
 
         if not professionals:
             print("No professionals found for pending requests.")
             return
 
-        # Notify professionals about available service requests
-        for professional in professionals:
-            service_id = professional.service_id
-            pending_count = service_request_count.get(service_id, 0)
+        # Skip professionals with nothing new since their last reminder
+        due = [
+            (professional, reminder)
+            for professional, reminder in professionals
+            if reminder is None
+            or reminder.last_request_id < pending_by_service[professional.service_id][1]
+        ]
+
+        if not due:
+            print("No new service requests since the last reminders.")
+            return
+
+        sent = 0
+        # MAIL_MAX_EMAILS caps how many messages go over one connection
+        with mail.connect() as connection:
+            for professional, reminder in due:
+                pending_count, latest_id = pending_by_service[professional.service_id]
 
-            if pending_count > 0:
                 print(
                     f"Sending email to {professional.email} about {pending_count} new service requests."
                 )
@@ -130,62 +238,82 @@ Household Services Team"""
                 msg.body = body
 
                 try:
-                    mail.send(msg)
+                    send_message(connection, msg)
                     print(f"Reminder sent to {professional.email}")
                 except Exception as e:
                     print(f"Failed to send email to {professional.email}: {e}")
+                    continue
 
-    return "Daily reminders sent successfully!"
+                if reminder is None:
+                    reminder = ProfessionalReminder(professional_id=professional.id)
+                    db.session.add(reminder)
+                reminder.last_request_id = latest_id
+                reminder.notified_at = datetime.utcnow()
+                sent += 1
 
+        db.session.commit()
 
-@celery.task(name="backend.tasks.send_monthly_activity_report")
-def send_monthly_activity_report():
-    """Generate and send monthly activity reports to customers via email."""
+    return f"Daily reminders sent to {sent} professionals!"
+
+
+@celery.task(name="backend.tasks.prune_revoked_tokens")
+def prune_revoked_tokens():
+    """Remove expired revoked tokens and refresh the revocation cache."""
     with app.app_context():
-        from backend.models import User, Service, ServiceRequest
+        from backend.token_blocklist import prune_revoked_tokens as prune
 
-        customers = User.query.filter(User.role.has(name="customer")).all()
-
-        for customer in customers:
-            # Fetch service statistics
-            service_requests = ServiceRequest.query.filter_by(
-                customer_id=customer.id
-            ).all()
-            total_requested = len(service_requests)
-            total_accepted = sum(
-                # 1 for req in service_requests if req.status == "Accepted"
-                1
-                for req in service_requests
-                if req.status in ["Accepted", "Completed"]
-            )
-            total_completed = sum(
-                1 for req in service_requests if req.status == "Completed"
-            )
+        deleted = prune()
 
-            # Fetch details of each service
-            service_details = ""
-            for req in service_requests:
-                service = Service.query.get(req.service_id)
-                service_name = service.name if service else "Unknown Service"
-                service_details += f"""
-                <tr>
-                    <td>{service_name}</td>
-                    <td>{req.status}</td>
-                    <td>{req.created_at.strftime('%Y-%m-%d')}</td>
-                </tr>
-                """
-
-            # Generate the HTML report
-            report_html = f"""
+    return f"Pruned {deleted} expired revoked tokens"
+
+
+@celery.task(name="backend.tasks.prune_exports")
+def prune_exports():
+    """Enforce the age and size limits of the export folder."""
+    with app.app_context():
+        from backend.exports import prune_exports as prune
+
+        removed, freed = prune()
+
+    return f"Pruned {removed} exports ({freed} bytes)"
+
+
+@celery.task(name="backend.tasks.prune_documents")
+def prune_documents():
+    """Remove uploaded documents that no user registered with."""
+    with app.app_context():
+        from backend.documents import prune_documents as prune
+
+        removed = prune()
+
+    return f"Pruned {removed} unused documents"
+
+
+@celery.task(name="backend.tasks.refresh_analytics_rollups")
+def refresh_analytics_rollups():
+    """Fold service request changes since the last run into the rollups."""
+    with app.app_context():
+        from backend.analytics import refresh_rollups
+
+        days = refresh_rollups()
+
+    if days is None:
+        return "Rebuilt analytics rollups"
+    return f"Refreshed analytics rollups for {days} days"
+
+
+# Compiled once at import instead of formatting HTML per customer
+MONTHLY_REPORT_TEMPLATE = Environment(autoescape=True).from_string(
+    """
             <html>
             <body>
-                <h2>Monthly Activity Report - {datetime.now().strftime('%B %Y')}</h2>
-                <p>Dear {customer.username},</p>
+                <h2>Monthly Activity Report - {{ month }}</h2>
+                <p>Dear {{ username }},</p>
                 <p>Here is your service activity summary till past month:</p>
                 <ul>
-                    <li><strong>Total Services Requested:</strong> {total_requested}</li>
-                    <li><strong>Total Services Accepted:</strong> {total_accepted}</li>
-                    <li><strong>Total Services Completed:</strong> {total_completed}</li>
+                    <li><strong>Total Services Requested:</strong> {{ total_requested }}</li>
+                    <li><strong>Total Services Accepted:</strong> {{ total_accepted }}</li>
+                    <li><strong>Total Services Completed:</strong> {{ total_completed }}</li>
                 </ul>
                 <h3>Service Details</h3>
                 <table border="1" cellpadding="5" cellspacing="0">
@@ -194,26 +322,123 @@ def send_monthly_activity_report():
                         <th>Status</th>
                         <th>Request Date</th>
                     </tr>
-                    {service_details if service_details else '<tr><td colspan="3">No services requested</td></tr>'}
+                    {% for service_name, status, created_at in details %}
+                    <tr>
+                        <td>{{ service_name or "Unknown Service" }}</td>
+                        <td>{{ status }}</td>
+                        <td>{{ created_at.strftime('%Y-%m-%d') }}</td>
+                    </tr>
+                    {% else %}
+                    <tr><td colspan="3">No services requested</td></tr>
+                    {% endfor %}
                 </table>
                 <p>Thank you for using our platform!</p>
                 <p>Best regards,<br>Household Services Team</p>
             </body>
             </html>
             """
+)
+
+
+@celery.task(name="backend.tasks.send_monthly_activity_report")
+def send_monthly_activity_report():
+    """Fan the monthly activity reports out to chunked subtasks."""
+    with app.app_context():
+        from backend.models import Role, User
+
+        customer_ids = [
+            user_id
+            for (user_id,) in db.session.query(User.id)
+            .join(Role, User.role_id == Role.id)
+            .filter(Role.name == "customer")
+            .order_by(User.id)
+        ]
 
-            # Send the email
-            msg = Message(
-                "Your Monthly Activity Report",
-                sender="no-reply@example.com",
-                recipients=[customer.email],
+    chunks = [
+        customer_ids[i : i + REPORT_CHUNK_SIZE]
+        for i in range(0, len(customer_ids), REPORT_CHUNK_SIZE)
+    ]
+    if chunks:
+        group(send_monthly_report_chunk.s(chunk) for chunk in chunks).apply_async()
+
+    return f"Monthly reports queued for {len(customer_ids)} customers in {len(chunks)} chunks"
+
+
+@celery.task(name="backend.tasks.send_monthly_report_chunk")
+def send_monthly_report_chunk(customer_ids):
+    """Generate and send monthly activity reports to a chunk of customers.
+
+    Uses one grouped query for the per-customer totals, one joined query
+    for the request details and a single SMTP connection for the chunk.
+    """
+    with app.app_context():
+        from backend.models import User, Service, ServiceRequest
+
+        accepted = case(
+            (ServiceRequest.status.in_(["Accepted", "Completed"]), 1), else_=0
+        )
+        completed = case((ServiceRequest.status == "Completed", 1), else_=0)
+        customers = (
+            db.session.query(
+                User.id,
+                User.username,
+                User.email,
+                func.count(ServiceRequest.id),
+                func.coalesce(func.sum(accepted), 0),
+                func.coalesce(func.sum(completed), 0),
+            )
+            .outerjoin(ServiceRequest, ServiceRequest.customer_id == User.id)
+            .filter(User.id.in_(customer_ids))
+            .group_by(User.id, User.username, User.email)
+            .all()
+        )
+
+        details = {}
+        for customer_id, service_name, status, created_at in (
+            db.session.query(
+                ServiceRequest.customer_id,
+                Service.name,
+                ServiceRequest.status,
+                ServiceRequest.created_at,
             )
-            msg.html = report_html
+            .outerjoin(Service, ServiceRequest.service_id == Service.id)
+            .filter(ServiceRequest.customer_id.in_(customer_ids))
+            .order_by(ServiceRequest.customer_id, ServiceRequest.id)
+        ):
+            details.setdefault(customer_id, []).append(
+                (service_name, status, created_at)
+            )
+
+        month = datetime.now().strftime("%B %Y")
+        sent = 0
+        with mail.connect() as connection:
+            for (
+                customer_id,
+                username,
+                email,
+                total_requested,
+                total_accepted,
+                total_completed,
+            ) in customers:
+                msg = Message(
+                    "Your Monthly Activity Report",
+                    sender="no-reply@example.com",
+                    recipients=[email],
+                )
+                msg.html = MONTHLY_REPORT_TEMPLATE.render(
+                    month=month,
+                    username=username,
+                    total_requested=total_requested,
+                    total_accepted=total_accepted,
+                    total_completed=total_completed,
+                    details=details.get(customer_id, []),
+                )
 
-            try:
-                mail.send(msg)
-                print(f"Monthly report sent to {customer.email}")
-            except Exception as e:
-                print(f"Failed to send report to {customer.email}: {e}")
+                try:
+                    send_message(connection, msg)
+                    sent += 1
+                    print(f"Monthly report sent to {email}")
+                except Exception as e:
+                    print(f"Failed to send report to {email}: {e}")
 
-    return "Monthly reports sent successfully!"
+    return f"Monthly reports sent to {sent} of {len(customers)} customers"
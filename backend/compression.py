@@ -0,0 +1,69 @@
+import gzip
+from flask import request
+from backend.metrics import timed
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/plain",
+}
+
+
+def _encoders(app):
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(
+            body, quality=app.config["COMPRESS_BROTLI_QUALITY"]
+        )
+    encoders["gzip"] = lambda body: gzip.compress(
+        body, compresslevel=app.config["COMPRESS_LEVEL"]
+    )
+    return encoders
+
+
+def _compressible(response, min_size):
+    return (
+        200 <= response.status_code < 300
+        and response.status_code != 204
+        and not response.direct_passthrough  # files and streams
+        and not response.is_streamed
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in COMPRESSIBLE_TYPES
+        and (response.content_length or 0) >= min_size
+    )
+
+
+def init_compression(app):
+    """Compress responses of at least COMPRESS_MIN_SIZE bytes with brotli or
+    gzip, whichever the client accepts (brotli first, when installed).
+
+    A compressed body keeps its ETag as a weak one: the representation
+    differs byte for byte, the data it was built from does not.
+    """
+    encoders = _encoders(app)
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+
+    @app.after_request
+    def compress(response):
+        if not _compressible(response, min_size):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(list(encoders))
+        if encoding is None:
+            return response
+
+        with timed("compress"):
+            response.set_data(encoders[encoding](response.get_data()))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
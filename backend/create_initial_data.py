@@ -1,11 +1,25 @@
 from backend.models import db, User, Role
 from flask_security.utils import hash_password
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect
 from uuid import uuid4
 
+# Schema that databases created by db.create_all() already have
+BASELINE_REVISION = "0001_baseline"
+
+
+def upgrade_schema():
+    """Bring the database schema up to date with the migration history"""
+    tables = inspect(db.engine).get_table_names()
+    if "user" in tables and "alembic_version" not in tables:
+        # created by db.create_all() before migrations existed
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
+
 
 def create_initial_data(app):
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
 
         # Create roles if they don't exist
         roles = {
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from flask import g, has_app_context, request
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+# Bind key of the optional read replica (SQLALCHEMY_BINDS)
+READ_BIND = "replica"
+# Engine options only a QueuePool accepts
+QUEUE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica engine while the request is read-only"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_app_context()
+            and g.get("use_read_replica")
+        ):
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class PooledSQLAlchemy(SQLAlchemy):
+    """Applies SQLALCHEMY_ENGINE_OPTIONS only where the pool accepts them.
+
+    Engines on another pool class, such as the StaticPool of in-memory
+    SQLite, are created without the QueuePool sizing options.
+    """
+
+    def _make_engine(self, bind_key, options, app):
+        if options.get("poolclass", QueuePool) is not QueuePool:
+            for name in QUEUE_POOL_OPTIONS:
+                options.pop(name, None)
+        return super()._make_engine(bind_key, options, app)
+
+
+def _sqlite_pragmas(pragmas):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return set_pragmas
+
+
+def init_engines(app, db):
+    """Apply per-connection settings to every engine of `db`.
+
+    SQLite connections get SQLITE_PRAGMAS (WAL journal, busy_timeout,
+    synchronous) so readers and writers stop blocking each other.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(
+                    engine, "connect", _sqlite_pragmas(app.config["SQLITE_PRAGMAS"])
+                )
+
+
+def route_reads_to_replica():
+    """before_request hook: GET requests read from the replica, if configured"""
+    if request.method in ("GET", "HEAD"):
+        g.use_read_replica = True
+
+
+@contextmanager
+def read_from_primary():
+    """Send the reads of the block to the primary, even in a read-only request"""
+    if not has_app_context():
+        yield
+        return
+    previous = g.get("use_read_replica", False)
+    g.use_read_replica = False
+    try:
+        yield
+    finally:
+        g.use_read_replica = previous
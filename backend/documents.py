@@ -0,0 +1,171 @@
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+from tempfile import NamedTemporaryFile
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import RequestEntityTooLarge
+from backend.catalog_cache import users_catalog
+from backend.extensions import cache
+from backend.models import db, Document, User
+
+CHUNK_SIZE = 64 * 1024  # bytes read from the request per iteration
+PDF_HEADER = b"%PDF-"
+PDF_TRAILER = b"%%EOF"
+TRAILER_WINDOW = 1024  # "%%EOF" must appear this close to the end
+UPLOAD_WINDOW = 3600  # seconds DOCUMENT_UPLOADS_PER_HOUR applies to
+PARTIAL_SUFFIX = ".part"  # uploads still being written
+
+
+def document_path(sha256):
+    """Where the document with this content hash lives in DOCUMENT_FOLDER"""
+    return os.path.join(
+        current_app.root_path,
+        current_app.config["DOCUMENT_FOLDER"],
+        sha256[:2],
+        sha256,
+    )
+
+
+def _too_large(max_size):
+    return RequestEntityTooLarge(
+        f"Documents are limited to {round(max_size / 2**20, 1):g} MB"
+    )
+
+
+def upload_allowed(address):
+    """Count an upload from `address`; False past DOCUMENT_UPLOADS_PER_HOUR.
+
+    /auth/documents takes uploads before there is an account to
+    authenticate, so each client address gets a budget per hour window.
+    """
+    key = f"document_uploads:{address}:{int(time.time()) // UPLOAD_WINDOW}"
+    cache.add(key, 0, timeout=UPLOAD_WINDOW)
+    uploads = cache.cache.inc(key)  # atomic INCR on Redis
+    return uploads <= current_app.config["DOCUMENT_UPLOADS_PER_HOUR"]
+
+
+def store_document(stream, content_type="application/pdf", content_length=None):
+    """Copy `stream` into the content-addressed store, chunk by chunk.
+
+    The body is hashed while it is written to a temporary file and never
+    held in memory; past DOCUMENT_MAX_SIZE the upload is abandoned with a
+    413, or before reading anything when `content_length` already says so.
+    Identical content is stored once, also when uploaded concurrently.
+    Returns (document, created).
+    """
+    max_size = current_app.config["DOCUMENT_MAX_SIZE"]
+    if content_length and content_length > max_size:
+        raise _too_large(max_size)
+    folder = os.path.join(current_app.root_path, current_app.config["DOCUMENT_FOLDER"])
+    os.makedirs(folder, exist_ok=True)
+
+    digest, size = hashlib.sha256(), 0
+    with NamedTemporaryFile(dir=folder, suffix=PARTIAL_SUFFIX, delete=False) as f:
+        try:
+            while chunk := stream.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise _too_large(max_size)
+                digest.update(chunk)
+                f.write(chunk)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+
+    sha256 = digest.hexdigest()
+    document = db.session.get(Document, sha256)
+    path = document_path(sha256)
+    if document is not None and os.path.exists(path):
+        os.remove(f.name)  # already stored
+        return document, False
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(f.name, path)
+    if document is None:
+        document = Document(sha256=sha256, size=size, content_type=content_type)
+        try:
+            with db.session.begin_nested():
+                db.session.add(document)
+        except IntegrityError:
+            # A concurrent upload of the same content inserted it first
+            return db.session.get(Document, sha256), False
+    return document, True
+
+
+def validation_error(path):
+    """Why the file at `path` is not an acceptable PDF, or None if it is"""
+    size = os.path.getsize(path)
+    if size < len(PDF_HEADER) + len(PDF_TRAILER):
+        return "File is too small to be a PDF"
+    with open(path, "rb") as f:
+        if f.read(len(PDF_HEADER)) != PDF_HEADER:
+            return "File is not a PDF"
+        f.seek(max(0, size - TRAILER_WINDOW))
+        if PDF_TRAILER not in f.read():
+            return "PDF is truncated"
+    return None
+
+
+def validate_document(sha256):
+    """Check a stored document and record the outcome on its row"""
+    document = db.session.get(Document, sha256)
+    if document is None:
+        return None
+    error = validation_error(document_path(sha256))
+    document.status = "invalid" if error else "valid"
+    document.error = error
+    db.session.commit()
+    users_catalog.invalidate()  # the admin user list shows the status
+    return document.status
+
+
+def prune_documents():
+    """Delete documents no user references, DOCUMENT_ORPHAN_HOURS after upload.
+
+    These are uploads whose registration never happened. Temporary files
+    of uploads abandoned as long ago are removed too.
+    Returns the number of documents removed.
+    """
+    hours = current_app.config["DOCUMENT_ORPHAN_HOURS"]
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    unused = (
+        Document.created_at < cutoff,
+        Document.sha256.not_in(
+            select(User.document_id).where(User.document_id.is_not(None))
+        ),
+    )
+    orphans = db.session.scalars(select(Document.sha256).where(*unused)).all()
+    if orphans:
+        # Checked again as the rows go: a registration may have claimed one
+        db.session.execute(
+            delete(Document).where(Document.sha256.in_(orphans), *unused),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        kept = set(
+            db.session.scalars(
+                select(Document.sha256).where(Document.sha256.in_(orphans))
+            )
+        )
+        orphans = [sha256 for sha256 in orphans if sha256 not in kept]
+
+    for sha256 in orphans:
+        try:
+            os.remove(document_path(sha256))
+        except FileNotFoundError:  # never stored, or pruned concurrently
+            pass
+
+    folder = os.path.join(current_app.root_path, current_app.config["DOCUMENT_FOLDER"])
+    if os.path.isdir(folder):
+        stale = time.time() - hours * 3600
+        for entry in os.scandir(folder):
+            if entry.name.endswith(PARTIAL_SUFFIX) and entry.stat().st_mtime < stale:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+    return len(orphans)
@@ -0,0 +1,124 @@
+import hashlib
+import time
+from itertools import chain
+from flask import Response, request
+from werkzeug.http import unquote_etag
+from sqlalchemy import event
+from backend.database import RoutingSession
+from backend.extensions import cache
+from backend.metrics import timed
+from backend.models import ServiceRequest
+
+# Data versions are counters in the cache, bumped on every write to the
+# data they cover. Responses built from the same versions are identical,
+# so the versions make strong ETags.
+USERS = "all_users"
+SERVICES = "all_services"
+SERVICE_REQUESTS = "service_requests"
+
+# Listings are private to the user and must always be revalidated
+CACHE_CONTROL = "private, no-cache"
+
+
+def _version_key(name):
+    return f"{name}:generation"
+
+
+def _seed(keys):
+    """Start counters missing from the cache (never set, flushed or
+    evicted) at the current time in nanoseconds.
+
+    Writes are far rarer than nanoseconds, so a restarted counter is
+    always above any value it had before, and ETags issued with those
+    values can never match again.
+    """
+    for key in keys:
+        cache.add(key, time.time_ns(), timeout=0)  # no-op if already there
+
+
+def _versions(names):
+    keys = [_version_key(name) for name in names]
+    versions = cache.get_many(*keys)
+    missing = [key for key, version in zip(keys, versions) if version is None]
+    if missing:
+        _seed(missing)
+        versions = cache.get_many(*keys)
+    return versions
+
+
+def data_version(name):
+    return _versions([name])[0]
+
+
+def bump_version(name):
+    key = _version_key(name)
+    _seed([key])  # INCR on a missing key would restart it at 1
+    cache.cache.inc(key)  # atomic INCR on Redis
+
+
+def make_etag(*names, scope=""):
+    """Strong ETag over the current versions of `names`.
+
+    `scope` tells apart responses built from the same data, such as
+    different users or query strings.
+    """
+    with timed("cache"):
+        versions = _versions(names)
+    tag = "-".join(f"{name}.{version or 0}" for name, version in zip(names, versions))
+    if scope:
+        tag += "-" + hashlib.sha1(scope.encode()).hexdigest()[:16]
+    return f'"{tag}"'
+
+
+def request_scope(user_id=""):
+    """Scope for per-user responses that also depend on the query string"""
+    return f"{user_id}?{request.query_string.decode()}"
+
+
+def not_modified(etag):
+    """A 304 response when the client already holds `etag`, else None.
+
+    Weak comparison, as If-None-Match calls for: a compressed response
+    carries the same tag as a weak one (see backend/compression.py).
+    """
+    if request.if_none_match.contains_weak(unquote_etag(etag)[0]):
+        return Response(
+            status=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    return None
+
+
+def etag_headers(etag):
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_request_writes(session, flush_context):
+    if any(
+        isinstance(obj, ServiceRequest)
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        session.info["service_requests_changed"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_bulk_request_writes(orm_execute_state):
+    # Bulk UPDATE/DELETE statements bypass the unit of work (and after_flush)
+    if (
+        orm_execute_state.is_update or orm_execute_state.is_delete
+    ) and orm_execute_state.bind_mapper is ServiceRequest.__mapper__:
+        orm_execute_state.session.info["service_requests_changed"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _bump_request_version(session):
+    if session.info.pop("service_requests_changed", False):
+        try:
+            bump_version(SERVICE_REQUESTS)
+        except Exception as e:
+            print(f"Failed to bump {SERVICE_REQUESTS} version: {e}")
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_request_writes(session):
+    session.info.pop("service_requests_changed", None)
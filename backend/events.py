@@ -0,0 +1,81 @@
+import json
+import time
+import redis
+from flask import Response, current_app
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+
+def redis_client():
+    """Redis connection used for pub/sub, shared by the whole app"""
+    client = current_app.extensions.get("events_redis")
+    if client is None:
+        client = redis.Redis.from_url(current_app.config["EVENTS_REDIS_URL"])
+        current_app.extensions["events_redis"] = client
+    return client
+
+
+def job_channel(service_id):
+    """Channel carrying new pending requests for one service, and their claims"""
+    return f"jobs:service:{service_id}"
+
+
+def export_channel(task_id):
+    """Channel carrying the status changes of one export task"""
+    return f"exports:{task_id}"
+
+
+def publish(channel, event, data):
+    """Publish an event; a Redis outage must never fail the write that caused it"""
+    try:
+        redis_client().publish(channel, json.dumps({"event": event, "data": data}))
+    except redis.RedisError as e:
+        print(f"Failed to publish {event} to {channel}: {e}")
+
+
+def _format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream(pubsub, initial, done):
+    try:
+        yield "retry: 5000\n\n"  # how long the browser waits before reconnecting
+        for event, data in initial:
+            yield _format_event(event, data)
+            if done and done(event, data):
+                return
+        last_sent = time.monotonic()
+        while True:
+            message = pubsub.get_message(timeout=HEARTBEAT_INTERVAL)
+            if message is not None:
+                payload = json.loads(message["data"])
+                yield _format_event(payload["event"], payload["data"])
+                if done and done(payload["event"], payload["data"]):
+                    return
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+                yield ": keep-alive\n\n"  # lets proxies and clients see a live stream
+                last_sent = time.monotonic()
+    finally:
+        pubsub.close()
+
+
+def event_stream(channel, snapshot=None, done=None):
+    """A text/event-stream response relaying the events published on `channel`.
+
+    The subscription is made before the response starts, so nothing
+    published after this call is missed. `snapshot` returns the
+    (event, data) pairs describing the current state; it runs once
+    subscribed, so together they leave no gap. The stream ends after an
+    event for which `done(event, data)` is true. An idle stream blocks
+    in Redis and costs no database work.
+    """
+    pubsub = redis_client().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(channel)
+    initial = snapshot() if snapshot else []
+    return Response(
+        _stream(pubsub, initial, done),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,346 @@
+import csv
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
+from uuid import uuid4
+from flask import current_app
+from sqlalchemy import case, delete, false, func, select
+from sqlalchemy.orm import aliased
+from backend.models import db, Service, ServiceRequest, ServiceRequestExport, User
+from backend.serialization import orjson
+
+EXPORT_FOLDER = "backend/exports"
+EXPORT_BATCH_SIZE = 1000  # rows fetched per round trip while streaming exports
+PARTIAL_SUFFIX = ".part"  # files still being written
+# Columns of every format: (CSV/XLSX header, JSONL key). The first five
+# are those of the original CSV export, in its order.
+COLUMNS = [
+    ("Service ID", "service_id"),
+    ("Service Name", "service_name"),
+    ("Customer Name", "customer"),
+    ("Professional Name", "professional"),
+    ("Rating", "rating"),
+    ("Status", "status"),
+    ("Request ID", "request_id"),
+    ("Created At", "created_at"),
+]
+FILTERS = ("status", "service_id", "professional_id", "created_from", "created_to")
+DEFAULT_STATUS = "Completed"
+
+# The file an export goes to, the filters and updated_at range
+# (since, until] of the requests it holds, how it is written, and the
+# updated_at the next incremental export continues from (`settled`)
+ExportPlan = namedtuple(
+    "ExportPlan", "filename since until filters export_format compress settled"
+)
+
+
+def export_filters(args):
+    """The filters set in `args`, in the JSON-safe form the export task
+    takes. Only requests of DEFAULT_STATUS are exported unless asked."""
+    filters = {"status": DEFAULT_STATUS}
+    for name in FILTERS:
+        value = args.get(name)
+        if isinstance(value, (date, datetime)):
+            value = value.strftime("%Y-%m-%d")
+        if value is not None:
+            filters[name] = value
+    return filters
+
+
+def _criteria(filters):
+    """The filters as SQL criteria, applied by the export query itself"""
+    criteria = [ServiceRequest.status == filters["status"]]
+    if "service_id" in filters:
+        criteria.append(ServiceRequest.service_id == filters["service_id"])
+    if "professional_id" in filters:
+        criteria.append(ServiceRequest.professional_id == filters["professional_id"])
+    if "created_from" in filters:
+        created_from = datetime.fromisoformat(filters["created_from"])
+        criteria.append(ServiceRequest.created_at >= created_from)
+    if "created_to" in filters:
+        # created_to is inclusive of the whole day
+        created_to = datetime.fromisoformat(filters["created_to"])
+        criteria.append(ServiceRequest.created_at < created_to + timedelta(days=1))
+    return criteria
+
+
+def _filters_key(filters):
+    return urlencode(sorted(filters.items()))
+
+
+def export_path(filename):
+    return os.path.join(EXPORT_FOLDER, filename)
+
+
+def last_export_until(filters_key=None):
+    """The newest settled updated_at covered by any export (with these
+    filters), where incremental exports start from"""
+    query = select(func.max(ServiceRequestExport.until))
+    if filters_key is not None:
+        query = query.where(ServiceRequestExport.filters == filters_key)
+    return db.session.execute(query).scalar()
+
+
+def _names_watermark():
+    """Count and latest updated_at of the users and of the services, which
+    move with any rename or deletion"""
+    return [
+        tuple(
+            db.session.execute(
+                select(func.count(model.id), func.max(model.updated_at))
+            ).one()
+        )
+        for model in (User, Service)
+    ]
+
+
+def plan_export(compress=False, incremental=False, export_format="csv", filters=None):
+    """Where an export of the current data goes.
+
+    The file is named after a watermark of what it holds: the count and
+    latest updated_at of the requests matching `filters`, and of the
+    users and services whose names appear in it. While none of them move,
+    the same export resolves to the same file. Incremental exports only hold the rows updated since the last
+    export with the same filters. XLSX files are never gzipped, being
+    compressed already.
+
+    updated_at is stamped before commit, so a transaction still in flight
+    may yet commit rows older than the newest ones visible now. Full
+    exports hold every row, but the next incremental export continues
+    from the newest one older than EXPORT_LAG seconds; incremental exports
+    leave the newer ones for a later export.
+    """
+    filters = filters or export_filters({})
+    compress = compress and export_format != "xlsx"
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config["EXPORT_LAG"])
+    updated_at = ServiceRequest.updated_at
+    criteria = _criteria(filters)
+    if incremental:
+        criteria.append(updated_at <= cutoff)
+    count, until, settled = db.session.execute(
+        select(
+            func.count(ServiceRequest.id),
+            func.max(updated_at),
+            func.max(case((updated_at <= cutoff, updated_at))),
+        ).where(*criteria)
+    ).one()
+    filters_key = _filters_key(filters)
+    since = last_export_until(filters_key) if incremental else None
+    watermark = "|".join(
+        str(part)
+        for part in (
+            filters_key,
+            since,
+            count,
+            until,
+            *_names_watermark(),
+        )
+    )
+    digest = hashlib.sha1(watermark.encode()).hexdigest()[:16]
+    if since is None:
+        filename = f"service_requests_{digest}.{export_format}"
+    else:
+        filename = (
+            f"service_requests_since_{since:%Y%m%d%H%M%S}_{digest}.{export_format}"
+        )
+    if compress:
+        filename += ".gz"
+    return ExportPlan(
+        filename, since, until, filters, export_format, compress, settled or since
+    )
+
+
+def cached_export(plan):
+    """Whether the file of `plan` has already been written. A hit counts
+    as a use, so the retention policy keeps it a while longer."""
+    path = export_path(plan.filename)
+    if not os.path.isfile(path):
+        return False
+    os.utime(path)
+    return True
+
+
+def _opener(compress):
+    return gzip.open if compress else open
+
+
+def _write_csv(file, rows, compress):
+    with _opener(compress)(file, "wt", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([header for header, _ in COLUMNS])
+        writer.writerows(
+            (service_id, service_name, customer, professional or "N/A", *rest)
+            for service_id, service_name, customer, professional, *rest in rows
+        )
+
+
+if orjson is not None:
+
+    def _jsonl_line(record):
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+else:
+
+    def _jsonl_line(record):
+        return (json.dumps(record, default=str) + "\n").encode()
+
+
+def _write_jsonl(file, rows, compress):
+    keys = [key for _, key in COLUMNS]
+    with _opener(compress)(file, "wb") as jsonlfile:
+        for row in rows:
+            jsonlfile.write(_jsonl_line(dict(zip(keys, row))))
+
+
+def _write_xlsx(file, rows, compress):
+    # pyexcel-xlsx writes through openpyxl's write-only workbook, which
+    # streams each row to disk instead of building the sheet in memory
+    from pyexcel_xlsx import save_data
+
+    def sheet():
+        yield [header for header, _ in COLUMNS]
+        for service_id, service_name, customer, professional, *rest in rows:
+            yield [service_id, service_name, customer, professional or "N/A", *rest]
+
+    with open(file, "wb") as xlsxfile:
+        save_data(xlsxfile, {"Service Requests": sheet()}, file_type="xlsx")
+
+
+# Streaming writers of each export format: writer(path, rows, compress)
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "xlsx": _write_xlsx}
+
+
+def write_export(plan, progress=None):
+    """Write the requests of `plan` to its file and record it. Returns the
+    number of rows.
+
+    The filters are applied by the query, whose rows are streamed in
+    batches straight into the format's writer, so memory stays flat
+    regardless of table size; `progress(current, total)` is called after
+    each batch. The file only appears once complete.
+    """
+    criteria = _criteria(plan.filters)
+    if plan.since is not None:
+        criteria.append(ServiceRequest.updated_at > plan.since)
+    if plan.until is not None:
+        criteria.append(ServiceRequest.updated_at <= plan.until)
+    else:  # no row matched when the export was planned
+        criteria.append(false())
+
+    customer = aliased(User)
+    professional = aliased(User)
+    rows_query = (
+        select(
+            Service.id,
+            Service.name,
+            customer.username,
+            professional.username,
+            ServiceRequest.rating,
+            ServiceRequest.status,
+            ServiceRequest.id,
+            ServiceRequest.created_at,
+        )
+        .join(Service, ServiceRequest.service_id == Service.id)
+        .join(customer, ServiceRequest.customer_id == customer.id)
+        .outerjoin(professional, ServiceRequest.professional_id == professional.id)
+        .where(*criteria)
+        .order_by(ServiceRequest.id)
+    )
+    total = db.session.execute(
+        select(func.count(ServiceRequest.id)).where(*criteria)
+    ).scalar()
+    if progress:
+        progress(0, total)
+
+    written = 0
+
+    def rows():
+        nonlocal written
+        result = db.session.execute(
+            rows_query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for batch in result.partitions():
+            yield from batch
+            written += len(batch)
+            if progress:
+                progress(written, total)
+
+    path = export_path(plan.filename)
+    partial = f"{path}.{uuid4().hex}{PARTIAL_SUFFIX}"
+    try:
+        WRITERS[plan.export_format](partial, rows(), plan.compress)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.replace(partial, path)
+
+    db.session.merge(
+        ServiceRequestExport(
+            filename=plan.filename,
+            filters=_filters_key(plan.filters),
+            since=plan.since,
+            until=plan.settled,
+            row_count=written,
+            size=os.path.getsize(path),
+        )
+    )
+    db.session.commit()
+    return written
+
+
+def prune_exports():
+    """Apply the retention policy to EXPORT_FOLDER.
+
+    Files unused for EXPORT_MAX_AGE_DAYS are deleted, then the least
+    recently used ones until the folder fits in EXPORT_MAX_BYTES. Exports
+    still being written are only removed once expired. The record of the
+    newest export of each set of filters outlives its file, as incremental
+    exports start there.
+    Returns the number of files and bytes removed.
+    """
+    config = current_app.config
+    cutoff = time.time() - config["EXPORT_MAX_AGE_DAYS"] * 24 * 3600
+    files = sorted(
+        (entry.stat().st_mtime, entry.stat().st_size, entry.name)
+        for entry in os.scandir(EXPORT_FOLDER)
+        if entry.is_file()
+    )
+    total = sum(size for _, size, _ in files)
+
+    removed, freed = [], 0
+    for modified, size, name in files:
+        expired = modified < cutoff
+        if not expired and (
+            total <= config["EXPORT_MAX_BYTES"] or name.endswith(PARTIAL_SUFFIX)
+        ):
+            continue
+        try:
+            os.remove(export_path(name))
+        except FileNotFoundError:  # pruned concurrently
+            continue
+        removed.append(name)
+        total -= size
+        freed += size
+
+    if removed:
+        newest = dict(
+            db.session.execute(
+                select(
+                    ServiceRequestExport.filters, func.max(ServiceRequestExport.until)
+                ).group_by(ServiceRequestExport.filters)
+            ).all()
+        )
+        for export in ServiceRequestExport.query.filter(
+            ServiceRequestExport.filename.in_(removed)
+        ):
+            if export.until is None or export.until != newest[export.filters]:
+                db.session.delete(export)
+        db.session.commit()
+    return len(removed), freed
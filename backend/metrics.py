@@ -0,0 +1,159 @@
+import hmac
+import time
+from collections import Counter as StatementCounter
+from contextlib import contextmanager
+from flask import Response, abort, current_app, g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from sqlalchemy import event
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request",
+    ["method", "endpoint", "status"],
+)
+REQUEST_STATEMENTS = Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per request",
+    ["method", "endpoint"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500),
+)
+CATALOG_CACHE = Counter(
+    "catalog_cache_requests_total",
+    "Catalog cache lookups by tier that answered (local, redis or miss)",
+    ["catalog", "result"],
+)
+
+# Server-Timing entries, in the order they are reported
+TIMINGS = ("db", "cache", "serialize", "compress")
+# Clients allowed to scrape /metrics when no METRICS_TOKEN is set
+LOCAL_ADDRESSES = {"127.0.0.1", "::1"}
+
+
+def _tracking():
+    return has_request_context() and "timings" in g
+
+
+@contextmanager
+def timed(kind):
+    """Add the time spent in the block to the request's `kind` timing"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _tracking():
+            g.timings[kind] += time.perf_counter() - started
+
+
+def record_cache(catalog, result):
+    CATALOG_CACHE.labels(catalog, result).inc()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    if _tracking():
+        g.timings["db"] += elapsed
+        g.sql_count += 1
+        if g.sql_statements is not None:
+            g.sql_statements[statement] += 1
+
+
+def _handle_error(context):
+    """Drop the start time of a statement that raised, so the stack of the
+    connection stays in step with the statements still running"""
+    if context.connection is not None and context.execution_context is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    g.timings = dict.fromkeys(TIMINGS, 0.0)
+    g.sql_count = 0
+    detect = current_app.debug or current_app.config["DETECT_N_PLUS_ONE"]
+    g.sql_statements = StatementCounter() if detect else None
+
+
+def _finish_request(response):
+    if not _tracking():
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+
+    REQUEST_LATENCY.labels(request.method, endpoint, response.status_code).observe(
+        elapsed
+    )
+    REQUEST_STATEMENTS.labels(request.method, endpoint).observe(g.sql_count)
+
+    timings = [
+        f'db;dur={g.timings["db"] * 1000:.2f};desc="statements: {g.sql_count}"',
+        *(f"{kind};dur={g.timings[kind] * 1000:.2f}" for kind in TIMINGS[1:]),
+        f"total;dur={elapsed * 1000:.2f}",
+    ]
+    response.headers["Server-Timing"] = ", ".join(timings)
+
+    if g.sql_statements:
+        _report_repeated_statements(endpoint)
+    return response
+
+
+def _report_repeated_statements(endpoint):
+    """Warn about statements repeated with only their parameters changing,
+    the signature of lazy loads in a loop (N+1 queries)"""
+    threshold = current_app.config["N_PLUS_ONE_THRESHOLD"]
+    for statement, count in g.sql_statements.items():
+        if count >= threshold:
+            current_app.logger.warning(
+                "Possible N+1 in %s %s: %d identical statements: %s",
+                request.method,
+                endpoint,
+                count,
+                " ".join(statement.split()),
+            )
+
+
+def metrics():
+    """Prometheus scrape endpoint.
+
+    Scrapers authenticate with METRICS_TOKEN as a bearer token; without
+    one configured, only local scrapers are answered.
+    """
+    token = current_app.config["METRICS_TOKEN"]
+    if token:
+        expected = f"Bearer {token}".encode()
+        given = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(given, expected):
+            abort(401)
+    elif request.remote_addr not in LOCAL_ADDRESSES:
+        abort(403)
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app, db):
+    """Time SQL per request, add Server-Timing headers and serve /metrics"""
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_error)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule("/metrics", "metrics", metrics)
+
+
+def instrument_api(api):
+    """Count Flask-RESTful's response serialization as `serialize` time"""
+
+    def timed_representation(represent):
+        def wrapper(data, code, headers=None):
+            with timed("serialize"):
+                return represent(data, code, headers)
+
+        return wrapper
+
+    for mediatype, represent in list(api.representations.items()):
+        api.representations[mediatype] = timed_representation(represent)
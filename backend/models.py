@@ -1,9 +1,9 @@
-from flask_sqlalchemy import SQLAlchemy
 from flask_security import UserMixin, RoleMixin
+from backend.database import PooledSQLAlchemy, RoutingSession
 import uuid
 from datetime import datetime
 
-db = SQLAlchemy()
+db = PooledSQLAlchemy(session_options={"class_": RoutingSession})
 
 
 # Role table
@@ -21,18 +21,44 @@ class User(db.Model, UserMixin):
     password = db.Column(db.String(255), nullable=False)
     contact_number = db.Column(db.String(15), nullable=True)
     flagged = db.Column(db.Boolean, default=False)
-    role_id = db.Column(db.Integer, db.ForeignKey("role.id"), nullable=False)
-    service_id = db.Column(db.Integer, db.ForeignKey("service.id"), nullable=True)
-    document_path = db.Column(db.String(255), nullable=True)
+    role_id = db.Column(
+        db.Integer, db.ForeignKey("role.id"), nullable=False, index=True
+    )
+    service_id = db.Column(
+        db.Integer, db.ForeignKey("service.id"), nullable=True, index=True
+    )
+    document_path = db.Column(db.String(255), nullable=True)  # legacy uploads
+    document_id = db.Column(
+        db.String(64), db.ForeignKey("document.sha256"), nullable=True, index=True
+    )
     service_offered = db.Column(db.String(120), nullable=True)
     fs_uniquifier = db.Column(
         db.String(64), unique=True, nullable=False, default=lambda: str(uuid.uuid4())
     )
+    # Last insert or update, part of the export watermark (names in exports)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
     role = db.relationship("Role", backref="users", lazy=True)
     services = db.relationship(
         "Service", foreign_keys=[service_id], backref="provider", lazy=True
     )
 
+    __table_args__ = (
+        # bulk imports match emails case-insensitively: lower(email) IN (...)
+        db.Index("ix_user_email_lower", db.func.lower(email)),
+    )
+
+
+# Uploaded documents, stored once per content hash (see backend/documents.py)
+class Document(db.Model):
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    error = db.Column(db.String(255), nullable=True)  # why validation failed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 
 # Service table
 class Service(db.Model):
@@ -42,18 +68,37 @@ class Service(db.Model):
     price = db.Column(db.Float, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     available = db.Column(db.Boolean, default=True)
+    # Last insert or update, part of the export watermark (names in exports)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
 
 
 # Service Request table
 class ServiceRequest(db.Model):
+    __table_args__ = (
+        # professional feed: service_id = ? AND status = 'Pending'
+        db.Index("ix_service_request_service_id_status", "service_id", "status"),
+        # reminders, exports and admin filters by status (then service)
+        db.Index("ix_service_request_status_service_id", "status", "service_id"),
+        # customer history: customer_id = ? ORDER BY id DESC, keyset paginated
+        db.Index("ix_service_request_customer_id_id", "customer_id", "id"),
+        # export watermark and incremental exports: status = ? AND updated_at > ?
+        db.Index("ix_service_request_status_updated_at", "status", "updated_at"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     service_id = db.Column(db.Integer, db.ForeignKey("service.id"), nullable=False)
     professional_id = db.Column(
-        db.Integer, db.ForeignKey("user.id"), nullable=True
+        db.Integer, db.ForeignKey("user.id"), nullable=True, index=True
     )  # Store assigned professional
     status = db.Column(db.String(50), default="Pending")
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Last insert or update, the high-water mark of analytics rollups and exports
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
     rating = db.Column(db.Integer, nullable=True)  # New column for rating (1-5)
 
     customer = db.relationship("User", foreign_keys=[customer_id], backref="requests")
@@ -63,6 +108,96 @@ class ServiceRequest(db.Model):
     )
 
 
+# Running totals of ratings, updated in the same transaction as each rating
+class RatingTotals:
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    average = db.Column(db.Float, nullable=False, default=0.0)  # indexed for ranking
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Ratings of a professional's jobs for one service
+class ProfessionalRating(db.Model, RatingTotals):
+    __table_args__ = (
+        # leaderboard: service_id = ? ORDER BY average DESC, rating_count DESC
+        db.Index(
+            "ix_professional_rating_service_id_average",
+            "service_id",
+            "average",
+            "rating_count",
+        ),
+    )
+
+    professional_id = db.Column(
+        db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    service_id = db.Column(
+        db.Integer, db.ForeignKey("service.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+# Ratings of every job done for a service
+class ServiceRating(db.Model, RatingTotals):
+    service_id = db.Column(
+        db.Integer, db.ForeignKey("service.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+# Service requests per created day, service and status (analytics rollup)
+class RequestDailyRollup(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    service_id = db.Column(db.Integer, primary_key=True)  # kept if the service goes
+    status = db.Column(db.String(50), primary_key=True)
+    request_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)  # completed only
+
+
+# Service requests per service and status over all time (analytics rollup)
+class RequestTotalRollup(db.Model):
+    service_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    request_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+
+# How far each rollup has read its source table
+class RollupState(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    high_water_mark = db.Column(db.DateTime, nullable=True)  # None: rebuild
+
+
+# Created days of deleted service requests, for the next rollup refresh
+class RollupDirtyDay(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+
+
+# A written export file and the updated_at range of the rows it holds
+class ServiceRequestExport(db.Model):
+    filename = db.Column(db.String(255), primary_key=True)
+    filters = db.Column(
+        db.String(255), nullable=False, server_default=""
+    )  # query string
+    since = db.Column(db.DateTime, nullable=True)  # None: from the start
+    until = db.Column(db.DateTime, nullable=True, index=True)
+    row_count = db.Column(db.Integer, nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# Last pending request a professional was reminded about
+class ProfessionalReminder(db.Model):
+    professional_id = db.Column(
+        db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    last_request_id = db.Column(db.Integer, nullable=False, default=0)
+    notified_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 # for storing Revoked tokens
 class RevokedToken(db.Model):
     """Model to store revoked JWT tokens"""
@@ -70,6 +205,9 @@ class RevokedToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(36), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(
+        db.DateTime, nullable=True, index=True
+    )  # token "exp", for pruning
 
     @classmethod
     def is_revoked(cls, jti):
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+from flask import current_app
+from flask_security.utils import hash_password as _hash_password
+from flask_security.utils import verify_password as _verify_password
+from werkzeug.exceptions import ServiceUnavailable
+
+
+class HashingBusy(ServiceUnavailable):
+    """Every hashing worker is busy and the wait queue is full"""
+
+    description = "Too many sign-ins at once, please retry shortly"
+
+    def get_headers(self, environ=None, scope=None):
+        return super().get_headers(environ, scope) + [("Retry-After", "1")]
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small, bounded pool of threads.
+
+    bcrypt releases the GIL, so at most `workers` hashes burn CPU at once
+    however many requests arrive; up to `queue` more wait their turn and
+    anything beyond that is turned away with a 503 instead of piling up.
+    """
+
+    def __init__(self, workers, queue):
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="bcrypt")
+        self._slots = BoundedSemaphore(workers + queue)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        app = current_app._get_current_object()
+        try:
+            future = self._executor.submit(self._call, app, fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def map(self, fn, items):
+        """Apply `fn` to every item on the pool, for batch jobs outside requests"""
+        app = current_app._get_current_object()
+        return list(self._executor.map(lambda item: self._call(app, fn, item), items))
+
+    @staticmethod
+    def _call(app, fn, *args):
+        with app.app_context():  # flask-security reads its settings from the app
+            return fn(*args)
+
+
+def _hasher():
+    hasher = current_app.extensions.get("password_hasher")
+    if hasher is None:
+        hasher = PasswordHasher(
+            current_app.config["PASSWORD_HASH_WORKERS"],
+            current_app.config["PASSWORD_HASH_QUEUE"],
+        )
+        current_app.extensions["password_hasher"] = hasher
+    return hasher
+
+
+def _verify_and_rehash(password, password_hash):
+    if not _verify_password(password, password_hash):
+        return False, None
+    pwd_context = current_app.extensions["security"].pwd_context
+    if pwd_context.needs_update(password_hash):
+        return True, _hash_password(password)
+    return True, None
+
+
+def hash_password(password):
+    """Hash a new password at the configured work factor (BCRYPT_ROUNDS)"""
+    return _hasher().run(_hash_password, password)
+
+
+def hash_passwords(passwords):
+    """Hash many passwords at once, spread over the hashing pool"""
+    return _hasher().map(_hash_password, passwords)
+
+
+def verify_password(password, password_hash):
+    return _hasher().run(_verify_password, password, password_hash)
+
+
+def verify_and_update_password(password, user):
+    """Check `user`'s password, rehashing it if the work factor has changed.
+
+    The caller commits the session when the hash was updated.
+    """
+    verified, new_hash = _hasher().run(_verify_and_rehash, password, user.password)
+    if new_hash:
+        user.password = new_hash
+    return verified
@@ -0,0 +1,138 @@
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, text
+from sqlalchemy.orm import joinedload
+from backend.models import (
+    db,
+    Role,
+    User,
+    ServiceRequest,
+    RevokedToken,
+    ProfessionalRating,
+)
+
+
+# Representative versions of the hot queries, with sample parameters.
+# Each must be answered through an index, never a full table scan.
+def hot_queries():
+    return {
+        "professional feed": ServiceRequest.query.filter(
+            (ServiceRequest.service_id == 1)
+            & (
+                (ServiceRequest.status == "Pending")
+                | (ServiceRequest.professional_id == 2)
+            )
+        ),
+        "customer requests": ServiceRequest.query.options(
+            joinedload(ServiceRequest.service),
+            joinedload(ServiceRequest.professional),
+        )
+        .filter(ServiceRequest.customer_id == 1, ServiceRequest.id < 1000)
+        .order_by(ServiceRequest.id.desc())
+        .limit(51),
+        "admin requests by status": ServiceRequest.query.options(
+            joinedload(ServiceRequest.service),
+            joinedload(ServiceRequest.customer),
+            joinedload(ServiceRequest.professional),
+        )
+        .filter(ServiceRequest.status == "Pending", ServiceRequest.id > 0)
+        .order_by(ServiceRequest.id)
+        .limit(51),
+        "admin requests by service": ServiceRequest.query.filter(
+            ServiceRequest.service_id == 1, ServiceRequest.id > 0
+        )
+        .order_by(ServiceRequest.id)
+        .limit(51),
+        "pending requests per service": db.session.query(
+            ServiceRequest.service_id,
+            func.count(ServiceRequest.id),
+            func.max(ServiceRequest.id),
+        )
+        .filter(
+            ServiceRequest.status == "Pending",
+            ServiceRequest.professional_id.is_(None),
+        )
+        .group_by(ServiceRequest.service_id),
+        "completed requests export": db.session.query(ServiceRequest.id).filter(
+            ServiceRequest.status == "Completed"
+        ),
+        "export watermark": db.session.query(
+            func.count(ServiceRequest.id), func.max(ServiceRequest.updated_at)
+        ).filter(
+            ServiceRequest.status == "Completed",
+            ServiceRequest.updated_at <= datetime(2025, 1, 1),
+        ),
+        "incremental export": db.session.query(ServiceRequest.id).filter(
+            ServiceRequest.status == "Completed",
+            ServiceRequest.updated_at > datetime(2025, 1, 1),
+        ),
+        "filtered export": db.session.query(ServiceRequest.id).filter(
+            ServiceRequest.status == "Completed",
+            ServiceRequest.service_id == 1,
+            ServiceRequest.created_at >= datetime(2025, 1, 1),
+        ),
+        "service leaderboard": db.session.query(ProfessionalRating, User.username)
+        .join(User, User.id == ProfessionalRating.professional_id)
+        .filter(
+            ProfessionalRating.service_id == 1, ProfessionalRating.rating_count >= 1
+        )
+        .order_by(
+            ProfessionalRating.average.desc(), ProfessionalRating.rating_count.desc()
+        )
+        .limit(10),
+        "professionals by service": User.query.filter(User.service_id.in_([1, 2])),
+        "imported users already registered": db.session.query(
+            User.email, User.username
+        ).filter(
+            func.lower(User.email).in_(["a@example.com"]) | User.username.in_(["a"])
+        ),
+        "customer ids": db.session.query(User.id)
+        .join(Role, User.role_id == Role.id)
+        .filter(Role.name == "customer"),
+        "revoked token lookup": db.session.query(RevokedToken.id).filter_by(
+            jti="00000000-0000-0000-0000-000000000000"
+        ),
+        "expired revoked tokens": RevokedToken.query.filter(
+            RevokedToken.expires_at < datetime(2000, 1, 1)
+        ),
+    }
+
+
+def explain(query):
+    """Return the detail lines of SQLite's EXPLAIN QUERY PLAN for a query"""
+    sql = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan):
+    """Plan steps that read a whole table (or a whole index)"""
+    return [step for step in plan if step.startswith("SCAN ")]
+
+
+def check_query_plans(queries=None):
+    """Plan of each hot query (or of `queries`) and its full scans, by name"""
+    results = {}
+    for name, query in (queries or hot_queries()).items():
+        plan = explain(query)
+        results[name] = (plan, full_scans(plan))
+    return results
+
+
+@click.command("check-query-plans")
+@with_appcontext
+def check_query_plans_command():
+    """Fail if any hot query falls back to a full table scan (SQLite only)."""
+    if db.engine.dialect.name != "sqlite":
+        raise click.UsageError("EXPLAIN QUERY PLAN checks require SQLite")
+
+    failures = 0
+    for name, (plan, scans) in check_query_plans().items():
+        click.echo(f"{'FAIL' if scans else 'ok':4}  {name}: {'; '.join(plan)}")
+        failures += bool(scans)
+
+    if failures:
+        raise SystemExit(f"{failures} hot queries use a full table scan")
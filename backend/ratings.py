@@ -0,0 +1,170 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import Float, case, cast, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from backend.models import db, ProfessionalRating, ServiceRating, ServiceRequest
+
+RATINGS = range(1, 6)
+BUCKETS = [f"rating_{rating}" for rating in RATINGS]
+TOTALS = ["rating_count", "rating_sum", "average", *BUCKETS]
+
+# INSERT .. ON CONFLICT DO UPDATE, by dialect
+UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _add_rating(model, keys, rating):
+    """Add one rating to the totals row of `model` at `keys`, creating it.
+
+    A single upsert where the dialect has one, so concurrent ratings never
+    lose an increment.
+    """
+    table = model.__table__
+    increments = {
+        "rating_count": table.c.rating_count + 1,
+        "rating_sum": table.c.rating_sum + rating,
+        "average": cast(table.c.rating_sum + rating, Float)
+        / (table.c.rating_count + 1),
+        f"rating_{rating}": table.c[f"rating_{rating}"] + 1,
+    }
+    first = dict(
+        **keys,
+        rating_count=1,
+        rating_sum=rating,
+        average=float(rating),
+        **{bucket: int(bucket == f"rating_{rating}") for bucket in BUCKETS},
+    )
+    dialect = db.session.get_bind().dialect.name
+    if dialect in UPSERTS:
+        db.session.execute(
+            UPSERTS[dialect](table)
+            .values(**first)
+            .on_conflict_do_update(index_elements=list(keys), set_=increments)
+        )
+        return
+
+    # Elsewhere, update the row or create it; a concurrent insert that won
+    # the race is updated instead
+    where = [table.c[key] == value for key, value in keys.items()]
+    if db.session.execute(update(table).where(*where).values(increments)).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(**first))
+    except IntegrityError:
+        db.session.execute(update(table).where(*where).values(increments))
+
+
+def _remove_rating(model, keys, rating):
+    """Take one rating out of the totals row of `model` at `keys`, deleting
+    the row once it counts no rating"""
+    table = model.__table__
+    where = [table.c[key] == value for key, value in keys.items()]
+    count = table.c.rating_count - 1
+    db.session.execute(
+        update(table)
+        .where(*where)
+        .values(
+            rating_count=count,
+            rating_sum=table.c.rating_sum - rating,
+            average=case(
+                (count > 0, cast(table.c.rating_sum - rating, Float) / count),
+                else_=0.0,
+            ),
+            **{f"rating_{rating}": table.c[f"rating_{rating}"] - 1},
+        )
+    )
+    db.session.execute(delete(table).where(*where, table.c.rating_count <= 0))
+
+
+def _totals_keys(service_request):
+    """(model, keys) of each totals row counting `service_request`'s rating"""
+    rows = []
+    if service_request.professional_id is not None:
+        keys = {
+            "professional_id": service_request.professional_id,
+            "service_id": service_request.service_id,
+        }
+        rows.append((ProfessionalRating, keys))
+    rows.append((ServiceRating, {"service_id": service_request.service_id}))
+    return rows
+
+
+def record_rating(service_request, rating):
+    """Count `rating` in the professional's and the service's totals.
+
+    The caller commits, together with the rating itself.
+    """
+    for model, keys in _totals_keys(service_request):
+        _add_rating(model, keys, rating)
+
+
+def forget_rating(service_request):
+    """Take the rating of a service request being deleted out of the totals.
+
+    The caller commits, together with the deletion.
+    """
+    if service_request.rating is None:
+        return
+    for model, keys in _totals_keys(service_request):
+        _remove_rating(model, keys, service_request.rating)
+
+
+def rating_summary(totals):
+    if totals is None:
+        return {"count": 0, "average": None, "distribution": dict.fromkeys(RATINGS, 0)}
+    return {
+        "count": totals.rating_count,
+        "average": round(totals.average, 2),
+        "distribution": {
+            rating: getattr(totals, f"rating_{rating}") for rating in RATINGS
+        },
+    }
+
+
+def _totals_from_requests(*keys):
+    """SELECT of the rating totals of service requests grouped by `keys`"""
+    rating = ServiceRequest.rating
+    return (
+        select(
+            *keys,
+            func.count(rating),
+            func.sum(rating),
+            cast(func.sum(rating), Float) / func.count(rating),
+            *(func.sum(case((rating == value, 1), else_=0)) for value in RATINGS),
+        )
+        .where(rating.is_not(None))
+        .group_by(*keys)
+    )
+
+
+def backfill_ratings():
+    """Rebuild the rating totals from the ratings of every service request.
+
+    Returns the number of professional and service totals written.
+    """
+    db.session.execute(delete(ProfessionalRating))
+    db.session.execute(delete(ServiceRating))
+    professionals = db.session.execute(
+        ProfessionalRating.__table__.insert().from_select(
+            ["professional_id", "service_id", *TOTALS],
+            _totals_from_requests(
+                ServiceRequest.professional_id, ServiceRequest.service_id
+            ).where(ServiceRequest.professional_id.is_not(None)),
+        )
+    ).rowcount
+    services = db.session.execute(
+        ServiceRating.__table__.insert().from_select(
+            ["service_id", *TOTALS], _totals_from_requests(ServiceRequest.service_id)
+        )
+    ).rowcount
+    db.session.commit()
+    return professionals, services
+
+
+@click.command("backfill-ratings")
+@with_appcontext
+def backfill_ratings_command():
+    """Rebuild the rating totals from the ratings of every service request."""
+    professionals, services = backfill_ratings()
+    click.echo(f"Rebuilt totals for {professionals} professionals, {services} services")
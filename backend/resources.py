@@ -1,53 +1,175 @@
-from flask_restful import Resource, reqparse
-from backend.models import db, User, Service, ServiceRequest
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_security.utils import verify_password, hash_password
-from backend.extensions import cache
+from datetime import timedelta
+from flask_restful import Resource, reqparse, inputs
+from sqlalchemy import delete, update
+from sqlalchemy.orm import joinedload
+from backend.models import (
+    db,
+    User,
+    Service,
+    ServiceRequest,
+    ProfessionalRating,
+    ServiceRating,
+    Document,
+)
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from backend.auth import current_role, role_required
+from backend.passwords import hash_password, verify_password
+from backend.catalog_cache import users_catalog, services_catalog
+from backend.etags import (
+    USERS,
+    SERVICES,
+    SERVICE_REQUESTS,
+    make_etag,
+    request_scope,
+    not_modified,
+    etag_headers,
+)
+from backend.events import event_stream, export_channel, job_channel, publish
 from celery.result import AsyncResult
-from backend.celery_worker import export_service_requests
+from backend.celery_worker import (
+    IMPORT_FOLDER,
+    export_service_requests,
+    export_status,
+    import_records,
+    import_status,
+)
+from backend.bulk_import import IMPORTERS
+from backend.ratings import forget_rating, rating_summary, record_rating
+from backend.analytics import mark_deleted, summary as analytics_summary
+from backend.documents import document_path
+from backend.exports import (
+    EXPORT_FOLDER,
+    WRITERS,
+    cached_export,
+    export_filters,
+    plan_export,
+)
+from werkzeug.datastructures import FileStorage
+from uuid import uuid4
 import os
 from flask import send_file
 
-# Define the export folder path
-EXPORT_FOLDER = "backend/exports"
+# Final states of export and import tasks; any other state is still running (202)
+TASK_STATUS_CODES = {"Completed": 200, "Failed": 500}
+
+# Keyset pagination page sizes
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_LEADERBOARD_SIZE = 100
+
+
+def paginate_by_id(query, cursor=None, limit=DEFAULT_PAGE_SIZE, newest_first=False):
+    """Keyset-paginate a ServiceRequest query on its primary key.
+
+    Returns the rows of the page and the cursor for the next one (None when
+    this is the last page). One extra row is fetched to detect the end.
+    """
+    if newest_first:
+        if cursor:
+            query = query.filter(ServiceRequest.id < cursor)
+        query = query.order_by(ServiceRequest.id.desc())
+    else:
+        if cursor:
+            query = query.filter(ServiceRequest.id > cursor)
+        query = query.order_by(ServiceRequest.id)
+    rows = query.limit(limit + 1).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def listing_parser():
+    """Query string arguments shared by the service request listings"""
+    parser = reqparse.RequestParser()
+    parser.add_argument("cursor", type=int, location="args")
+    parser.add_argument(
+        "limit",
+        type=inputs.int_range(1, MAX_PAGE_SIZE),
+        default=DEFAULT_PAGE_SIZE,
+        location="args",
+    )
+    parser.add_argument("status", type=str, location="args")
+    parser.add_argument("created_from", type=inputs.date, location="args")
+    parser.add_argument("created_to", type=inputs.date, location="args")
+    return parser
+
+
+def filter_requests(query, args):
+    """Apply the status and date-range filters of `listing_parser` in SQL"""
+    if args["status"]:
+        query = query.filter(ServiceRequest.status == args["status"])
+    if args["created_from"]:
+        query = query.filter(ServiceRequest.created_at >= args["created_from"])
+    if args["created_to"]:
+        # created_to is inclusive of the whole day
+        query = query.filter(
+            ServiceRequest.created_at < args["created_to"] + timedelta(days=1)
+        )
+    return query
+
+
+def field_list(allowed):
+    """reqparse type for a sparse `fields=a,b` projection over `allowed`"""
+
+    def parse(value):
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        unknown = set(fields) - set(allowed)
+        if unknown:
+            raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+        return fields
+
+    return parse
+
+
+def claim_service_request(request_id, professional_id):
+    """Atomically assign a pending request to a professional.
+
+    A single conditional UPDATE does the check and the write, so of any
+    number of concurrent claims exactly one matches the row. Returns
+    whether this claim won.
+    """
+    result = db.session.execute(
+        update(ServiceRequest)
+        .where(
+            ServiceRequest.id == request_id,
+            ServiceRequest.status == "Pending",
+            ServiceRequest.professional_id.is_(None),
+        )
+        .values(status="Accepted", professional_id=professional_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.session.rollback()  # lost the race: nothing changed
+        return False
+    db.session.commit()
+    return True
+
+
+def job_data(req):
+    """A service request as shown in the professional's job list and feed"""
+    return {
+        "id": req.id,
+        "customer_name": req.customer.username,
+        "customer_contact": req.customer.contact_number,
+        "service_name": req.service.name,
+        "service_price": req.service.price,
+        "status": req.status,
+        "created_at": req.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "rating": req.rating,
+    }
 
 
 # Admin retrieve users (with caching), delete, and flag/unflag them
 class UserResource(Resource):
-    @jwt_required()
+    @role_required("admin", error="Unauthorized access")
     def get(self):
         """Retrieve all users (with caching)"""
-        cached_users = cache.get("all_users")
-        if cached_users:
-            print("Cache HIT: Returning cached users")
-            return cached_users, 200
-        print("Cache MISS: Fetching users from DB")
-        users = User.query.all()
-        users_data = [
-            {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "role": user.role.name,
-                "flagged": user.flagged,
-                "document_path": (
-                    user.document_path if user.role.name == "professional" else None
-                ),
-                "service_offered": (
-                    Service.query.get(user.service_id).name
-                    if user.role.name == "professional" and user.service_id
-                    else None
-                ),
-            }
-            for user in users
-        ]
-
-        # Store in cache with expiry (e.g., 5 minutes)
-        cache.set("all_users", users_data, timeout=300)
-        print("Cache SET: Stored users in cache")
-        return users_data, 200
+        etag = make_etag(USERS)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        return users_catalog.get(), 200, etag_headers(etag)
 
-    @jwt_required()
+    @role_required("admin", error="Unauthorized access")
     def delete(self, user_id):
         """Delete a user and clear cache"""
         user = User.query.get(user_id)
@@ -61,11 +183,11 @@ class UserResource(Resource):
         db.session.commit()
 
         # Clear cache
-        cache.delete("all_users")
+        users_catalog.invalidate()
 
         return {"message": "User deleted successfully"}, 200
 
-    @jwt_required()
+    @role_required("admin", error="Unauthorized access")
     def put(self, user_id):
         """Flag a user"""
         user = User.query.get(user_id)
@@ -81,7 +203,7 @@ class UserResource(Resource):
         db.session.commit()
 
         # Clear cache
-        cache.delete("all_users")
+        users_catalog.invalidate()
 
         return {"message": "User flagged successfully"}, 200
 
@@ -91,29 +213,13 @@ class ServiceResource(Resource):
     # @jwt_required()
     def get(self):
         """Retrieve all services (cached)"""
-        cached_services = cache.get("all_services")
-        if cached_services:
-            print("Cache HIT: Returning cached services")
-            return cached_services, 200
-        print("Cache MISS: Fetching services from DB")
-        services = Service.query.all()
-        services_data = [
-            {
-                "id": service.id,
-                "name": service.name,
-                "description": service.description,
-                "price": service.price,
-                "available": service.available,
-            }
-            for service in services
-        ]
-
-        # Cache for 10 minutes
-        cache.set("all_services", services_data, timeout=600)
-        print("Cache SET: Stored services in cache")
-        return services_data, 200
+        etag = make_etag(SERVICES)
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+        return services_catalog.get(), 200, etag_headers(etag)
 
-    @jwt_required()
+    @role_required("admin")
     def post(self):
         """Add a new service (Admin only)"""
         parser = reqparse.RequestParser()
@@ -131,12 +237,6 @@ class ServiceResource(Resource):
         )
         args = parser.parse_args()
 
-        # Only admins can add services
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        if user.role.name != "admin":
-            return {"error": "Unauthorized"}, 403
-
         new_service = Service(
             name=args["name"], description=args["description"], price=args["price"]
         )
@@ -144,7 +244,7 @@ class ServiceResource(Resource):
         db.session.commit()
 
         # Clear cache
-        cache.delete("all_services")
+        services_catalog.invalidate()
 
         return {
             "message": "Service added successfully",
@@ -156,28 +256,23 @@ class ServiceResource(Resource):
             },
         }, 201
 
-    @jwt_required()
+    @role_required("admin")
     def delete(self, service_id):
         """Delete a service (Admin only)"""
         service = Service.query.get(service_id)
         if not service:
             return {"error": "Service not found"}, 404
 
-        # Only admins can delete services
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        if user.role.name != "admin":
-            return {"error": "Unauthorized"}, 403
-
         db.session.delete(service)
         db.session.commit()
 
-        # Clear cache
-        cache.delete("all_services")
+        # Clear cache (users list the service they offer)
+        services_catalog.invalidate()
+        users_catalog.invalidate()
 
         return {"message": "Service deleted successfully"}, 200
 
-    @jwt_required()
+    @role_required("admin", error="Unauthorized access")
     def put(self, service_id):
         """Toggle availability of a service"""
         service = Service.query.get(service_id)
@@ -188,7 +283,7 @@ class ServiceResource(Resource):
         db.session.commit()
 
         # Clear the cache so the next request fetches updated services
-        cache.delete("all_services")
+        services_catalog.invalidate()
 
         return {
             "message": f"Service {'enabled' if service.available else 'disabled'} successfully",
@@ -196,11 +291,26 @@ class ServiceResource(Resource):
         }, 200
 
 
+# What a customer's request history can show, for `fields=` projections
+CUSTOMER_REQUEST_FIELDS = {
+    "id": lambda req: req.id,
+    "service": lambda req: {"id": req.service.id, "name": req.service.name},
+    "created_at": lambda req: req.created_at.isoformat(),
+    "status": lambda req: req.status,
+    "professional": lambda req: (
+        {"id": req.professional.id, "username": req.professional.username}
+        if req.professional
+        else None
+    ),  # Return professional info if assigned
+    "rating": lambda req: req.rating,
+}
+
+
 # Customer can request, delete, retrieve, and mark service requests complete
 class RequestServiceResource(Resource):
     """API endpoint to request a service"""
 
-    @jwt_required()
+    @role_required("customer", error="Only customers can request services")
     def post(self):
         """Allows a customer to request an available service"""
 
@@ -210,16 +320,12 @@ class RequestServiceResource(Resource):
         )
         args = parser.parse_args()
 
-        current_user_id = get_jwt_identity()
-        customer = User.query.get(current_user_id)
-
-        # Check if the user exists
-        if not customer:
-            return {"error": "User not found"}, 404
-
-        # Check if the user is a customer
-        if customer.role.name != "customer":
-            return {"error": "Only customers can request services"}, 403
+        # The role comes from the token: check that its user still exists
+        # and is not flagged (one query, memoized for the request)
+        if not current_user:
+            return {"error": "User not found"}, 403
+        if current_user.flagged:
+            return {"error": "Your account has been flagged"}, 403
 
         # Check if the service exists
         service = Service.query.get(args["service_id"])
@@ -230,29 +336,26 @@ class RequestServiceResource(Resource):
         if not service.available:
             return {"error": "Service is not available"}, 400
 
-        # Create a new service request
+        # Create a new service request, linked to the customer and service
+        # already loaded so the pushed job needs no further queries
         new_request = ServiceRequest(
-            customer_id=current_user_id, service_id=args["service_id"]
+            customer=current_user._get_current_object(), service=service
         )
         db.session.add(new_request)
+        db.session.flush()  # assigns the id; commit would expire the row
+        job = job_data(new_request)
         db.session.commit()
 
+        # Push the new job to the dashboards of professionals offering it
+        publish(job_channel(args["service_id"]), "service_request", job)
+
         return {"message": "Service request submitted successfully"}, 201
 
-    @jwt_required()
+    @role_required("customer", error="Only customers can cancel service requests")
     def delete(self, request_id):
         """Allows a customer to cancel a service request"""
 
         current_user_id = get_jwt_identity()
-        customer = User.query.get(current_user_id)
-
-        # Check if the user exists
-        if not customer:
-            return {"error": "User not found"}, 404
-
-        # Check if the user is a customer
-        if customer.role.name != "customer":
-            return {"error": "Only customers can cancel service requests"}, 403
 
         # Check if the service request exists
         service_request = ServiceRequest.query.filter_by(
@@ -262,56 +365,77 @@ class RequestServiceResource(Resource):
         if not service_request:
             return {"error": "Service request not found"}, 404
 
-        # Delete the service request
-        db.session.delete(service_request)
+        # Delete the service request only if its rating is still the one
+        # taken out of the totals, so a concurrent rating is never left counted
+        rating = service_request.rating
+        deleted = db.session.execute(
+            delete(ServiceRequest).where(
+                ServiceRequest.id == request_id,
+                (
+                    ServiceRequest.rating.is_(None)
+                    if rating is None
+                    else ServiceRequest.rating == rating
+                ),
+            )
+        ).rowcount
+        if deleted != 1:
+            db.session.rollback()
+            return {"error": "Service request changed, try again"}, 409
+        forget_rating(service_request)
+        mark_deleted(db.session, [service_request])  # a bulk delete skips the hook
         db.session.commit()
+        if rating is not None:
+            users_catalog.invalidate()  # the admin user list shows the averages
 
         return {"message": "Service request deleted successfully"}, 200
 
-    @jwt_required()
+    @role_required("customer", error="Only customers can view their service requests")
     def get(self):
-        """Retrieve all service requests for the logged-in customer"""
+        """Retrieve a page of the logged-in customer's service requests"""
 
         current_user_id = get_jwt_identity()
-        customer = User.query.get(current_user_id)
 
-        # Check if the user exists
-        if not customer:
-            return {"error": "User not found"}, 404
-
-        # Check if the user is a customer
-        if customer.role.name != "customer":
-            return {"error": "Only customers can view their service requests"}, 403
+        etag = make_etag(
+            SERVICE_REQUESTS, USERS, SERVICES, scope=request_scope(current_user_id)
+        )
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
 
-        # Fetch all service requests for the customer
-        service_requests = ServiceRequest.query.filter_by(
-            customer_id=current_user_id
-        ).all()
+        parser = listing_parser()
+        parser.add_argument(
+            "fields",
+            type=field_list(CUSTOMER_REQUEST_FIELDS),
+            location="args",
+            help="{error_msg}",
+        )
+        args = parser.parse_args()
+        fields = args["fields"] or list(CUSTOMER_REQUEST_FIELDS)
+
+        # Newest first, filtered in SQL; related rows are joined in only
+        # when asked for, so a page is one query whatever its size
+        query = ServiceRequest.query.filter_by(customer_id=current_user_id)
+        if "service" in fields:
+            query = query.options(joinedload(ServiceRequest.service))
+        if "professional" in fields:
+            query = query.options(joinedload(ServiceRequest.professional))
+        query = filter_requests(query, args)
+
+        service_requests, next_cursor = paginate_by_id(
+            query, args["cursor"], args["limit"], newest_first=True
+        )
 
         # Convert to JSON format
         requests_data = [
-            {
-                "id": req.id,
-                "service": {
-                    "id": req.service.id,
-                    "name": req.service.name,
-                },
-                "created_at": req.created_at.isoformat(),
-                "status": req.status,
-                "professional": (
-                    {
-                        "id": req.professional.id,
-                        "username": req.professional.username,
-                    }
-                    if req.professional
-                    else None
-                ),  # Return professional info if assigned
-                "rating": req.rating,
-            }
+            {field: CUSTOMER_REQUEST_FIELDS[field](req) for field in fields}
             for req in service_requests
         ]
 
-        return requests_data, 200  # Return JSON response
+        return (
+            {"items": requests_data, "next_cursor": next_cursor},
+            200,
+            etag_headers(etag),
+        )
 
     @jwt_required()
     def patch(self, request_id):
@@ -340,7 +464,10 @@ class RateServiceResource(Resource):
 
         parser = reqparse.RequestParser()
         parser.add_argument(
-            "rating", type=int, required=True, help="Rating is required (1-5)"
+            "rating",
+            type=inputs.int_range(1, 5),
+            required=True,
+            help="Rating is required (1-5)",
         )
         args = parser.parse_args()
 
@@ -359,21 +486,113 @@ class RateServiceResource(Resource):
         if request.rating is not None:
             return {"error": "You have already rated this service"}, 400
 
-        request.rating = args["rating"]
+        # Set the rating only if it is still unset, so a concurrent
+        # duplicate cannot count twice in the totals
+        rated = db.session.execute(
+            update(ServiceRequest)
+            .where(ServiceRequest.id == request_id, ServiceRequest.rating.is_(None))
+            .values(rating=args["rating"])
+        ).rowcount
+        if rated != 1:
+            db.session.rollback()
+            return {"error": "You have already rated this service"}, 400
+
+        record_rating(request, args["rating"])
         db.session.commit()
+        users_catalog.invalidate()  # the admin user list shows the averages
 
         return {"message": "Service request rated successfully"}, 200
 
 
+class LeaderboardResource(Resource):
+    """Best rated professionals of a service, from the running rating totals"""
+
+    @jwt_required()
+    def get(self, service_id):
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            "limit",
+            type=inputs.int_range(1, MAX_LEADERBOARD_SIZE),
+            default=10,
+            location="args",
+        )
+        parser.add_argument(
+            "min_ratings", type=inputs.natural, default=1, location="args"
+        )
+        args = parser.parse_args()
+
+        etag = make_etag(
+            SERVICE_REQUESTS,
+            USERS,
+            SERVICES,
+            scope=request_scope(f"leaderboard:{service_id}"),
+        )
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+
+        service = Service.query.get(service_id)
+        if not service:
+            return {"error": "Service not found"}, 404
+
+        # Walks ix_professional_rating_service_id_average backwards: reads
+        # only the top `limit` rows of the service however many there are
+        rows = (
+            db.session.query(ProfessionalRating, User.username)
+            .join(User, User.id == ProfessionalRating.professional_id)
+            .filter(
+                ProfessionalRating.service_id == service_id,
+                ProfessionalRating.rating_count >= args["min_ratings"],
+            )
+            .order_by(
+                ProfessionalRating.average.desc(),
+                ProfessionalRating.rating_count.desc(),
+            )
+            .limit(args["limit"])
+            .all()
+        )
+
+        return (
+            {
+                "service": {
+                    "id": service.id,
+                    "name": service.name,
+                    "ratings": rating_summary(
+                        db.session.get(ServiceRating, service_id)
+                    ),
+                },
+                "professionals": [
+                    {
+                        "rank": rank,
+                        "id": totals.professional_id,
+                        "username": username,
+                        "ratings": rating_summary(totals),
+                    }
+                    for rank, (totals, username) in enumerate(rows, start=1)
+                ],
+            },
+            200,
+            etag_headers(etag),
+        )
+
+
 # Professional can retrieve and accept a service request
 class ServiceRequestResource(Resource):
-    @jwt_required()
+    @role_required("professional", error="Unauthorized access")
     def get(self):
         """Retrieve service requests for the logged-in professional"""
         user_id = get_jwt_identity()
-        professional = User.query.get(user_id)
 
-        if not professional or professional.role.name != "professional":
+        etag = make_etag(
+            SERVICE_REQUESTS, USERS, SERVICES, scope=request_scope(user_id)
+        )
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+
+        professional = current_user
+
+        if not professional:
             return {"error": "Unauthorized access"}, 403
 
         # Ensure professional has a service
@@ -381,66 +600,104 @@ class ServiceRequestResource(Resource):
             return {"error": "No service assigned"}, 400
 
         # Fetch only service requests that are still pending OR assigned to this professional
-        requests = ServiceRequest.query.filter(
-            (ServiceRequest.service_id == professional.service_id)
-            & (
-                (ServiceRequest.status == "Pending")
-                | (ServiceRequest.professional_id == user_id)
+        requests = (
+            ServiceRequest.query.options(
+                joinedload(ServiceRequest.customer),
+                joinedload(ServiceRequest.service),
             )
-        ).all()
+            .filter(
+                (ServiceRequest.service_id == professional.service_id)
+                & (
+                    (ServiceRequest.status == "Pending")
+                    | (ServiceRequest.professional_id == user_id)
+                )
+            )
+            .all()
+        )
 
-        return [
-            {
-                "id": req.id,
-                "customer_name": req.customer.username,
-                "customer_contact": req.customer.contact_number,
-                "service_name": req.service.name,
-                "service_price": req.service.price,
-                "status": req.status,
-                "created_at": req.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "rating": req.rating,
-            }
-            for req in requests
-        ], 200
+        return (
+            [job_data(req) for req in requests],
+            200,
+            etag_headers(etag),
+        )
 
-    @jwt_required()
+    @role_required("professional", error="Unauthorized access")
     def put(self, request_id):
         """Mark a service request as 'Accepted'"""
         current_user_id = get_jwt_identity()
 
-        service_request = ServiceRequest.query.get(request_id)
-        if not service_request:
-            return {"error": "Service request not found"}, 404
+        if not claim_service_request(request_id, current_user_id):
+            # Only the failure path needs to know why
+            if not db.session.get(ServiceRequest, request_id):
+                return {"error": "Service request not found"}, 404
+            return {"error": "Service request already accepted"}, 409
 
-        # Check if the request is already accepted
-        if service_request.status == "Accepted":
-            return {"error": "Service request already accepted"}, 400
+        # Take the job off the dashboards of the other professionals offering it
+        service_id = db.session.get(ServiceRequest, request_id).service_id
+        publish(job_channel(service_id), "service_request_claimed", {"id": request_id})
 
-        # Update status to 'Accepted'
-        service_request.status = "Accepted"
-        service_request.professional_id = current_user_id  # Assign the professional
+        return {"message": "Service request accepted successfully"}, 200
 
-        db.session.commit()
 
-        return {"message": "Service request accepted successfully"}, 200
+class ServiceRequestFeedResource(Resource):
+    """Server-Sent Events feed of new pending requests for a professional.
+
+    Claims are pushed too, so a job another professional took leaves the list.
+    """
+
+    # EventSource cannot set headers, so the token comes as ?jwt=
+    @role_required(
+        "professional", error="Unauthorized access", locations=["query_string"]
+    )
+    def get(self):
+        service_id = current_user.service_id
+        if not service_id:
+            return {"error": "No service assigned"}, 400
+        return event_stream(job_channel(service_id))
+
+
+# Admin dashboard figures, from the analytics rollups
+class AdminAnalyticsResource(Resource):
+    @role_required("admin", error="Unauthorized access")
+    def get(self):
+        """Request counts by status, service and day, and revenue"""
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            "days", type=inputs.int_range(1, 366), default=30, location="args"
+        )
+        args = parser.parse_args()
+
+        return analytics_summary(args["days"]), 200
 
 
 # Admin can retrieve all the service requests
 class AdminServiceRequestsResource(Resource):
     """Retrieve all service requests (Admin only)"""
 
-    @jwt_required()
+    @role_required("admin", error="Unauthorized access")
     def get(self):
-        """Fetch all service requests with details"""
-        current_user_id = get_jwt_identity()
-        admin = User.query.get(current_user_id)
+        """Fetch a page of service requests with details"""
+        etag = make_etag(SERVICE_REQUESTS, USERS, SERVICES, scope=request_scope())
+        cached_response = not_modified(etag)
+        if cached_response:
+            return cached_response
+
+        parser = listing_parser()
+        parser.add_argument("service_id", type=int, location="args")
+        args = parser.parse_args()
 
-        # Check if the user is an admin
-        if not admin or admin.role.name != "admin":
-            return {"error": "Unauthorized access"}, 403
+        # Filters are applied in SQL and the related rows are joined in,
+        # so each page costs a single query
+        query = ServiceRequest.query.options(
+            joinedload(ServiceRequest.service),
+            joinedload(ServiceRequest.customer),
+            joinedload(ServiceRequest.professional),
+        )
+        query = filter_requests(query, args)
+        if args["service_id"]:
+            query = query.filter(ServiceRequest.service_id == args["service_id"])
 
-        # Retrieve all service requests
-        requests = ServiceRequest.query.all()
+        requests, next_cursor = paginate_by_id(query, args["cursor"], args["limit"])
         request_list = []
 
         for req in requests:
@@ -465,7 +722,11 @@ class AdminServiceRequestsResource(Resource):
                 }
             )
 
-        return request_list, 200
+        return (
+            {"items": request_list, "next_cursor": next_cursor},
+            200,
+            etag_headers(etag),
+        )
 
 
 # Customers and Professionals can fetch and update their profiles
@@ -475,21 +736,21 @@ class UserProfileResource(Resource):
     @jwt_required()
     def get(self):
         """Retrieve the profile of the logged-in user"""
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
 
         if not user:
             return {"error": "User not found"}, 404
 
+        role = current_role()
         return {
             "id": user.id,
             "username": user.username,
             "email": user.email,
-            "role": user.role.name,
+            "role": role,
             "flagged": user.flagged,
             "service_offered": (
                 Service.query.get(user.service_id).name
-                if user.role.name == "professional" and user.service_id
+                if role == "professional" and user.service_id
                 else None
             ),
         }, 200
@@ -504,8 +765,7 @@ class UserProfileResource(Resource):
         parser.add_argument("new_password", type=str, required=False)
         args = parser.parse_args()
 
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user
 
         if not user:
             return {"error": "User not found"}, 404
@@ -520,51 +780,162 @@ class UserProfileResource(Resource):
 
         # Update password if provided
         if args["old_password"] and args["new_password"]:
-            if not verify_password(user.password, args["old_password"]):
+            if not verify_password(args["old_password"], user.password):
                 return {"error": "Old password is incorrect"}, 400
 
-            user.password_hash = hash_password(args["new_password"])
+            user.password = hash_password(args["new_password"])
 
         db.session.commit()
 
         # Clear the cache for all users to reflect updated data
-        cache.delete("all_users")
+        users_catalog.invalidate()
 
         return {"message": "Profile updated successfully"}, 200
 
 
 # Admin can export CSV of service requests which are "Completed"
 class ExportCSVResource(Resource):
-    """Triggers a background CSV export job"""
+    """Triggers a background export job (CSV, JSONL or XLSX)"""
 
-    @jwt_required()
+    @role_required("admin", error="Unauthorized access")
     def post(self):
-        """Trigger the CSV export and return task ID"""
-        task = export_service_requests.delay()
+        """Return the export of the current data if it was already written,
+        else trigger the export and return task ID"""
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            "format",
+            choices=sorted(WRITERS),
+            default="csv",
+            location="args",
+            help="Export format: {error_msg}",
+        )
+        parser.add_argument(
+            "compress", type=inputs.boolean, default=False, location="args"
+        )
+        # Only the rows updated since the last export with the same filters
+        parser.add_argument(
+            "incremental", type=inputs.boolean, default=False, location="args"
+        )
+        # Filters, applied by the export query (Completed requests by default)
+        parser.add_argument("status", type=str, location="args")
+        parser.add_argument("service_id", type=int, location="args")
+        parser.add_argument("professional_id", type=int, location="args")
+        parser.add_argument("created_from", type=inputs.date, location="args")
+        parser.add_argument("created_to", type=inputs.date, location="args")
+        args = parser.parse_args()
+
+        filters = export_filters(args)
+        plan = plan_export(
+            args["compress"], args["incremental"], args["format"], filters
+        )
+        if cached_export(plan):
+            return export_status("SUCCESS", plan.filename), 200
+
+        task = export_service_requests.delay(
+            compress=args["compress"],
+            incremental=args["incremental"],
+            export_format=args["format"],
+            filters=filters,
+        )
         return {"message": "Export started", "task_id": task.id}, 202
 
-    @jwt_required()
+    @role_required("admin", error="Unauthorized access")
     def get(self, task_id):
         """Check the status of a Celery task"""
         task_result = AsyncResult(task_id, backend=export_service_requests.backend)
+        status = export_status(task_result.state, task_result.info)
+        return status, TASK_STATUS_CODES.get(status["status"], 202)
 
-        if task_result.state == "PENDING":
-            return {"status": "Pending"}, 202
-        elif task_result.state == "SUCCESS":
-            # return {"status": "Completed", "file": task_result.result}, 200
-            filename = task_result.result  # Filename returned by Celery
-            return {"status": "Completed", "file": f"/download/{filename}"}, 200
-        elif task_result.state == "FAILURE":
-            return {"status": "Failed", "error": str(task_result.info)}, 500
-        else:
-            return {"status": task_result.state}, 202
+
+class ExportStatusStreamResource(Resource):
+    """Server-Sent Events stream of an export's progress, ending with its result"""
+
+    @role_required("admin", error="Unauthorized access", locations=["query_string"])
+    def get(self, task_id):
+        def snapshot():
+            task_result = AsyncResult(task_id, backend=export_service_requests.backend)
+            return [("status", export_status(task_result.state, task_result.info))]
+
+        return event_stream(
+            export_channel(task_id),
+            snapshot=snapshot,
+            done=lambda event, data: data["status"] in TASK_STATUS_CODES,
+        )
+
+
+# Admin can bulk import services and professionals
+class ImportResource(Resource):
+    """Starts a background import of a CSV or JSONL upload"""
+
+    ALLOWED_EXTENSIONS = {"csv", "jsonl"}
+
+    @role_required("admin", error="Unauthorized access")
+    def post(self, kind):
+        """Save the upload and hand it to the import task"""
+        if kind not in IMPORTERS:
+            return {"error": f"Cannot import {kind}"}, 404
+
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            "file",
+            type=FileStorage,
+            location="files",
+            required=True,
+            help="A CSV or JSONL file is required",
+        )
+        upload = parser.parse_args()["file"]
+
+        extension = upload.filename.rsplit(".", 1)[-1].lower()
+        if extension not in self.ALLOWED_EXTENSIONS:
+            return {"error": "Only .csv and .jsonl files can be imported"}, 400
+
+        # Streamed to disk; the task reads it back in chunks
+        path = os.path.join(IMPORT_FOLDER, f"{kind}_{uuid4().hex}.{extension}")
+        upload.save(path)
+
+        task = import_records.delay(kind, path)
+        return {"message": "Import started", "task_id": task.id}, 202
+
+    @role_required("admin", error="Unauthorized access")
+    def get(self, task_id):
+        """Check the status of an import task"""
+        task_result = AsyncResult(task_id, backend=import_records.backend)
+        status = import_status(task_result.state, task_result.info)
+        return status, TASK_STATUS_CODES.get(status["status"], 202)
+
+
+class DocumentResource(Resource):
+    """A professional's uploaded document, for admins reviewing applicants"""
+
+    @role_required(
+        "admin", error="Unauthorized access", locations=["headers", "query_string"]
+    )
+    def get(self, document_id):
+        """Serve the stored file; Range requests get 206 partial content"""
+        document = db.session.get(Document, document_id)
+        if document is None or not os.path.exists(document_path(document_id)):
+            return {"error": "Document not found"}, 404
+
+        response = send_file(
+            document_path(document_id),
+            mimetype=document.content_type,
+            conditional=True,
+            etag=document_id,  # content-addressed: the hash is the version
+        )
+        response.headers["X-Document-Status"] = document.status
+        response.cache_control.private = True
+        response.cache_control.max_age = 3600
+        return response
 
 
 # Admin can download CSV exported in browser
 class DownloadCSVResource(Resource):
-    """Serves the exported CSV file for download"""
+    """Serves an export file (CSV, JSONL or XLSX) for download"""
 
-    # @jwt_required()
+    # Followed as a plain link, so the token may come in ?jwt=
+    @role_required(
+        "admin", error="Unauthorized access", locations=["headers", "query_string"]
+    )
     def get(self, filename):
         """Serve the file if it exists"""
         file_path = os.path.join(EXPORT_FOLDER, filename)
@@ -1,9 +1,14 @@
-import os
-from flask import Blueprint, request, jsonify, render_template
-from flask_security.utils import verify_password, hash_password
-from werkzeug.utils import secure_filename
-from backend.models import db, User, Role, RevokedToken
-from backend.extensions import cache
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+from backend.models import db, Document, User, Role
+from backend.catalog_cache import users_catalog
+from backend.token_blocklist import is_token_revoked, revoke_token
+from backend.auth import load_request_user
+from backend.assets import render_index
+from backend.passwords import hash_password, verify_and_update_password
+from backend.documents import store_document, upload_allowed
+from backend.celery_worker import validate_document
 from flask_jwt_extended import (
     create_access_token,
     jwt_required,
@@ -11,12 +16,8 @@ from flask_jwt_extended import (
     get_jwt,
 )
 
-UPLOAD_FOLDER = "frontend/static/uploads"
 ALLOWED_EXTENSIONS = {"pdf"}  # only pdf files
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
 
 auth_bp = Blueprint("auth", __name__)
 main_bp = Blueprint("main", __name__)
@@ -24,7 +25,7 @@ main_bp = Blueprint("main", __name__)
 
 @main_bp.route("/")
 def index():
-    return render_template("index.html")
+    return render_index()
 
 
 # jwt management
@@ -37,7 +38,10 @@ def init_jwt(app):
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
         jti = jwt_payload["jti"]
-        return RevokedToken.is_revoked(jti)
+        return is_token_revoked(jti)
+
+    # Resolves current_user lazily, at most once per request
+    jwt.user_lookup_loader(load_request_user)
 
     return jwt
 
@@ -49,14 +53,14 @@ def login():
     password = data.get("password")
 
     user = User.query.filter_by(email=email).first()
-    if user and verify_password(password, user.password):
+    if user and verify_and_update_password(password, user):
+        db.session.commit()  # saves the upgraded hash, if it was rehashed
         if user.flagged:
             return jsonify({"error": "Your account has been flagged"}), 403
-        access_token = create_access_token(identity=str(user.id))
-        return (
-            jsonify(access_token=access_token.decode("utf-8"), role=user.role.name),
-            200,
+        access_token = create_access_token(
+            identity=str(user.id), additional_claims={"role": user.role.name}
         )
+        return jsonify(access_token=access_token, role=user.role.name), 200
     return jsonify({"error": "Invalid credentials"}), 401
 
 
@@ -70,10 +74,8 @@ def logout():
         if not jti or not subject:
             return jsonify({"error": "Invalid token"}), 400
 
-        if not RevokedToken.is_revoked(jti):
-            revoked_token = RevokedToken(jti=jti)
-            db.session.add(revoked_token)
-            db.session.commit()
+        expires_at = datetime.fromtimestamp(get_jwt()["exp"], timezone.utc)
+        revoke_token(jti, expires_at.replace(tzinfo=None))  # naive UTC, as stored
         return jsonify({"message": "Logged out successfully"}), 200
 
     except Exception as e:
@@ -84,6 +86,36 @@ def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+@auth_bp.route("/documents", methods=["POST"])
+def upload_document():
+    """Stream a professional's PDF into the document store before registering.
+
+    The raw request body is the file (Content-Type: application/pdf).
+    Uploads are rate limited per client address (DOCUMENT_UPLOADS_PER_HOUR).
+    Returns the document id to pass to /auth/register as document_id.
+    """
+    if not upload_allowed(request.remote_addr):
+        return jsonify({"error": "Too many uploads, try again later"}), 429
+    if request.mimetype != "application/pdf":
+        return jsonify({"error": "Documents must be PDF files"}), 415
+    try:
+        document, created = store_document(
+            request.stream, content_length=request.content_length
+        )
+    except RequestEntityTooLarge as e:
+        return jsonify({"error": e.description}), 413
+    db.session.commit()
+    if created:
+        validate_document.delay(document.sha256)
+
+    return (
+        jsonify(
+            document_id=document.sha256, size=document.size, status=document.status
+        ),
+        201 if created else 200,
+    )
+
+
 @auth_bp.route("/register", methods=["POST"])
 def register():
 
@@ -116,21 +148,26 @@ def register():
     if not role:
         return jsonify({"error": "Invalid role selected"}), 400
 
-    document_path = None
+    document, created = None, False
     if role_name == "professional":
-        if "document" not in request.files:
+        document_id = (data or request.form).get("document_id")
+        if document_id:  # uploaded beforehand through /auth/documents
+            document = db.session.get(Document, document_id)
+            if document is None:
+                return jsonify({"error": "Unknown document"}), 400
+        elif "document" in request.files:
+            upload = request.files["document"]
+            if not allowed_file(upload.filename):
+                return jsonify({"error": "Invalid file type"}), 400
+            try:
+                document, created = store_document(upload.stream)
+            except RequestEntityTooLarge as e:
+                return jsonify({"error": e.description}), 413
+        else:
             return jsonify({"error": "Document is required for professionals"}), 400
 
-        document = request.files["document"]
-        if document and allowed_file(document.filename):
-            # filename = secure_filename(document.filename)
-            ext = document.filename.rsplit(".", 1)[1].lower()
-            unique_filename = f"{email.replace('@', '_').replace('.', '_')}.{ext}"
-            save_path = os.path.join(os.getcwd(), UPLOAD_FOLDER, unique_filename)
-            document.save(save_path)
-            document_path = f"static/uploads/{unique_filename}"
-        else:
-            return jsonify({"error": "Invalid file type"}), 400
+        if document.status == "invalid":
+            return jsonify({"error": document.error or "Invalid document"}), 400
 
     new_user = User(
         username=username,
@@ -139,13 +176,15 @@ def register():
         contact_number=contact_number,
         flagged=False,
         role_id=role.id,
-        document_path=document_path,
+        document_id=document.sha256 if document else None,
         service_id=service_id,
     )
     db.session.add(new_user)
     db.session.commit()
+    if created:
+        validate_document.delay(document.sha256)
 
     # invalid cache after registering new user
-    cache.delete("all_users")
+    users_catalog.invalidate()
 
     return jsonify({"message": "User registered successfully"}), 201
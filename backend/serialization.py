@@ -0,0 +1,34 @@
+from flask import current_app, make_response
+from flask_restful.representations.json import output_json as stdlib_json
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+
+def orjson_output(data, code, headers=None):
+    """Flask-RESTful representation encoding with orjson (Rust, ~5-10x faster)"""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    if current_app.debug:
+        option |= orjson.OPT_INDENT_2
+    response = make_response(orjson.dumps(data, option=option), code)
+    response.mimetype = "application/json"
+    response.headers.extend(headers or {})
+    return response
+
+
+# JSON_SERIALIZER choices
+SERIALIZERS = {"json": stdlib_json}
+if orjson is not None:
+    SERIALIZERS["orjson"] = orjson_output
+
+
+def init_json(app, api):
+    """Register the JSON_SERIALIZER encoder as the Api's application/json
+    representation, or the stdlib one if that encoder is not installed"""
+    name = app.config["JSON_SERIALIZER"]
+    if name not in SERIALIZERS:
+        app.logger.warning("JSON serializer %r is not available, using json", name)
+        name = "json"
+    api.representations["application/json"] = SERIALIZERS[name]
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+from backend.extensions import cache
+from backend.models import db, RevokedToken
+
+# Revoked tokens are cached in Redis under this prefix until they expire,
+# so checking a token that was never revoked costs one Redis lookup and
+# no database query. The in-process LRU only remembers revoked tokens.
+REVOKED_KEY_PREFIX = "revoked_token:"
+LOCAL_CACHE_SIZE = 10000
+# Set, without expiry, once every live revocation has been published.
+# Missing after a Redis flush or on a new Redis: the keys above are then
+# reloaded from the database before a miss is trusted again. Redis must
+# not evict keys (maxmemory-policy noeviction) for misses to be reliable.
+LOADED_KEY = "revoked_tokens:loaded"
+RELOAD_LOCK_KEY = "revoked_tokens:reloading"
+RELOAD_LOCK_TIMEOUT = 60
+
+# Rows written before expires_at existed are pruned after this long
+LEGACY_TOKEN_MAX_AGE = timedelta(days=1)
+
+_local_revoked = OrderedDict()  # jti -> expires_at
+_local_lock = Lock()
+
+
+def _remember(jti, expires_at):
+    with _local_lock:
+        _local_revoked[jti] = expires_at
+        _local_revoked.move_to_end(jti)
+        while len(_local_revoked) > LOCAL_CACHE_SIZE:
+            _local_revoked.popitem(last=False)
+
+
+def _locally_revoked(jti):
+    with _local_lock:
+        expires_at = _local_revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= datetime.utcnow():
+            del _local_revoked[jti]
+            return False
+        _local_revoked.move_to_end(jti)
+        return True
+
+
+def cache_revocation(jti, expires_at):
+    """Cache a revoked token for the rest of its lifetime"""
+    ttl = int((expires_at - datetime.utcnow()).total_seconds())
+    if ttl <= 0:
+        return
+    _remember(jti, expires_at)
+    try:
+        cache.set(REVOKED_KEY_PREFIX + jti, True, timeout=ttl)
+    except Exception as e:
+        print(f"Failed to cache revoked token {jti}: {e}")
+
+
+def revoke_token(jti, expires_at):
+    """Persist a revoked token and publish it to the caches"""
+    if not RevokedToken.is_revoked(jti):
+        db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+        db.session.commit()
+    cache_revocation(jti, expires_at)
+
+
+def is_token_revoked(jti):
+    """Check revocation via the local LRU, then Redis, then the database.
+
+    The database is only consulted when Redis cannot be reached or while
+    its revocations are being reloaded (see LOADED_KEY).
+    """
+    if _locally_revoked(jti):
+        return True
+    try:
+        revoked, loaded = cache.get_many(REVOKED_KEY_PREFIX + jti, LOADED_KEY)
+        if loaded is None:
+            _reload_revocations()
+            return RevokedToken.is_revoked(jti)
+        return revoked is not None
+    except Exception as e:
+        print(f"Revocation cache unavailable, checking DB: {e}")
+        return RevokedToken.is_revoked(jti)
+
+
+def _reload_revocations():
+    """Publish the revocations again after Redis lost them, in one worker"""
+    if not cache.add(RELOAD_LOCK_KEY, True, timeout=RELOAD_LOCK_TIMEOUT):
+        return  # another worker is reloading
+    try:
+        publish_revocations()
+    finally:
+        cache.delete(RELOAD_LOCK_KEY)
+
+
+def publish_revocations():
+    """Cache every revoked token still alive, then mark Redis as complete"""
+    live_tokens = db.session.query(
+        RevokedToken.jti, RevokedToken.expires_at, RevokedToken.created_at
+    )
+    for jti, expires_at, created_at in live_tokens:
+        cache_revocation(jti, expires_at or created_at + LEGACY_TOKEN_MAX_AGE)
+    cache.set(LOADED_KEY, True, timeout=0)
+
+
+def prune_revoked_tokens():
+    """Delete expired revoked tokens and re-publish the live ones to Redis.
+
+    Re-publishing keeps the cache authoritative if Redis was flushed.
+    Returns the number of deleted rows.
+    """
+    now = datetime.utcnow()
+    deleted = RevokedToken.query.filter(
+        (RevokedToken.expires_at < now)
+        | (
+            RevokedToken.expires_at.is_(None)
+            & (RevokedToken.created_at < now - LEGACY_TOKEN_MAX_AGE)
+        )
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+    publish_revocations()
+    return deleted
@@ -0,0 +1,144 @@
+"""Contention benchmark for accepting service requests.
+
+Several professionals race to claim the same pending requests. Reports
+claims per second and counts requests that more than one professional
+believes they won (double assignments).
+
+    python benchmarks/claim_contention.py --threads 8 --requests 500
+    python benchmarks/claim_contention.py --mode legacy  # read-check-write
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from backend.config import Config
+
+if "DATABASE_URL" not in os.environ:
+    Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "claim_contention.db"
+    )
+Config.CACHE_TYPE = "SimpleCache"  # no Redis needed for the ETag version bumps
+
+from app import app  # noqa: E402
+from backend.models import db, Role, Service, ServiceRequest, User  # noqa: E402
+from backend.resources import claim_service_request  # noqa: E402
+
+
+def legacy_claim(request_id, professional_id):
+    """The previous accept path: read, check in Python, then write"""
+    service_request = db.session.get(ServiceRequest, request_id)
+    if service_request.status == "Accepted":
+        return False
+    service_request.status = "Accepted"
+    service_request.professional_id = professional_id
+    db.session.commit()
+    return True
+
+
+def seed(professionals, requests):
+    db.drop_all()
+    db.create_all()
+    role = Role(name="professional")
+    service = Service(name="Plumbing", price=100.0)
+    db.session.add_all([role, service])
+    db.session.flush()
+
+    users = [
+        User(
+            username=f"bench{i}",
+            email=f"bench{i}@example.com",
+            password="-",
+            role_id=role.id,
+            service_id=service.id,
+            fs_uniquifier=uuid4().hex,
+        )
+        for i in range(professionals + 1)
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+
+    customer = users.pop()
+    db.session.add_all(
+        ServiceRequest(customer_id=customer.id, service_id=service.id)
+        for _ in range(requests)
+    )
+    db.session.commit()
+    return [user.id for user in users], [r.id for r in ServiceRequest.query.all()]
+
+
+def run(claim, professional_ids, request_ids):
+    wins = Counter()
+    wins_lock = threading.Lock()
+    errors = []
+    start = threading.Barrier(len(professional_ids) + 1)
+
+    def worker(professional_id):
+        ids = request_ids[:]
+        random.shuffle(ids)
+        with app.app_context():
+            start.wait()
+            for request_id in ids:
+                try:
+                    won = claim(request_id, professional_id)
+                except Exception as e:  # e.g. "database is locked"
+                    db.session.rollback()
+                    errors.append(e)
+                    continue
+                if won:
+                    with wins_lock:
+                        wins[request_id] += 1
+
+    threads = [
+        threading.Thread(target=worker, args=(professional_id,))
+        for professional_id in professional_ids
+    ]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return wins, errors, time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--mode", choices=("cas", "legacy"), default="cas")
+    args = parser.parse_args()
+
+    claim = claim_service_request if args.mode == "cas" else legacy_claim
+    with app.app_context():
+        professional_ids, request_ids = seed(args.threads, args.requests)
+
+    wins, errors, elapsed = run(claim, professional_ids, request_ids)
+    attempts = len(professional_ids) * len(request_ids)
+
+    with app.app_context():
+        unclaimed = ServiceRequest.query.filter_by(professional_id=None).count()
+
+    print(f"mode:                 {args.mode}")
+    print(f"threads x requests:   {args.threads} x {args.requests}")
+    print(f"claim attempts/s:     {attempts / elapsed:,.0f}")
+    print(f"successful claims/s:  {sum(wins.values()) / elapsed:,.0f}")
+    print(f"unclaimed requests:   {unclaimed}")
+    print(f"errors:               {len(errors)}")
+    double = sum(1 for count in wins.values() if count > 1)
+    print(f"double assignments:   {double}")
+    return 1 if double else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
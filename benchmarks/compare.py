@@ -0,0 +1,67 @@
+"""Compare two endpoint benchmark results.
+
+    python benchmarks/compare.py results/abc1234.json results/def5678.json
+
+Exits with status 1 when any case got slower than --threshold at p50 or
+p99, or now issues more SQL statements per request.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report, {
+        (run["scale"], result["name"]): result
+        for run in report["runs"]
+        for result in run["results"]
+    }
+
+
+def change(old, new):
+    return (new - old) / old if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    base_report, baseline = load(args.baseline)
+    cand_report, candidate = load(args.candidate)
+    print(f"baseline {base_report['commit']}  ->  candidate {cand_report['commit']}")
+    print(f"{'scale':>8} {'case':<26} {'p50 ms':>17} {'p99 ms':>17} {'queries':>11}")
+
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[key], candidate[key]
+        slower = [
+            change(old[metric], new[metric]) > args.threshold
+            for metric in ("p50_ms", "p99_ms")
+        ]
+        more_queries = new["queries_per_request"] > old["queries_per_request"]
+        flag = " <-- regression" if any(slower) or more_queries else ""
+        regressions += bool(flag)
+        print(
+            f"{key[0]:>8} {key[1]:<26}"
+            f" {old['p50_ms']:>7.2f} -> {new['p50_ms']:<7.2f}"
+            f" {old['p99_ms']:>7.2f} -> {new['p99_ms']:<7.2f}"
+            f" {old['queries_per_request']:>4g} -> {new['queries_per_request']:<4g}{flag}"
+        )
+
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        side = "baseline" if key in baseline else "candidate"
+        print(f"{key[0]:>8} {key[1]:<26} only in {side}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+"""Latency and query-count benchmark for every API resource.
+
+Builds a synthetic dataset (see synthetic.py), then drives each endpoint
+registered in app.py through the Flask test client and reports p50/p99
+latency, SQL statements per request and peak Python memory of a single
+request. Results are written as JSON so runs can be compared with
+benchmarks/compare.py.
+
+    python benchmarks/endpoints.py --scale 10000 100000 --iterations 50
+    python benchmarks/endpoints.py --only admin.requests users.list
+
+A case answered with an error status aborts the run, so a rejected
+request is never reported as an endpoint's latency. So does a method of
+a registered resource that no case drives and SKIPPED does not list.
+
+BCRYPT_ROUNDS defaults to 4 here, so the login and register numbers show
+the app's own overhead; login_throughput.py measures bcrypt itself.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from flask_restful import Resource  # noqa: E402
+from benchmarks.synthetic import PASSWORD, bench_app, build_dataset  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Registered resources (or Resource.method) that are not benchmarked, and why
+SKIPPED = {
+    "ExportCSVResource": "runs on a Celery worker",
+    "ImportResource": "runs on a Celery worker",
+    "ExportStatusStreamResource": "long-lived event stream",
+    "ServiceRequestFeedResource": "long-lived event stream",
+    "DownloadCSVResource": "needs an export file on disk",
+    "UserResource.delete": "destroys the dataset it measures",
+    "ServiceResource.delete": "destroys the dataset it measures",
+}
+
+
+class Case:
+    """One endpoint call; `request(i)` gives (path, user id, json body) for run i.
+
+    A `conditional` case replays the ETag of its warm-up response in
+    If-None-Match, measuring the 304 path; `headers` go with every call.
+    """
+
+    def __init__(self, name, method, role, request, conditional=False, headers=None):
+        self.name = name
+        self.method = method
+        self.role = role
+        self.request = request
+        self.conditional = conditional
+        self.headers = headers or {}
+
+
+def cases(data):
+    customer = data["customer_ids"][0]
+    # toggled by users.flag, so never the customer the other cases act as
+    flagged = data["customer_ids"][1]
+    professional = data["professional_ids"][0]
+    admin = data["admin_id"]
+    requests = data["requests"]
+    middle_id = requests[len(requests) // 2][0]
+    document = f"/api/documents/{data['document_id']}"
+
+    def pool(status, rated=None):
+        return [
+            (request_id, customer_id)
+            for request_id, customer_id, request_status, rating in requests
+            if request_status == status and (rated is None or rated == bool(rating))
+        ]
+
+    pending, accepted = pool("Pending"), pool("Accepted")
+    completed_unrated = pool("Completed", rated=False)
+    # accept, delete and complete each use their own rows
+    to_accept, to_delete = pending[::2], pending[1::2]
+
+    def each(rows, path):
+        def request(i):
+            request_id, customer_id = rows[i % len(rows)]
+            return path.format(request_id), customer_id, None
+
+        return request
+
+    return [
+        Case("users.list", "GET", "admin", lambda i: ("/api/users", admin, None)),
+        Case(
+            "users.list.conditional",
+            "GET",
+            "admin",
+            lambda i: ("/api/users", admin, None),
+            conditional=True,
+        ),
+        Case("services.list", "GET", None, lambda i: ("/api/services", None, None)),
+        Case(
+            "customer.requests",
+            "GET",
+            "customer",
+            lambda i: ("/api/request-service", customer, None),
+        ),
+        Case(
+            "professional.feed",
+            "GET",
+            "professional",
+            lambda i: ("/api/service-requests", professional, None),
+        ),
+        Case(
+            "admin.requests",
+            "GET",
+            "admin",
+            lambda i: ("/api/admin/service-requests", admin, None),
+        ),
+        Case(
+            "admin.requests.conditional",
+            "GET",
+            "admin",
+            lambda i: ("/api/admin/service-requests", admin, None),
+            conditional=True,
+        ),
+        Case(
+            "admin.requests.filtered",
+            "GET",
+            "admin",
+            lambda i: (
+                "/api/admin/service-requests?status=Completed&service_id=1",
+                admin,
+                None,
+            ),
+        ),
+        Case(
+            "admin.requests.deep_page",
+            "GET",
+            "admin",
+            lambda i: (f"/api/admin/service-requests?cursor={middle_id}", admin, None),
+        ),
+        Case(
+            "leaderboard",
+            "GET",
+            "customer",
+            lambda i: ("/api/services/1/leaderboard", customer, None),
+        ),
+        Case(
+            "admin.analytics",
+            "GET",
+            "admin",
+            lambda i: ("/api/admin/analytics?days=90", admin, None),
+        ),
+        Case("document.get", "GET", "admin", lambda i: (document, admin, None)),
+        Case(
+            "document.range",
+            "GET",
+            "admin",
+            lambda i: (document, admin, None),
+            headers={"Range": "bytes=0-65535"},
+        ),
+        Case(
+            "profile.get",
+            "GET",
+            "customer",
+            lambda i: ("/api/user-profile", customer, None),
+        ),
+        Case(
+            "profile.update",
+            "PUT",
+            "customer",
+            lambda i: ("/api/user-profile", customer, {"username": f"renamed{i}"}),
+        ),
+        Case(
+            "request.create",
+            "POST",
+            "customer",
+            lambda i: (
+                "/api/request-service",
+                customer,
+                {"service_id": data["service_ids"][i % len(data["service_ids"])]},
+            ),
+        ),
+        Case(
+            "request.accept",
+            "PUT",
+            "professional",
+            lambda i: (
+                f"/api/service-requests/{to_accept[i % len(to_accept)][0]}/accept",
+                professional,
+                None,
+            ),
+        ),
+        Case(
+            "request.complete",
+            "PATCH",
+            "customer",
+            each(accepted, "/api/request-service/{}/complete"),
+        ),
+        Case(
+            "request.rate",
+            "POST",
+            "customer",
+            lambda i: (
+                *each(completed_unrated, "/api/request-service/{}/rate")(i)[:2],
+                {"rating": i % 5 + 1},
+            ),
+        ),
+        Case(
+            "request.delete",
+            "DELETE",
+            "customer",
+            each(to_delete, "/api/request-service/{}"),
+        ),
+        Case(
+            "users.flag",
+            "PUT",
+            "admin",
+            lambda i: (f"/api/users/{flagged}/flag", admin, None),
+        ),
+        Case(
+            "services.create",
+            "POST",
+            "admin",
+            lambda i: (
+                "/api/services",
+                admin,
+                {"name": f"Bench {i}", "description": "benchmark", "price": 10.0},
+            ),
+        ),
+        Case(
+            "services.toggle",
+            "PUT",
+            "admin",
+            lambda i: ("/api/services/1/toggle-availability", admin, None),
+        ),
+        Case(
+            "auth.login",
+            "POST",
+            None,
+            lambda i: (
+                "/auth/login",
+                None,
+                {"email": f"customer{customer}@example.com", "password": PASSWORD},
+            ),
+        ),
+        Case(
+            "auth.register",
+            "POST",
+            None,
+            lambda i: (
+                "/auth/register",
+                None,
+                {
+                    "username": f"bench{i}-{time.time_ns()}",
+                    "email": f"bench{i}-{time.time_ns()}@example.com",
+                    "password": PASSWORD,
+                    "role": "customer",
+                },
+            ),
+        ),
+    ]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def resource_method(app, case):
+    """`Class.method` of the resource a case calls, None for a plain Flask route"""
+    path = case.request(0)[0].split("?")[0]
+    endpoint, _ = app.url_map.bind("localhost").match(path, method=case.method)
+    view_class = getattr(app.view_functions[endpoint], "view_class", None)
+    if view_class is None or not issubclass(view_class, Resource):
+        return None
+    return f"{view_class.__name__}.{case.method.lower()}"
+
+
+def unbenchmarked(app, all_cases):
+    """Methods of registered resources neither driven by a case nor SKIPPED"""
+    driven = {resource_method(app, case) for case in all_cases}
+    missing = set()
+    for view in app.view_functions.values():
+        view_class = getattr(view, "view_class", None)
+        if view_class is None or not issubclass(view_class, Resource):
+            continue
+        for method in view_class.methods:
+            name = f"{view_class.__name__}.{method.lower()}"
+            if name not in driven and not {name, view_class.__name__} & SKIPPED.keys():
+                missing.add(name)
+    return sorted(missing)
+
+
+def run_case(app, client, case, iterations, tokens, counter):
+    headers = dict(case.headers)
+
+    def call(i):
+        path, user_id, body = case.request(i)
+        if user_id is not None:
+            headers["Authorization"] = f"Bearer {tokens(user_id, case.role)}"
+        return client.open(path, method=case.method, json=body, headers=headers)
+
+    warm_up = call(0)  # warm up caches and code paths
+    if case.conditional and warm_up.headers.get("ETag"):
+        headers["If-None-Match"] = warm_up.headers["ETag"]
+
+    latencies, statuses, queries = [], Counter(), 0
+    for i in range(1, iterations + 1):
+        counter.count = 0
+        began = time.perf_counter()
+        response = call(i)
+        latencies.append(time.perf_counter() - began)
+        statuses[response.status_code] += 1
+        queries += counter.count
+
+    # A rejected request measures the error path, not the endpoint
+    failed = {code: count for code, count in statuses.items() if code >= 400}
+    if warm_up.status_code >= 400 or failed:
+        raise RuntimeError(
+            f"{case.name}: unexpected statuses {failed or warm_up.status_code}"
+            f" ({warm_up.get_data(as_text=True)[:200]})"
+        )
+
+    gc.collect()
+    tracemalloc.start()
+    call(iterations + 1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "name": case.name,
+        "method": case.method,
+        "path": case.request(0)[0],
+        "iterations": iterations,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3
+        ),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "queries_per_request": round(queries / iterations, 2),
+        "peak_kb": round(peak / 1024, 1),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def benchmark(app, scale, iterations, only):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from backend.models import db
+
+    began = time.perf_counter()
+    data = build_dataset(app, scale)
+    build_seconds = time.perf_counter() - began
+
+    token_cache = {}
+
+    def tokens(user_id, role):
+        if (user_id, role) not in token_cache:
+            with app.app_context():
+                token_cache[user_id, role] = create_access_token(
+                    identity=str(user_id), additional_claims={"role": role}
+                )
+        return token_cache[user_id, role]
+
+    counter = QueryCounter()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", counter)
+
+    all_cases = cases(data)
+    missing = unbenchmarked(app, all_cases)
+    if missing:
+        raise RuntimeError(
+            f"no case or SKIPPED entry for {', '.join(missing)}; add one to"
+            " benchmarks/endpoints.py"
+        )
+
+    client = app.test_client()
+    results = []
+    try:
+        for case in all_cases:
+            if only and case.name not in only:
+                continue
+            result = run_case(app, client, case, iterations, tokens, counter)
+            results.append(result)
+            print(
+                f"{scale:>8} {result['name']:<26} {result['p50_ms']:>9.2f}"
+                f" {result['p99_ms']:>9.2f} {result['queries_per_request']:>8}"
+                f" {result['peak_kb']:>9.1f}  {result['statuses']}"
+            )
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+    return {
+        "scale": scale,
+        "dataset_seconds": round(build_seconds, 2),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[10000])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", nargs="*", help="case names to run")
+    parser.add_argument("--database", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--output", help="JSON file (default: results/<commit>.json)")
+    args = parser.parse_args()
+
+    app = bench_app(args.database)
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0],
+        "iterations": args.iterations,
+        "skipped": SKIPPED,
+        "runs": [],
+    }
+
+    print(
+        f"{'scale':>8} {'case':<26} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8}"
+        f" {'peak KB':>9}  statuses"
+    )
+    for scale in args.scale:
+        report["runs"].append(benchmark(app, scale, args.iterations, args.only))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Time, peak Python memory and file size of service request exports.
+
+Each export format, gzipped where it applies, is written for all the
+completed requests and for a filtered slice (one service, created in the
+last 90 days), the way the export task writes them. Memory is traced in
+a second, untimed run. Peak memory stays flat once an export spans more
+than one batch (EXPORT_BATCH_SIZE rows). The synthetic rows were updated
+long ago, so none is held back by EXPORT_LAG; an export of all the
+completed requests that writes nothing fails the run.
+
+    python benchmarks/exports.py --scale 10000 100000
+
+XLSX rows appear only when pyexcel-xlsx is installed.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from benchmarks.synthetic import bench_app, build_dataset  # noqa: E402
+
+# (format, compress)
+CASES = [
+    ("csv", False),
+    ("csv", True),
+    ("jsonl", False),
+    ("jsonl", True),
+    ("xlsx", False),
+]
+
+
+def xlsx_available():
+    try:
+        import pyexcel_xlsx  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write(exports, plan):
+    """Seconds to write `plan`, then peak traced memory of a second run
+    (tracing slows the writers down too much to time them at once)"""
+    began = time.perf_counter()
+    rows = exports.write_export(plan)
+    took = time.perf_counter() - began
+    tracemalloc.start()
+    exports.write_export(plan)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, took, peak
+
+
+def run(app, scale):
+    from backend import exports
+
+    build_dataset(app, scale)
+    since = (datetime.utcnow() - timedelta(days=90)).strftime("%Y-%m-%d")
+    slices = {
+        "all completed": exports.export_filters({}),
+        "filtered": exports.export_filters({"service_id": 1, "created_from": since}),
+    }
+    cases = [case for case in CASES if case[0] != "xlsx" or xlsx_available()]
+
+    print(f"\n{scale} service requests")
+    print(
+        f"{'slice':<14} {'format':<9} {'rows':>8} {'seconds':>8}"
+        f" {'peak KiB':>9} {'file KiB':>9}"
+    )
+    folder = tempfile.mkdtemp()
+    exports.EXPORT_FOLDER = folder
+    try:
+        with app.app_context():
+            for name, filters in slices.items():
+                for export_format, compress in cases:
+                    plan = exports.plan_export(compress, False, export_format, filters)
+                    rows, took, peak = write(exports, plan)
+                    if not rows and name == "all completed":
+                        raise RuntimeError(f"{export_format} export wrote no rows")
+                    size = os.path.getsize(exports.export_path(plan.filename))
+                    label = export_format + (".gz" if compress else "")
+                    print(
+                        f"{name:<14} {label:<9} {rows:>8} {took:>8.2f}"
+                        f" {peak / 1024:>9.0f} {size / 1024:>9.0f}"
+                    )
+    finally:
+        shutil.rmtree(folder)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[10000])
+    parser.add_argument("--database", help="SQLAlchemy URL (default: temp SQLite)")
+    args = parser.parse_args()
+
+    app = bench_app(args.database)
+    for scale in args.scale:
+        run(app, scale)
+
+
+if __name__ == "__main__":
+    main()
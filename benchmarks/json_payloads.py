@@ -0,0 +1,114 @@
+"""Encode time and bytes on the wire of the large list responses.
+
+For /api/users and a full page of /api/admin/service-requests, compares
+the stdlib json encoder with orjson on the response payload, then the
+whole request through the app with each serializer and each
+Content-Encoding the client may accept.
+
+    python benchmarks/json_payloads.py --scale 10000 100000 --iterations 30
+
+brotli rows appear only when the brotli package is installed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from benchmarks.synthetic import bench_app, build_dataset  # noqa: E402
+
+ENDPOINTS = {
+    "users.list": "/api/users",
+    "admin.requests": "/api/admin/service-requests?limit=500",
+}
+
+
+def median_ms(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        began = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - began)
+    return statistics.median(timings) * 1000
+
+
+def encoders():
+    from backend.serialization import orjson
+
+    found = {"json": lambda data: (json.dumps(data) + "\n").encode()}
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        found["orjson"] = lambda data: orjson.dumps(data, option=option)
+    return found
+
+
+def content_encodings():
+    from backend.compression import brotli
+
+    return ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+
+def run(app, scale, iterations):
+    import app as app_module
+    from flask_jwt_extended import create_access_token
+    from backend.serialization import SERIALIZERS
+
+    data = build_dataset(app, scale)
+    with app.app_context():
+        token = create_access_token(
+            identity=str(data["admin_id"]), additional_claims={"role": "admin"}
+        )
+    client = app.test_client()
+    api = app_module.api
+    configured = api.representations["application/json"]
+    auth = {"Authorization": f"Bearer {token}"}
+
+    print(f"\n{scale} service requests")
+    print(f"{'case':<16} {'serializer':<10} {'encode ms':>10} {'bytes':>10}")
+    for name, path in ENDPOINTS.items():
+        payload = client.get(path, headers=auth).get_json()
+        for serializer, encode in encoders().items():
+            encoded = encode(payload)
+            took = median_ms(lambda: encode(payload), iterations)
+            print(f"{name:<16} {serializer:<10} {took:>10.2f} {len(encoded):>10}")
+
+    print(
+        f"\n{'case':<16} {'serializer':<10} {'encoding':<9}"
+        f" {'p50 ms':>8} {'wire bytes':>11}"
+    )
+    try:
+        for name, path in ENDPOINTS.items():
+            for serializer, represent in SERIALIZERS.items():
+                api.representations["application/json"] = represent
+                for encoding in content_encodings():
+                    headers = {**auth, "Accept-Encoding": encoding}
+                    size = len(client.get(path, headers=headers).data)
+                    took = median_ms(
+                        lambda: client.get(path, headers=headers), iterations
+                    )
+                    print(
+                        f"{name:<16} {serializer:<10} {encoding:<9}"
+                        f" {took:>8.2f} {size:>11}"
+                    )
+    finally:
+        api.representations["application/json"] = configured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[10000])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--database", help="SQLAlchemy URL (default: temp SQLite)")
+    args = parser.parse_args()
+
+    app = bench_app(args.database)
+    for scale in args.scale:
+        run(app, scale, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Login throughput at different bcrypt work factors.
+
+Concurrent clients sign in through POST /auth/login while bcrypt runs
+on the bounded hashing pool. Each cost runs in its own process, since
+the work factor is read from BCRYPT_ROUNDS when the app starts.
+
+    python benchmarks/login_throughput.py --rounds 10 11 12 --clients 16
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from uuid import uuid4
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+
+def measure(clients, logins, users):
+    from backend.config import Config
+
+    if "DATABASE_URL" not in os.environ:
+        Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(
+            tempfile.mkdtemp(), "login_throughput.db"
+        )
+    Config.CACHE_TYPE = "SimpleCache"
+
+    from app import app
+    from backend.models import db, Role, User
+    from backend.passwords import hash_password
+
+    password = "correct horse battery staple"
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        role = Role(name="customer")
+        db.session.add(role)
+        db.session.flush()
+        password_hash = hash_password(password)  # same cost for every user
+        emails = [f"bench{i}@example.com" for i in range(users)]
+        db.session.add_all(
+            User(
+                username=email,
+                email=email,
+                password=password_hash,
+                role_id=role.id,
+                fs_uniquifier=uuid4().hex,
+            )
+            for email in emails
+        )
+        db.session.commit()
+
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+
+    def client(n):
+        test_client = app.test_client()
+        start.wait()
+        for i in range(logins):
+            email = emails[(n * logins + i) % users]
+            began = time.perf_counter()
+            response = test_client.post(
+                "/auth/login", json={"email": email, "password": password}
+            )
+            elapsed = time.perf_counter() - began
+            with lock:
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+                else:
+                    failures.append(response.status_code)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - began
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    print(
+        f"{app.config['BCRYPT_ROUNDS']:>6} {len(latencies) / wall:>10.1f}"
+        f" {p50 * 1000:>9.0f} {p95 * 1000:>9.0f} {len(failures):>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=10, help="per client")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.clients, args.logins, args.users)
+        return
+
+    print(f"clients: {args.clients}, logins per client: {args.logins}")
+    print(f"{'rounds':>6} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'failures':>8}")
+    for rounds in args.rounds:
+        subprocess.run(
+            [
+                sys.executable,
+                "-W",
+                "ignore",
+                __file__,
+                "--child",
+                f"--clients={args.clients}",
+                f"--logins={args.logins}",
+                f"--users={args.users}",
+            ],
+            env={**os.environ, "BCRYPT_ROUNDS": str(rounds)},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Synthetic datasets for the benchmarks, inserted in bulk.
+
+    python benchmarks/synthetic.py --requests 100000 --database sqlite:////tmp/bench.db
+
+The target database is dropped and recreated.
+
+The shape scales with the number of service requests: one customer per
+20 requests, one professional per 100 (at least one per service), and
+requests spread over the last year as 40% pending, 30% accepted and 30%
+completed, half of the completed ones rated. The rating totals and
+analytics rollups are then built from them, and one professional's PDF
+is put in the document store.
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+SERVICES = 20
+INSERT_CHUNK = 10000  # rows per executemany round trip
+PASSWORD = "benchmark"
+DOCUMENT_SIZE = 2 * 1024 * 1024  # bytes of the stored PDF
+
+
+def bench_app(database=None):
+    """The app, pointed at `database` (a fresh temporary SQLite file by default).
+
+    Caching uses an in-process SimpleCache so no Redis is needed, and
+    documents are stored in a temporary folder.
+    """
+    from backend.config import Config
+
+    Config.SQLALCHEMY_DATABASE_URI = database or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "benchmark.db"
+    )
+    Config.CACHE_TYPE = "SimpleCache"
+    Config.DOCUMENT_FOLDER = tempfile.mkdtemp()
+    from app import app
+
+    return app
+
+
+def _chunks(rows, size=INSERT_CHUNK):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def _insert(db, model, rows):
+    for chunk in _chunks(rows):
+        db.session.execute(model.__table__.insert(), chunk)
+
+
+def build_dataset(app, requests, seed=0):
+    """Recreate the schema and fill it; returns the ids the benchmarks need"""
+    from flask_security.utils import hash_password
+    from sqlalchemy import text
+    from backend.analytics import refresh_rollups
+    from backend.documents import store_document
+    from backend.models import db, Role, Service, User, ServiceRequest
+    from backend.ratings import backfill_ratings
+
+    rng = random.Random(seed)
+    customers = max(10, requests // 20)
+    professionals = max(SERVICES, requests // 100)
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        roles = {"admin": 1, "professional": 2, "customer": 3}
+        _insert(db, Role, [{"id": i, "name": name} for name, i in roles.items()])
+        _insert(
+            db,
+            Service,
+            [
+                {
+                    "id": i,
+                    "name": f"Service {i}",
+                    "description": f"Synthetic service {i}",
+                    "price": float(rng.randrange(50, 500)),
+                    "created_at": now,
+                    "available": True,
+                }
+                for i in range(1, SERVICES + 1)
+            ],
+        )
+
+        password = hash_password(PASSWORD)  # one hash shared by every user
+
+        def user(user_id, kind, role, **extra):
+            return {
+                "id": user_id,
+                "username": f"{kind}{user_id}",
+                "email": f"{kind}{user_id}@example.com",
+                "password": password,
+                "flagged": False,
+                "role_id": roles[role],
+                "contact_number": None,
+                "service_id": None,
+                "fs_uniquifier": uuid4().hex,
+                **extra,  # every row needs the same keys for executemany
+            }
+
+        customer_ids = range(2, customers + 2)
+        professional_ids = range(customers + 2, customers + professionals + 2)
+        users = [user(1, "admin", "admin")]
+        users += [
+            user(i, "customer", "customer", contact_number=f"9{i:09d}")
+            for i in customer_ids
+        ]
+        users += [
+            user(i, "professional", "professional", service_id=i % SERVICES + 1)
+            for i in professional_ids
+        ]
+        _insert(db, User, users)
+
+        pros_by_service = {}
+        for i in professional_ids:
+            pros_by_service.setdefault(i % SERVICES + 1, []).append(i)
+
+        rows = []
+        for i in range(1, requests + 1):
+            service_id = rng.randrange(1, SERVICES + 1)
+            roll = rng.random()
+            status = (
+                "Pending" if roll < 0.4 else "Accepted" if roll < 0.7 else "Completed"
+            )
+            created_at = now - timedelta(seconds=rng.randrange(365 * 86400))
+            rows.append(
+                {
+                    "id": i,
+                    "customer_id": rng.choice(customer_ids),
+                    "service_id": service_id,
+                    "professional_id": (
+                        None
+                        if status == "Pending"
+                        else rng.choice(pros_by_service[service_id])
+                    ),
+                    "status": status,
+                    "created_at": created_at,
+                    # settled long ago, like real history (see EXPORT_LAG)
+                    "updated_at": created_at,
+                    "rating": (
+                        rng.randrange(1, 6)
+                        if status == "Completed" and rng.random() < 0.5
+                        else None
+                    ),
+                }
+            )
+        _insert(db, ServiceRequest, rows)
+        if db.engine.dialect.name == "postgresql":
+            # explicit ids leave the id sequences behind
+            for model in (Role, Service, User, ServiceRequest):
+                table = model.__tablename__
+                db.session.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'),"
+                        f' (SELECT MAX(id) FROM "{table}"))'
+                    )
+                )
+        db.session.commit()
+
+        # derived tables, as `flask backfill-ratings` and the beat task build them
+        backfill_ratings()
+        refresh_rollups()
+
+        pdf = b"%PDF-1.4\n" + rng.randbytes(DOCUMENT_SIZE) + b"\n%%EOF\n"
+        document, _ = store_document(io.BytesIO(pdf))
+        db.session.commit()
+
+        return {
+            "admin_id": 1,
+            "customer_ids": list(customer_ids),
+            "professional_ids": list(professional_ids),
+            "service_ids": list(range(1, SERVICES + 1)),
+            "document_id": document.sha256,
+            "requests": [
+                (row["id"], row["customer_id"], row["status"], row["rating"])
+                for row in rows
+            ],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--database", default=os.environ.get("DATABASE_URL"))
+    args = parser.parse_args()
+
+    app = bench_app(args.database)
+    began = time.perf_counter()
+    data = build_dataset(app, args.requests)
+    print(
+        f"{args.requests} requests, {len(data['customer_ids'])} customers,"
+        f" {len(data['professional_ids'])} professionals"
+        f" in {time.perf_counter() - began:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
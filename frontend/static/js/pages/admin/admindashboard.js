@@ -31,7 +31,13 @@
                 <tr v-for="user in filteredUsers" :key="user.id">
                   <td>{{ user.id }}</td>
                   <td>{{ user.username }}
-                  <a v-if="user.role === 'professional' && user.document_path" 
+                  <a v-if="user.role === 'professional' && user.document_id"
+                    :href="documentUrl(user.document_id)"
+                    target="_blank"
+                    class="ms-2 btn btn-link btn-sm">
+                    Doc ({{ user.document_status }})
+                  </a>
+                  <a v-else-if="user.role === 'professional' && user.document_path" 
                     :href="'/' + user.document_path" 
                     target="_blank" 
                     class="ms-2 btn btn-link btn-sm">
@@ -41,8 +47,8 @@
                   <td>{{ user.role }}
                   <span v-if="user.role === 'professional'">
                     ({{ user.service_offered || 'Not Specified' }})
-                    <span v-if="averageRatings[user.id]">
-                      | ⭐ {{ averageRatings[user.id] }}
+                    <span v-if="user.average_rating">
+                      | ⭐ {{ user.average_rating.toFixed(2) }}
                     </span>
                   </span>
                   </td>
@@ -115,7 +121,34 @@
             <p class="text-muted">Manage service requests.</p>
             <!-- Show Graph Button -->
             <button @click="showGraphModal" class="btn btn-outline-secondary mb-3">Show Graph</button>
-            <button @click="exportServiceRequests" class="btn btn-outline-secondary mb-3">Export as CSV</button>
+            <div class="d-flex justify-content-center align-items-center mb-3">
+              <select v-model="exportOptions.format" class="form-select form-select-sm w-auto me-2">
+                <option value="csv">CSV</option>
+                <option value="xlsx">Excel (XLSX)</option>
+                <option value="jsonl">JSON Lines</option>
+              </select>
+              <select v-model="exportOptions.status" class="form-select form-select-sm w-auto me-2">
+                <option value="Completed">Completed</option>
+                <option value="Accepted">Accepted</option>
+                <option value="Pending">Pending</option>
+              </select>
+              <select v-model="exportOptions.service_id" class="form-select form-select-sm w-auto me-2">
+                <option value="">All Services</option>
+                <option v-for="service in services" :key="service.id" :value="service.id">{{ service.name }}</option>
+              </select>
+              <input v-model="exportOptions.created_from" type="date" class="form-control form-control-sm w-auto me-2" title="Created from">
+              <input v-model="exportOptions.created_to" type="date" class="form-control form-control-sm w-auto me-2" title="Created to">
+            </div>
+            <button @click="exportServiceRequests(false)" class="btn btn-outline-secondary mb-3">Export</button>
+            <button @click="exportServiceRequests(true)" class="btn btn-outline-secondary mb-3">Export New Since Last Export</button>
+            <div class="d-flex justify-content-center align-items-center mb-3">
+              <select v-model="importKind" class="form-select form-select-sm w-auto me-2">
+                <option value="services">Services</option>
+                <option value="professionals">Professionals</option>
+              </select>
+              <input ref="importFile" type="file" accept=".csv,.jsonl" class="form-control form-control-sm w-auto me-2">
+              <button @click="importRecords" class="btn btn-outline-secondary btn-sm">Bulk Import</button>
+            </div>
             <input v-model="searchRequest" type="text" class="form-control mt-2 mx-auto text-center" style="width: 40%;" placeholder="Search Service Requests...">
 
             <table class="table table-striped" v-if="filteredRequests.length">
@@ -141,6 +174,7 @@
               </tbody>
             </table>
             <p v-else class="text-muted mt-3">No service requests found.</p>
+            <button v-if="requestsCursor" @click="fetchServiceRequests(true)" class="btn btn-outline-secondary btn-sm mb-3">Load more</button>
           </div>
         </div>
   
@@ -223,7 +257,7 @@
         users: [],
         services: [],
         serviceRequests: [],
-        averageRatings: {}, 
+        requestsCursor: null, // next_cursor of the last page loaded, if any
         searchUser: "", // Added for search functionality
         searchService: "",
         searchRequest: "",
@@ -231,6 +265,15 @@
         graphModalVisible: false,  // New state for Graph Modal
         userGraphModalVisible: false,
         userChart: null,
+        importKind: "services", // What the bulk import file contains
+        // Format and filters of service request exports (empty: no filter)
+        exportOptions: {
+          format: "csv",
+          status: "Completed",
+          service_id: "",
+          created_from: "",
+          created_to: "",
+        },
         newService: {
           name: "",
           description: "",
@@ -289,54 +332,39 @@
     },
   
     methods: {
-      async fetchServiceRequests() {
+      documentUrl(documentId) {
+        // Opened in a new tab, so the token travels in the query string
+        const token = encodeURIComponent(sessionStorage.getItem("token"));
+        return `/api/documents/${documentId}?jwt=${token}`;
+      },
+      async fetchServiceRequests(more = false) {
         const token = sessionStorage.getItem("token"); // Retrieve stored JWT token
-  
-        fetch("/api/admin/service-requests", {
-          method: "GET",
-          headers: {
-            "Authorization": `Bearer ${token}`,
-            "Content-Type": "application/json",
-          },
-        })
-          .then(response => {
-            if (!response.ok) {
-              throw new Error("Failed to fetch service requests");
-            }
-            return response.json();
-          })
-          .then(data => {
-            this.serviceRequests = data;
-            // Compute the average rating for each professional
-            const ratingsMap = {};
-            const countMap = {};
-
-            data.forEach(request => {
-              if (request.professional && request.rating) {
-                const proId = request.professional.id;
-                    
-                if (!ratingsMap[proId]) {
-                  ratingsMap[proId] = 0;
-                  countMap[proId] = 0;
-                }
-                    
-                ratingsMap[proId] += request.rating;
-                countMap[proId] += 1;
-              }
-            });
 
-            // Store average ratings
-            this.averageRatings = {};
-            for (const proId in ratingsMap) {
-              this.averageRatings[proId] = (ratingsMap[proId] / countMap[proId]).toFixed(2);
-            }
-          })
-          .catch(error => console.error("Error fetching service requests:", error));
+        try {
+          // One page at a time: "Load more" follows the cursor from the API
+          const cursor = more ? this.requestsCursor : null;
+          const url = "/api/admin/service-requests" + (cursor ? `?cursor=${cursor}` : "");
+          const response = await fetchWithETag(url, {
+            method: "GET",
+            headers: {
+              "Authorization": `Bearer ${token}`,
+              "Content-Type": "application/json",
+            },
+          });
+          if (!response.ok) {
+            throw new Error("Failed to fetch service requests");
+          }
+          const page = await response.json();
+          this.serviceRequests = more ? this.serviceRequests.concat(page.items) : page.items;
+          this.requestsCursor = page.next_cursor;
+        } catch (error) {
+          console.error("Error fetching service requests:", error);
+        }
       },
       async fetchUsers() {
         try {
           const token = sessionStorage.getItem("token"); // Get JWT from storage
-          const response = await fetch("/api/users", {
+          const response = await fetchWithETag("/api/users", {
             headers: {
               "Authorization": `Bearer ${token}`
             }
@@ -397,7 +425,7 @@
       async fetchServices() {
         try {
           const token = sessionStorage.getItem("token"); // Get JWT from storage
-          const response = await fetch("/api/services", {
+          const response = await fetchWithETag("/api/services", {
             headers: {
               "Authorization": `Bearer ${token}`
             }
@@ -474,21 +502,27 @@
           console.error("Error toggling service availability:", error);
         }
       },
-      showGraphModal() {
+      async showGraphModal() {
         this.graphModalVisible = true;
     
-        // Count requests by status
+        // Request counts by status, from the server-side rollups
         const statusCounts = {
           Completed: 0,
           Pending: 0,
           Accepted: 0,
         };
-    
-        this.serviceRequests.forEach(request => {
-          if (statusCounts[request.status] !== undefined) {
-            statusCounts[request.status]++;
+        try {
+          const response = await fetch("/api/admin/analytics", {
+            headers: { "Authorization": `Bearer ${sessionStorage.getItem("token")}` },
+          });
+          if (!response.ok) {
+            throw new Error("Failed to fetch analytics");
           }
-        });
+          const analytics = await response.json();
+          Object.assign(statusCounts, analytics.by_status);
+        } catch (error) {
+          console.error("Error fetching analytics:", error);
+        }
     
         // Wait for modal to render, then load the chart
         this.$nextTick(() => {
@@ -572,16 +606,23 @@
           }
         });
       },
-      async exportServiceRequests() {
+      async exportServiceRequests(incremental) {
+        const params = new URLSearchParams({ incremental });
+        for (const [name, value] of Object.entries(this.exportOptions)) {
+          if (value !== "") params.append(name, value);
+        }
         try {
-          const response = await fetch("/admin/api/export-csv", {
+          const response = await fetch(`/admin/api/export-csv?${params}`, {
             method: "POST",
             headers: { Authorization: `Bearer ${sessionStorage.getItem("token")}`,
             "Content-Type": "application/json",
           },
           });
           const data = await response.json();
-          if (response.ok) {
+          if (data.status === "Completed") {
+            // Nothing changed since this export was written
+            this.downloadExport(data.file);
+          } else if (response.ok) {
             alert("Export started! Check the status.");
             this.checkExportStatus(data.task_id);
           } else {
@@ -592,35 +633,80 @@
         }
       },
       
-      async checkExportStatus(taskId) {
-        const interval = setInterval(async () => {
-          const response = await fetch(`/admin/api/export-csv/${taskId}`, {
-            method: "GET",
-            headers: {
-              Authorization: `Bearer ${sessionStorage.getItem("token")}`,
-              "Content-Type": "application/json",
-            },
+      async importRecords() {
+        const file = this.$refs.importFile.files[0];
+        if (!file) {
+          alert("Choose a CSV or JSONL file to import.");
+          return;
+        }
+        const formData = new FormData();
+        formData.append("file", file);
+
+        const response = await fetch(`/admin/api/import/${this.importKind}`, {
+          method: "POST",
+          headers: { Authorization: `Bearer ${sessionStorage.getItem("token")}` },
+          body: formData,
+        });
+        const data = await response.json();
+        if (!response.ok) {
+          alert(data.error || data.message.file);
+          return;
+        }
+        this.checkImportStatus(data.task_id);
+      },
+
+      checkImportStatus(taskId) {
+        setTimeout(async () => {
+          const response = await fetch(`/admin/api/import/tasks/${taskId}`, {
+            headers: { Authorization: `Bearer ${sessionStorage.getItem("token")}` },
           });
-      
           const data = await response.json();
-          
+
           if (data.status === "Completed") {
-            clearInterval(interval);
-            // alert(`Export completed! Download: ${data.file}`);
-            // Create a temporary download link
-            const downloadLink = document.createElement("a");
-            downloadLink.href = data.file;  // File URL from API
-            downloadLink.download = "export.csv";  // Suggested filename
-            document.body.appendChild(downloadLink);
-            downloadLink.click();
-            document.body.removeChild(downloadLink);
+            alert(`Import finished: ${data.inserted} added, ${data.rejected} rejected.`);
+            this.$refs.importFile.value = "";
+            this.fetchUsers();
+            this.fetchServices();
+          } else if (data.status === "Failed") {
+            alert("Import failed.");
+          } else {
+            this.checkImportStatus(taskId);
+          }
+        }, 2000);
+      },
+
+      downloadExport(file) {
+        // Create a temporary download link
+        // A plain link sends no Authorization header, so pass the token
+        const token = encodeURIComponent(sessionStorage.getItem("token"));
+        const downloadLink = document.createElement("a");
+        downloadLink.href = `${file}?jwt=${token}`;  // File URL from API
+        downloadLink.download = file.split("/").pop();  // Suggested filename
+        document.body.appendChild(downloadLink);
+        downloadLink.click();
+        document.body.removeChild(downloadLink);
+
+        alert("Export completed! File is downloading.");
+      },
 
-            alert("Export completed! File is downloading.");
+      checkExportStatus(taskId) {
+        // The server pushes each progress update and closes with the result
+        const token = encodeURIComponent(sessionStorage.getItem("token"));
+        const stream = new EventSource(`/admin/api/export-csv/${taskId}/stream?jwt=${token}`);
+
+        stream.addEventListener("status", event => {
+          const data = JSON.parse(event.data);
+
+          if (data.status === "In Progress") {
+            console.log(`Export progress: ${data.percent}%`);
+          } else if (data.status === "Completed") {
+            stream.close();
+            this.downloadExport(data.file);
           } else if (data.status === "Failed") {
-            clearInterval(interval);
+            stream.close();
             alert("Export failed.");
           }
-        }, 5000);
+        });
       },            
     },
   });
@@ -3,6 +3,7 @@
       return {
         services: [], // Stores services fetched from API
         serviceRequests: [], // Stores requested services
+        nextRequestsCursor: null, // Cursor of the next page of requests, if any
         searchQuery: "", // Stores the search term
         serviceRequestQuery: "", // New search field for service requests
         ratings: {}, // Store ratings by request ID
@@ -75,7 +76,7 @@
       fetchServices() {
         const token = sessionStorage.getItem("token"); // Retrieve stored JWT token
       
-        fetch("/api/services", {
+        fetchWithETag("/api/services", {
           method: "GET",
           headers: {
             "Authorization": `Bearer ${token}`,  // Include JWT token
@@ -93,10 +94,11 @@
           })
           .catch(error => console.error("Error fetching services:", error));
       },
-      fetchServiceRequests() {
+      fetchServiceRequests(cursor = null) {
         const token = sessionStorage.getItem("token"); // Retrieve stored JWT token
+        const url = cursor ? `/api/request-service?cursor=${cursor}` : "/api/request-service";
       
-        fetch("/api/request-service", {
+        fetchWithETag(url, {
           method: "GET",
           headers: {
             "Authorization": `Bearer ${token}`,
@@ -110,7 +112,9 @@
             return response.json();
           })
           .then(data => {
-            this.serviceRequests = data;
+            // Newest first; "Load more" appends the following page
+            this.serviceRequests = cursor ? this.serviceRequests.concat(data.items) : data.items;
+            this.nextRequestsCursor = data.next_cursor;
           })
           .catch(error => console.error("Error fetching service requests:", error));
       },
@@ -363,6 +367,13 @@
               </tbody>
             </table>
             <p v-else class="text-muted mt-3">No service requests found.</p>
+            <button
+              v-if="nextRequestsCursor"
+              class="btn btn-sm btn-outline-secondary"
+              @click="fetchServiceRequests(nextRequestsCursor)"
+            >
+              Load more
+            </button>
           </div>
         </div>
       </div>
@@ -7,7 +7,8 @@
       passwordFields: { old_password: "", new_password: "" }, // Separate password fields
       showEditProfile: false, // Control modal visibility
       searchPriceQuery: "", // New search query for filtering by price
-      searchStatusQuery: ""  // Search query for filtering by status
+      searchStatusQuery: "",  // Search query for filtering by status
+      jobFeed: null // EventSource pushing new pending requests
     };
   },
   computed: {
@@ -101,7 +102,7 @@
         .catch(error => console.error("Error updating profile:", error));
     },
     fetchServiceRequests() {
-      fetch("/api/service-requests", {
+      fetchWithETag("/api/service-requests", {
         headers: { Authorization: `Bearer ${sessionStorage.getItem("token")}` }
       })
         .then(response => response.json())
@@ -113,6 +114,8 @@
         .catch(error => console.error("Error fetching service requests:", error));
     },
     acceptServiceRequest(requestId) {
+      // Found now: our own claim event may remove it before the response arrives
+      const acceptedRequest = this.serviceRequests.find(req => req.id === requestId);
       fetch(`/api/service-requests/${requestId}/accept`, {
         method: "PUT",
         headers: { 
@@ -123,7 +126,6 @@
       .then(response => response.json())
       .then(data => {
         if (data.message) {
-          const acceptedRequest = this.serviceRequests.find(req => req.id === requestId);
           if (acceptedRequest) {
             acceptedRequest.status = "Accepted";
             // Move it to the acceptedRequests list
@@ -135,10 +137,33 @@
       })
       .catch(error => console.error("Error accepting service request:", error));
     },
+    subscribeToJobFeed() {
+      // New requests are pushed by the server instead of re-polling the list
+      const token = encodeURIComponent(sessionStorage.getItem("token"));
+      this.jobFeed = new EventSource(`/api/service-requests/stream?jwt=${token}`);
+      this.jobFeed.addEventListener("service_request", event => {
+        const request = JSON.parse(event.data);
+        if (!this.serviceRequests.some(req => req.id === request.id)) {
+          this.serviceRequests.push(request);
+        }
+      });
+      this.jobFeed.addEventListener("service_request_claimed", event => {
+        // Taken by a professional, so no longer open to the others
+        const { id } = JSON.parse(event.data);
+        this.serviceRequests = this.serviceRequests.filter(req => req.id !== id);
+      });
+      this.jobFeed.onerror = () => console.warn("Job feed disconnected, reconnecting...");
+    },
   },
   mounted() {
     this.fetchServiceRequests();
     this.fetchUserProfile();
+    this.subscribeToJobFeed();
+  },
+  beforeDestroy() {
+    if (this.jobFeed) {
+      this.jobFeed.close();
+    }
   },
     template: `      
       <div class="container mt-3 text-center">
@@ -34,7 +34,18 @@ Vue.component("registerpage-component", {
         console.error("Error fetching services:", error);
       }
     },
-    register: function () {
+    async uploadDocument() {
+      // Streams the PDF as the raw request body; returns its document id
+      const response = await fetch("/auth/documents", {
+        method: "POST",
+        headers: { "Content-Type": "application/pdf" },
+        body: this.document,
+      });
+      const data = await response.json();
+      if (!response.ok) throw new Error(data.error || "Document upload failed");
+      return data.document_id;
+    },
+    register: async function () {
       var self = this; // Capture `this` for use inside fetch
 
       if (this.password !== this.confirmPassword) {
@@ -42,6 +53,16 @@ Vue.component("registerpage-component", {
         return;
       }
 
+      let documentId = null;
+      if (this.role === "professional" && this.document) {
+        try {
+          documentId = await this.uploadDocument();
+        } catch (error) {
+          this.errorMessage = error.message;
+          return;
+        }
+      }
+
       let formData = new FormData();
       formData.append("username", this.username);
       formData.append("email", this.email);
@@ -54,8 +75,8 @@ Vue.component("registerpage-component", {
 
       if (this.role === "professional") {
         formData.append("service_id", this.selectedService);
-        if (this.document) {
-          formData.append("document", this.document);
+        if (documentId) {
+          formData.append("document_id", documentId);
         }
       }
       fetch("/auth/register", {
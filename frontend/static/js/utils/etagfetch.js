@@ -0,0 +1,38 @@
+// GET with If-None-Match: remembers each URL's ETag and body, and turns a
+// 304 Not Modified back into a normal response from the remembered body
+
+function fetchWithETag(url, options = {}) {
+  const storageKey = `etag:${url}`;
+  let cached = null;
+  try {
+    cached = JSON.parse(sessionStorage.getItem(storageKey));
+  } catch (error) {
+    cached = null;
+  }
+
+  const headers = Object.assign({}, options.headers);
+  if (cached) {
+    headers["If-None-Match"] = cached.etag;
+  }
+
+  return fetch(url, Object.assign({}, options, { headers })).then(response => {
+    if (response.status === 304 && cached) {
+      return new Response(cached.body, {
+        status: 200,
+        headers: { "Content-Type": "application/json", "ETag": cached.etag },
+      });
+    }
+
+    const etag = response.headers.get("ETag");
+    if (response.ok && etag) {
+      response.clone().text().then(body => {
+        try {
+          sessionStorage.setItem(storageKey, JSON.stringify({ etag, body }));
+        } catch (error) {
+          sessionStorage.removeItem(storageKey); // over quota, skip caching
+        }
+      });
+    }
+    return response;
+  });
+}
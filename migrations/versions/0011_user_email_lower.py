@@ -0,0 +1,25 @@
+"""user email lower index
+
+Revision ID: 0011_user_email_lower
+Revises: 0010_user_service_updated_at
+Create Date: 2026-10-18 22:41:07.512938
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_user_email_lower'
+down_revision = '0010_user_service_updated_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expression indexes are not autogenerated
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_email_lower', table_name='user')
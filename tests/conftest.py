@@ -0,0 +1,124 @@
+"""Test fixtures.
+
+The app is configured before it is imported: a temporary SQLite file,
+built once with the migrations (flask db upgrade) and restored for every
+test, and an in-process cache so no Redis is needed.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # the export and import folders are relative paths
+
+DB_FOLDER = tempfile.mkdtemp()
+DB_PATH = os.path.join(DB_FOLDER, "test.db")
+MIGRATED_PATH = os.path.join(DB_FOLDER, "migrated.db")
+
+from backend.config import Config  # noqa: E402
+
+Config.SQLALCHEMY_DATABASE_URI = "sqlite:///" + DB_PATH
+Config.CACHE_TYPE = "SimpleCache"
+
+
+def _remove_database():
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from flask_migrate import upgrade
+    from app import app
+    from backend.models import db
+
+    app.config["TESTING"] = True
+    with app.app_context():
+        upgrade(directory="migrations")
+        db.engine.dispose()  # checkpoints the WAL into the file
+    shutil.copyfile(DB_PATH, MIGRATED_PATH)
+    yield app
+    shutil.rmtree(DB_FOLDER, ignore_errors=True)
+
+
+@pytest.fixture
+def database(app):
+    """A freshly migrated, empty database inside an app context"""
+    from backend.celery_worker import app as worker_app
+    from backend.extensions import cache
+    from backend.models import db
+
+    with worker_app.app_context():  # tasks run in the worker's own app
+        db.engine.dispose()
+    with app.app_context():
+        db.engine.dispose()
+        _remove_database()
+        shutil.copyfile(MIGRATED_PATH, DB_PATH)
+        cache.clear()
+        yield db
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app, database):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(database):
+    """Factory adding a user with the given role (created if missing)"""
+    from uuid import uuid4
+    from backend.models import Role, User
+
+    def make(role_name, username, **fields):
+        role = Role.query.filter_by(name=role_name).first()
+        if role is None:
+            role = Role(name=role_name, description=role_name)
+            database.session.add(role)
+        fields.setdefault("email", f"{username}@example.com")
+        fields.setdefault("password", "not a real hash")
+        user = User(
+            username=username,
+            role=role,
+            fs_uniquifier=uuid4().hex,
+            **fields,
+        )
+        database.session.add(user)
+        database.session.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Factory of the Authorization header of a token for a user"""
+    from flask_jwt_extended import create_access_token
+
+    def headers(user):
+        token = create_access_token(
+            identity=str(user.id), additional_claims={"role": user.role.name}
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
+
+
+@pytest.fixture
+def statements(database):
+    """SQL statements run while the test is recording"""
+    from sqlalchemy import event
+
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(database.engine, "before_cursor_execute", record)
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+import pytest
+from backend.analytics import ROLLUP, refresh_rollups, summary
+from backend.models import RollupDirtyDay, RollupState, Service, ServiceRequest
+
+
+@pytest.fixture
+def no_lag(app, monkeypatch):
+    monkeypatch.setitem(app.config, "ANALYTICS_ROLLUP_LAG", 0)
+
+
+@pytest.fixture
+def service(database):
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    database.session.add(service)
+    database.session.commit()
+    return service
+
+
+def add_request(database, customer, service, status="Pending", **fields):
+    request = ServiceRequest(
+        customer=customer, service=service, status=status, **fields
+    )
+    database.session.add(request)
+    database.session.commit()
+    return request
+
+
+def test_cancelled_requests_leave_the_rollups(
+    database, client, make_user, auth_headers, service, no_lag
+):
+    customer = make_user("customer", "customer")
+    request = add_request(database, customer, service)
+    refresh_rollups()
+    assert summary(30)["by_status"] == {"Pending": 1}
+
+    response = client.delete(
+        f"/api/request-service/{request.id}", headers=auth_headers(customer)
+    )
+    assert response.status_code == 200
+    refresh_rollups()
+
+    figures = summary(30)
+    assert figures["requests"] == 0
+    assert figures["by_status"] == {}
+    assert figures["by_day"] == []
+
+
+def days_ago(days):
+    at = datetime.utcnow() - timedelta(days=days)
+    return {"created_at": at, "updated_at": at}
+
+
+def test_summary_totals_cover_all_time_and_the_series_the_window(
+    database, make_user, service, no_lag
+):
+    customer = make_user("customer", "customer")
+    other = Service(name="Cleaning", description="Floors", price=40.0)
+    add_request(database, customer, service, "Completed", **days_ago(1))
+    add_request(database, customer, service, "Completed", **days_ago(1))
+    add_request(database, customer, other, "Completed", **days_ago(45))
+    add_request(database, customer, other, "Pending", **days_ago(2))
+    refresh_rollups()
+
+    figures = summary(30)
+
+    assert figures["requests"] == 4
+    assert figures["revenue"] == 240.0
+    assert figures["by_status"] == {"Completed": 3, "Pending": 1}
+    assert figures["by_service"] == [
+        {"id": service.id, "name": "Plumbing", "requests": 2, "revenue": 200.0},
+        {"id": other.id, "name": "Cleaning", "requests": 2, "revenue": 40.0},
+    ]
+    assert [(day["requests"], day["revenue"]) for day in figures["by_day"]] == [
+        (1, 0.0),
+        (2, 200.0),
+    ]
+    assert figures["updated_through"] is not None
+
+
+def test_refreshes_read_only_rows_past_the_high_water_mark(
+    app, database, make_user, service, monkeypatch
+):
+    customer = make_user("customer", "customer")
+    add_request(database, customer, service, **days_ago(3))
+    assert refresh_rollups() is None  # the first run rebuilds
+    high_water_mark = database.session.get(RollupState, ROLLUP).high_water_mark
+
+    assert refresh_rollups() == 0  # nothing changed since
+
+    recent = add_request(database, customer, service)  # still inside the lag
+    assert refresh_rollups() == 0
+    assert summary(30)["requests"] == 1
+
+    monkeypatch.setitem(app.config, "ANALYTICS_ROLLUP_LAG", 0)
+    assert refresh_rollups() == 1  # only the day of the new row
+    assert summary(30)["requests"] == 2
+    assert database.session.get(RollupState, ROLLUP).high_water_mark > max(
+        high_water_mark, recent.updated_at
+    )
+
+
+def test_updated_requests_move_between_buckets(database, make_user, service, no_lag):
+    request = add_request(database, make_user("customer", "customer"), service)
+    refresh_rollups()
+
+    request.status = "Completed"  # updated_at moves past the high-water mark
+    database.session.commit()
+    assert refresh_rollups() == 1
+
+    figures = summary(30)
+    assert figures["by_status"] == {"Completed": 1}
+    assert figures["revenue"] == 100.0
+
+
+def test_days_of_deleted_requests_are_reprocessed(database, make_user, service, no_lag):
+    customer = make_user("customer", "customer")
+    old = add_request(database, customer, service, **days_ago(10))
+    add_request(database, customer, service, **days_ago(10))
+    add_request(database, customer, service, **days_ago(5))
+    refresh_rollups()
+
+    database.session.delete(old)
+    database.session.commit()
+    assert RollupDirtyDay.query.count() == 1
+
+    assert refresh_rollups() == 1  # the day of the deleted row, no other
+    assert RollupDirtyDay.query.count() == 0
+    figures = summary(30)
+    assert figures["requests"] == 2
+    assert [day["requests"] for day in figures["by_day"]] == [1, 1]
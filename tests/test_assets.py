@@ -0,0 +1,94 @@
+import gzip
+import pytest
+from backend import assets
+
+SCRIPT = b"console.log('household services');\n" * 100
+
+
+@pytest.fixture
+def built(app, tmp_path, monkeypatch):
+    """Static sources under a temporary app root, built into STATIC_BUILD_FOLDER"""
+    monkeypatch.setattr(app, "root_path", str(tmp_path))
+    monkeypatch.setitem(app.config, "STATIC_SOURCE_FOLDER", "source")
+    monkeypatch.setitem(app.config, "STATIC_BUILD_FOLDER", "build")
+    monkeypatch.setitem(app.config, "STATIC_SENDFILE", None)
+    (tmp_path / "source" / "js").mkdir(parents=True)
+    (tmp_path / "source" / "js" / "app.js").write_bytes(SCRIPT)
+    (tmp_path / "secret.txt").write_text("not an asset")
+
+    manifest = assets.build_assets(str(tmp_path / "source"), str(tmp_path / "build"))
+    monkeypatch.setitem(app.extensions, "assets", manifest)
+    return manifest
+
+
+def test_asset_urls_resolve_to_the_fingerprinted_build(app, built):
+    with app.test_request_context():
+        url = assets.asset_url("js/app.js")
+        assert url == "/static/" + built["js/app.js"]
+        assert url != "/static/js/app.js"
+        assert assets.asset_url("js/unbuilt.js") == "/static/js/unbuilt.js"
+
+
+def test_fingerprinted_assets_are_cached_as_immutable(client, built):
+    response = client.get("/static/" + built["js/app.js"])
+
+    assert response.status_code == 200
+    assert response.data == SCRIPT
+    assert response.cache_control.public
+    assert response.cache_control.max_age == assets.IMMUTABLE_MAX_AGE
+    assert response.cache_control.immutable
+    assert response.vary.as_set() == {"accept-encoding"}  # no Cookie
+
+
+def test_precompressed_variants_are_served_to_clients_accepting_them(client, built):
+    response = client.get(
+        "/static/" + built["js/app.js"], headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == SCRIPT
+
+
+def test_source_files_are_revalidated(client, built):
+    response = client.get("/static/js/app.js")
+
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    assert not response.cache_control.immutable
+    assert "Cookie" not in response.headers.get("Vary", "")
+
+
+def test_x_sendfile_hands_the_file_to_the_server(app, client, built, monkeypatch):
+    monkeypatch.setitem(app.config, "STATIC_SENDFILE", "x-sendfile")
+
+    response = client.get("/static/" + built["js/app.js"])
+
+    assert (
+        response.headers["X-Sendfile"] == f"{app.root_path}/build/{built['js/app.js']}"
+    )
+    assert response.data == b""
+    assert response.cache_control.immutable
+
+
+def test_x_accel_redirect_points_at_the_internal_location(
+    app, client, built, monkeypatch
+):
+    monkeypatch.setitem(app.config, "STATIC_SENDFILE", "x-accel-redirect")
+
+    response = client.get(
+        "/static/" + built["js/app.js"], headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["X-Accel-Redirect"] == (
+        f"{app.config['STATIC_ACCEL_PREFIX']}build/{built['js/app.js']}.gz"
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.data == b""
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/static/../secret.txt", "/static/js/../../secret.txt", "/static/manifest.json"],
+)
+def test_files_outside_the_assets_are_not_found(client, built, path):
+    assert client.get(path).status_code == 404
@@ -0,0 +1,80 @@
+import pytest
+from backend.models import Service
+
+
+@pytest.fixture
+def service(database):
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    database.session.add(service)
+    database.session.commit()
+    return service
+
+
+@pytest.mark.parametrize(
+    "method, url",
+    [
+        ("get", "/api/users"),
+        ("delete", "/api/users/{id}"),
+        ("put", "/api/users/{id}/flag"),
+        ("put", "/api/services/1/toggle-availability"),
+        ("get", "/download/export.csv"),
+    ],
+)
+def test_admin_operations_need_an_admin(client, make_user, auth_headers, method, url):
+    customer = make_user("customer", "customer")
+
+    response = getattr(client, method)(
+        url.format(id=customer.id), headers=auth_headers(customer)
+    )
+    assert response.status_code == 403
+
+
+def test_export_download_accepts_a_query_string_token(
+    app, client, make_user, auth_headers
+):
+    admin = make_user("admin", "admin")
+    token = auth_headers(admin)["Authorization"].split()[1]
+
+    response = client.get("/download/missing.csv")
+    assert response.status_code == 401
+    response = client.get(f"/download/missing.csv?jwt={token}")
+    assert response.status_code == 404
+
+
+def test_customer_can_request_a_service(client, make_user, auth_headers, service):
+    customer = make_user("customer", "customer")
+
+    response = client.post(
+        "/api/request-service",
+        json={"service_id": service.id},
+        headers=auth_headers(customer),
+    )
+    assert response.status_code == 201
+
+
+def test_flagged_customer_cannot_request_a_service(
+    database, client, make_user, auth_headers, service
+):
+    customer = make_user("customer", "customer")
+    headers = auth_headers(customer)
+    customer.flagged = True
+    database.session.commit()
+
+    response = client.post(
+        "/api/request-service", json={"service_id": service.id}, headers=headers
+    )
+    assert response.status_code == 403
+
+
+def test_deleted_customer_cannot_request_a_service(
+    database, client, make_user, auth_headers, service
+):
+    customer = make_user("customer", "customer")
+    headers = auth_headers(customer)
+    database.session.delete(customer)
+    database.session.commit()
+
+    response = client.post(
+        "/api/request-service", json={"service_id": service.id}, headers=headers
+    )
+    assert response.status_code == 403
@@ -0,0 +1,36 @@
+from backend.bulk_import import import_records
+from backend.models import Service, User
+
+
+def test_blank_availability_means_available(database, tmp_path):
+    path = tmp_path / "services.csv"
+    path.write_text(
+        "name,description,price,available\n"
+        "Plumbing,Pipes,100,\n"
+        "Cleaning,Floors,50,no\n"
+        "Painting,Walls,80,yes\n"
+    )
+
+    assert import_records("services", str(path))["inserted"] == 3
+    available = dict(database.session.query(Service.name, Service.available))
+    assert available == {"Plumbing": True, "Cleaning": False, "Painting": True}
+
+
+def test_registered_emails_match_whatever_their_case(database, make_user, tmp_path):
+    make_user("professional", "existing", email="Pro@Example.com")
+    database.session.add(Service(name="Plumbing", description="Pipes", price=100.0))
+    database.session.commit()
+    path = tmp_path / "professionals.csv"
+    path.write_text(
+        "username,email,password,service\n"
+        "duplicate,pro@example.com,secret,Plumbing\n"
+        "newcomer,new@example.com,secret,Plumbing\n"
+    )
+
+    result = import_records("professionals", str(path))
+
+    assert result["inserted"] == 1
+    assert result["errors"] == [
+        {"line": 2, "error": "email or username already registered"}
+    ]
+    assert User.query.filter_by(username="duplicate").first() is None
@@ -0,0 +1,78 @@
+import pytest
+from flask import g
+from backend import catalog_cache
+from backend.catalog_cache import CatalogCache
+from backend.extensions import cache
+
+
+@pytest.fixture
+def builds():
+    """Calls of the catalog's build function"""
+    return []
+
+
+@pytest.fixture
+def catalog(database, builds):
+    """A catalog whose value is the number of times it was built"""
+
+    def build():
+        builds.append(g.get("use_read_replica", False))
+        return len(builds)
+
+    return CatalogCache("test_catalog", build, timeout=60)
+
+
+def current_key(catalog):
+    return catalog.key(catalog.generation())
+
+
+def test_hot_entries_are_served_from_the_local_tier(catalog, builds):
+    assert catalog.get() == 1
+    cache.delete(current_key(catalog))  # gone from Redis
+
+    assert catalog.get() == 1
+    assert len(builds) == 1
+
+
+def test_other_workers_share_the_redis_tier(catalog, builds):
+    assert catalog.get() == 1
+    other_worker = CatalogCache("test_catalog", catalog.build, timeout=60)
+
+    assert other_worker.get() == 1
+    assert len(builds) == 1
+
+
+def test_invalidation_moves_every_tier_to_a_new_generation(catalog, builds):
+    assert catalog.get() == 1
+
+    catalog.invalidate()
+
+    assert catalog.get() == 2
+    assert catalog.get() == 2
+    assert cache.get(current_key(catalog)) == 2
+
+
+def test_only_the_lock_holder_rebuilds(catalog, builds, monkeypatch):
+    key = current_key(catalog)
+    cache.add(f"{key}:lock", True)  # another worker is rebuilding
+    # which stores its result while this one waits
+    monkeypatch.setattr(catalog_cache.time, "sleep", lambda _: cache.set(key, 7))
+
+    assert catalog.get() == 7
+    assert builds == []
+
+
+def test_waiters_build_themselves_when_the_rebuild_stalls(catalog, builds, monkeypatch):
+    cache.add(f"{current_key(catalog)}:lock", True)
+    monkeypatch.setattr(catalog_cache.time, "sleep", lambda _: None)
+
+    assert catalog.get() == 1
+    assert len(builds) == 1
+
+
+def test_rebuilds_read_from_the_primary(catalog, builds):
+    g.use_read_replica = True  # a GET request, with a replica configured
+
+    assert catalog.get() == 1
+    assert builds == [False]
+    assert g.use_read_replica
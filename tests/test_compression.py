@@ -0,0 +1,71 @@
+import gzip
+import pytest
+from backend.models import Service
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def services(database):
+    """Enough services for /api/services to pass COMPRESS_MIN_SIZE"""
+    database.session.add_all(
+        Service(name=f"Service {i}", description="Synthetic service", price=10.0)
+        for i in range(20)
+    )
+    database.session.commit()
+
+
+def test_small_bodies_are_sent_as_they_are(client):
+    response = client.get("/api/services", headers=GZIP)
+
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == []
+
+
+def test_large_bodies_are_compressed_for_clients_accepting_it(app, client, services):
+    response = client.get("/api/services", headers=GZIP)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    body = gzip.decompress(response.data)
+    assert len(body) >= app.config["COMPRESS_MIN_SIZE"] > len(response.data)
+    assert len(app.json.loads(body)) == 20
+
+
+@pytest.mark.parametrize("accept", [None, "identity", "gzip;q=0", "compress"])
+def test_clients_not_accepting_an_encoding_get_identity(client, services, accept):
+    headers = {"Accept-Encoding": accept} if accept else {}
+    response = client.get("/api/services", headers=headers)
+
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.vary  # a cache must not reuse it
+    assert len(response.get_json()) == 20
+
+
+def test_brotli_is_preferred_when_installed(client, services):
+    pytest.importorskip("brotli")
+
+    response = client.get("/api/services", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+
+
+def test_compressed_bodies_carry_a_weak_etag(client, services):
+    plain = client.get("/api/services")
+    compressed = client.get("/api/services", headers=GZIP)
+
+    etag, weak = compressed.get_etag()
+    assert weak
+    assert (etag, False) == plain.get_etag()
+
+
+def test_the_weak_etag_of_a_compressed_body_revalidates(client, services):
+    etag = client.get("/api/services", headers=GZIP).headers["ETag"]
+    assert etag.startswith("W/")
+
+    response = client.get("/api/services", headers={**GZIP, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert "Content-Encoding" not in response.headers
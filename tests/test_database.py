@@ -0,0 +1,22 @@
+import pytest
+from flask import Flask
+from sqlalchemy import text
+from backend.config import Config
+from backend.database import PooledSQLAlchemy
+
+
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite:///:memory:"])
+def test_in_memory_sqlite_ignores_the_pool_sizes(url):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=url,
+        SQLALCHEMY_ENGINE_OPTIONS=dict(Config.SQLALCHEMY_ENGINE_OPTIONS),
+    )
+    db = PooledSQLAlchemy(app)
+
+    with app.app_context():
+        assert db.session.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_file_databases_keep_the_pool_sizes(app, database):
+    assert database.engine.pool.size() == Config.SQLALCHEMY_ENGINE_OPTIONS["pool_size"]
@@ -0,0 +1,162 @@
+import io
+import os
+from datetime import datetime, timedelta
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+from backend import documents, routes
+from backend.models import Document
+
+PDF = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\n%%EOF\n"
+
+
+@pytest.fixture
+def document_folder(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "DOCUMENT_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def validated(monkeypatch):
+    """Documents queued for validation by the API"""
+    calls = []
+    monkeypatch.setattr(routes.validate_document, "delay", calls.append)
+    return calls
+
+
+def upload(client, body=PDF):
+    return client.post("/auth/documents", data=body, content_type="application/pdf")
+
+
+def test_uploads_are_rate_limited(app, client, document_folder, validated, monkeypatch):
+    monkeypatch.setitem(app.config, "DOCUMENT_UPLOADS_PER_HOUR", 2)
+
+    assert upload(client).status_code == 201
+    assert upload(client, PDF + b"\n").status_code == 201
+    assert upload(client, PDF + b"\n\n").status_code == 429
+    assert len(validated) == 2
+
+
+def test_request_bodies_are_capped(
+    app, client, document_folder, validated, monkeypatch
+):
+    monkeypatch.setitem(app.config, "MAX_CONTENT_LENGTH", len(PDF) - 1)
+
+    assert upload(client).status_code == 413
+    assert validated == []
+
+
+def test_identical_uploads_are_stored_once(client, document_folder, validated):
+    first, second = upload(client), upload(client)
+
+    assert (first.status_code, second.status_code) == (201, 200)
+    assert first.get_json()["document_id"] == second.get_json()["document_id"]
+    assert Document.query.count() == 1
+    assert len(validated) == 1
+
+
+def test_concurrent_identical_uploads_share_the_document(
+    database, document_folder, monkeypatch
+):
+    lookup = database.session.get
+
+    def racing_get(model, key):
+        # another upload of the same content commits right after our lookup
+        monkeypatch.setattr(database.session, "get", lookup)
+        with database.engine.begin() as connection:
+            connection.execute(
+                Document.__table__.insert().values(
+                    sha256=key, size=len(PDF), content_type="application/pdf"
+                )
+            )
+        return None
+
+    monkeypatch.setattr(database.session, "get", racing_get)
+
+    document, created = documents.store_document(io.BytesIO(PDF))
+    database.session.commit()
+
+    assert not created
+    assert Document.query.count() == 1
+    assert os.path.exists(documents.document_path(document.sha256))
+
+
+def test_oversized_uploads_are_refused_before_reading(
+    app, client, document_folder, validated, monkeypatch
+):
+    monkeypatch.setitem(app.config, "DOCUMENT_MAX_SIZE", len(PDF) - 1)
+
+    response = upload(client)
+
+    assert response.status_code == 413
+    assert list(document_folder.iterdir()) == []
+    assert validated == []
+
+
+def test_uploads_are_abandoned_past_the_size_limit(
+    app, database, document_folder, monkeypatch
+):
+    monkeypatch.setitem(app.config, "DOCUMENT_MAX_SIZE", len(PDF))
+    monkeypatch.setattr(documents, "CHUNK_SIZE", 8)
+    stream = io.BytesIO(PDF * 4)
+
+    with pytest.raises(RequestEntityTooLarge):
+        documents.store_document(stream)  # no Content-Length, as when chunked
+
+    assert stream.tell() < len(PDF) * 2  # the rest is never read
+    assert list(document_folder.iterdir()) == []
+    assert Document.query.count() == 0
+
+
+def test_documents_are_served_in_ranges(
+    client, make_user, auth_headers, document_folder, validated
+):
+    document_id = upload(client).get_json()["document_id"]
+    headers = auth_headers(make_user("admin", "admin"))
+
+    response = client.get(f"/api/documents/{document_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.data == PDF
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.headers["X-Document-Status"] == "pending"
+
+    response = client.get(
+        f"/api/documents/{document_id}", headers={**headers, "Range": "bytes=0-4"}
+    )
+    assert response.status_code == 206
+    assert response.data == b"%PDF-"
+    assert response.headers["Content-Range"] == f"bytes 0-4/{len(PDF)}"
+
+
+def add_document(database, content, age):
+    document = Document(
+        sha256=content * 64,
+        size=1,
+        content_type="application/pdf",
+        created_at=datetime.utcnow() - age,
+    )
+    database.session.add(document)
+    database.session.commit()
+    path = documents.document_path(document.sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+    return path
+
+
+def test_unused_documents_are_pruned(database, make_user, document_folder):
+    abandoned = add_document(database, "a", timedelta(days=2))
+    registered = add_document(database, "b", timedelta(days=2))
+    make_user("professional", "pro", document_id="b" * 64)
+    pending = add_document(database, "c", timedelta(minutes=5))
+    partial = document_folder / "upload.part"
+    partial.write_bytes(b"%PDF-")
+    os.utime(partial, (0, 0))
+
+    assert documents.prune_documents() == 1
+
+    assert [d.sha256[0] for d in Document.query.order_by(Document.sha256)] == [
+        "b",
+        "c",
+    ]
+    assert not os.path.exists(abandoned)
+    assert os.path.exists(registered) and os.path.exists(pending)
+    assert not partial.exists()
@@ -0,0 +1,24 @@
+from backend.catalog_cache import services_catalog
+from backend.extensions import cache
+
+
+def test_etags_issued_before_a_cache_flush_never_match(client):
+    before = client.get("/api/services").headers["ETag"]
+    services_catalog.invalidate()
+    current = client.get("/api/services").headers["ETag"]
+    assert current != before
+
+    cache.clear()  # flush, eviction or a fresh Redis
+
+    response = client.get("/api/services", headers={"If-None-Match": current})
+    assert response.status_code == 200
+    assert response.headers["ETag"] not in (before, current)
+    response = client.get("/api/services", headers={"If-None-Match": before})
+    assert response.status_code == 200
+
+
+def test_unchanged_data_keeps_its_etag(client):
+    etag = client.get("/api/services").headers["ETag"]
+
+    response = client.get("/api/services", headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,115 @@
+import json
+from types import SimpleNamespace
+import fakeredis
+import pytest
+from backend import celery_worker, events, resources
+from backend.models import Service, ServiceRequest
+
+
+@pytest.fixture
+def events_redis(app, monkeypatch):
+    """Pub/sub of the app on an in-process Redis, with a short heartbeat"""
+    client = fakeredis.FakeRedis()
+    monkeypatch.setitem(app.extensions, "events_redis", client)
+    monkeypatch.setattr(events, "HEARTBEAT_INTERVAL", 0.1)
+    return client
+
+
+def read_event(stream):
+    """The next event of a text/event-stream, skipping retry; None once idle"""
+    for chunk in stream:
+        if chunk.startswith(b"event:"):
+            name, data = chunk.decode().strip().split("\n")
+            return name.split(": ", 1)[1], json.loads(data.split(": ", 1)[1])
+        if chunk.startswith(b": keep-alive"):
+            return None
+
+
+def test_new_requests_are_pushed_to_professionals(
+    database, client, make_user, auth_headers, events_redis, statements
+):
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    database.session.add(service)
+    database.session.commit()
+    professional = make_user("professional", "pro", service_id=service.id)
+    customer = make_user("customer", "customer", contact_number="555-0100")
+    token = auth_headers(professional)["Authorization"].split()[1]
+
+    request = {"json": {"service_id": service.id}, "headers": auth_headers(customer)}
+
+    feed = client.get(f"/api/service-requests/stream?jwt={token}", buffered=False)
+    assert feed.status_code == 200
+    database.session.remove()  # the request loads its own objects
+    statements.clear()
+    response = client.post("/api/request-service", **request)
+    assert response.status_code == 201
+
+    name, data = read_event(feed.response)
+    feed.close()
+    assert name == "service_request"
+    assert data["customer_name"] == "customer"
+    assert data["customer_contact"] == "555-0100"
+    assert data["service_name"] == "Plumbing"
+    assert data["service_price"] == 100.0
+    assert data["status"] == "Pending"
+    assert data["rating"] is None
+    # the user and the service, then the insert: nothing is reloaded
+    assert [statement.split()[0] for statement in statements] == [
+        "SELECT",
+        "SELECT",
+        "INSERT",
+    ]
+
+
+def test_claimed_requests_leave_the_other_feeds(
+    database, client, make_user, auth_headers, events_redis
+):
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    job = ServiceRequest(customer=make_user("customer", "customer"), service=service)
+    database.session.add(job)
+    database.session.commit()
+    watching = make_user("professional", "watching", service_id=service.id)
+    claiming = make_user("professional", "claiming", service_id=service.id)
+    token = auth_headers(watching)["Authorization"].split()[1]
+
+    feed = client.get(f"/api/service-requests/stream?jwt={token}", buffered=False)
+    response = client.put(
+        f"/api/service-requests/{job.id}/accept", headers=auth_headers(claiming)
+    )
+    assert response.status_code == 200
+
+    claimed = read_event(feed.response)
+    feed.close()
+    assert claimed == ("service_request_claimed", {"id": job.id})
+
+
+def test_export_status_is_pushed_until_the_export_ends(
+    client, make_user, auth_headers, events_redis, monkeypatch
+):
+    monkeypatch.setitem(celery_worker.app.extensions, "events_redis", events_redis)
+    monkeypatch.setattr(
+        resources,
+        "AsyncResult",
+        lambda task_id, backend: SimpleNamespace(state="PENDING", info=None),
+    )
+    token = auth_headers(make_user("admin", "admin"))["Authorization"].split()[1]
+    task = SimpleNamespace(
+        request=SimpleNamespace(id="task-id"), update_state=lambda **meta: None
+    )
+
+    stream = client.get(
+        f"/admin/api/export-csv/task-id/stream?jwt={token}", buffered=False
+    )
+    with celery_worker.app.app_context():
+        celery_worker._report_progress(task, 50, 200)
+    celery_worker.export_service_requests.on_success("export.csv", "task-id", (), {})
+
+    assert [read_event(stream.response) for _ in range(3)] == [
+        ("status", {"status": "Pending"}),
+        (
+            "status",
+            {"status": "In Progress", "current": 50, "total": 200, "percent": 25.0},
+        ),
+        ("status", {"status": "Completed", "file": "/download/export.csv"}),
+    ]
+    assert list(stream.response) == []  # the stream ends with the export
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+import pytest
+from backend import exports, resources
+from backend.extensions import cache
+from backend.models import Service, ServiceRequest
+
+
+class FakeTask:
+    id = "task-id"
+
+
+@pytest.fixture
+def export_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Keyword arguments of the export tasks queued by the API"""
+    calls = []
+
+    def delay(**kwargs):
+        calls.append(kwargs)
+        return FakeTask()
+
+    monkeypatch.setattr(resources.export_service_requests, "delay", delay)
+    return calls
+
+
+@pytest.mark.parametrize("role", ["customer", "professional"])
+def test_only_admins_export(client, make_user, auth_headers, queued, role):
+    user = make_user(role, "someone")
+
+    response = client.post(
+        "/admin/api/export-csv?status=Pending", headers=auth_headers(user)
+    )
+    assert response.status_code == 403
+    response = client.get("/admin/api/export-csv/task-id", headers=auth_headers(user))
+    assert response.status_code == 403
+    assert queued == []
+
+
+def test_admin_export_is_queued_with_filters(
+    client, make_user, auth_headers, queued, export_folder
+):
+    admin = make_user("admin", "admin")
+
+    response = client.post(
+        "/admin/api/export-csv?format=jsonl&status=Pending&service_id=1",
+        headers=auth_headers(admin),
+    )
+    assert response.status_code == 202
+    assert queued == [
+        {
+            "compress": False,
+            "incremental": False,
+            "export_format": "jsonl",
+            "filters": {"status": "Pending", "service_id": 1},
+        }
+    ]
+
+
+@pytest.fixture
+def service(database):
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    database.session.add(service)
+    database.session.commit()
+    return service
+
+
+def add_request(database, customer, service, updated_at, status="Completed"):
+    request = ServiceRequest(
+        customer_id=customer.id,
+        service_id=service.id,
+        status=status,
+        updated_at=updated_at,
+    )
+    database.session.add(request)
+    database.session.commit()
+    return request
+
+
+def test_full_exports_include_rows_committed_just_now(
+    database, make_user, service, export_folder
+):
+    customer = make_user("customer", "customer")
+    add_request(database, customer, service, datetime.utcnow())
+
+    assert exports.write_export(exports.plan_export()) == 1
+
+
+def test_rows_still_settling_are_exported_again_incrementally(
+    app, database, make_user, service, export_folder, monkeypatch
+):
+    customer = make_user("customer", "customer")
+    now = datetime.utcnow()
+    add_request(database, customer, service, now - timedelta(minutes=5))
+    add_request(database, customer, service, now)
+
+    assert exports.write_export(exports.plan_export()) == 2
+
+    # stamped before the export ran, committed after it
+    add_request(database, customer, service, now - timedelta(seconds=30))
+    monkeypatch.setitem(app.config, "EXPORT_LAG", 0)
+    plan = exports.plan_export(incremental=True)
+    assert plan.since == now - timedelta(minutes=5)
+    # the straggler, and again the row that had not settled
+    assert exports.write_export(plan) == 2
+
+
+def test_watermark_survives_a_cache_flush(
+    app, database, make_user, service, export_folder, monkeypatch
+):
+    monkeypatch.setitem(app.config, "EXPORT_LAG", 0)
+    customer = make_user("customer", "customer")
+    add_request(database, customer, service, datetime.utcnow())
+    first = exports.plan_export()
+
+    customer.username = "renamed"
+    database.session.commit()
+    renamed = exports.plan_export()
+    cache.clear()
+
+    assert renamed.filename != first.filename
+    assert exports.plan_export().filename == renamed.filename
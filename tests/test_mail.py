@@ -0,0 +1,98 @@
+from smtplib import SMTPServerDisconnected
+import pytest
+from backend import celery_worker
+from backend.models import Service, ServiceRequest
+
+
+class FakeServer:
+    """Stands in for the SMTP server, recording connections and messages"""
+
+    def __init__(self):
+        self.connections = 0
+        self.outbox = []
+        self.drops = 0  # sends to fail as if the server closed the connection
+
+    def connect(self):
+        self.connections += 1
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    """The parts of flask_mail's Connection the tasks use"""
+
+    def __init__(self, server):
+        self.server = server
+        self.host = "open"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.host = None
+
+    def configure_host(self):
+        self.server.connections += 1
+        return "open"
+
+    def send(self, msg):
+        if self.server.drops:
+            self.server.drops -= 1
+            raise SMTPServerDisconnected("Connection unexpectedly closed")
+        self.server.outbox.append(msg)
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(celery_worker.mail, "connect", server.connect)
+    return server
+
+
+@pytest.fixture
+def customers(database, make_user):
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    database.session.add(service)
+    alice = make_user("customer", "alice")
+    bob = make_user("customer", "bob")
+    for status in ("Pending", "Accepted", "Completed"):
+        database.session.add(
+            ServiceRequest(customer_id=alice.id, service=service, status=status)
+        )
+    database.session.commit()
+    return alice, bob
+
+
+def test_monthly_reports_share_one_connection_per_chunk(smtp, customers):
+    alice, bob = customers
+
+    result = celery_worker.send_monthly_report_chunk([alice.id, bob.id])
+
+    assert result == "Monthly reports sent to 2 of 2 customers"
+    assert smtp.connections == 1
+    reports = {msg.recipients[0]: msg.html for msg in smtp.outbox}
+    assert "<strong>Total Services Requested:</strong> 3" in reports[alice.email]
+    assert "<strong>Total Services Accepted:</strong> 2" in reports[alice.email]
+    assert "<strong>Total Services Completed:</strong> 1" in reports[alice.email]
+    assert "<strong>Total Services Requested:</strong> 0" in reports[bob.email]
+    assert "No services requested" in reports[bob.email]
+
+
+def test_dropped_connection_is_reopened_once(smtp, customers):
+    alice, bob = customers
+    smtp.drops = 1
+
+    result = celery_worker.send_monthly_report_chunk([alice.id, bob.id])
+
+    assert result == "Monthly reports sent to 2 of 2 customers"
+    assert smtp.connections == 2
+
+
+def test_connection_dropped_again_fails_that_message_only(smtp, customers):
+    alice, bob = customers
+    smtp.drops = 2
+
+    result = celery_worker.send_monthly_report_chunk([alice.id, bob.id])
+
+    assert result == "Monthly reports sent to 1 of 2 customers"
+    assert len(smtp.outbox) == 1
+    assert smtp.connections == 2  # a single retry
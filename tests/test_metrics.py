@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+REMOTE = {"REMOTE_ADDR": "10.0.0.5"}
+
+
+def test_failed_statements_leave_no_start_time(database):
+    connection = database.session.connection()
+    with pytest.raises(OperationalError):
+        database.session.execute(text("SELECT * FROM no_such_table"))
+
+    assert connection.info["query_started"] == []
+
+
+def test_metrics_are_local_only_without_a_token(client):
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics", environ_base=REMOTE).status_code == 403
+
+
+def test_metrics_token_is_required_once_set(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "scrape-secret")
+
+    assert client.get("/metrics").status_code == 401
+    response = client.get(
+        "/metrics",
+        headers={"Authorization": "Bearer wrong"},
+        environ_base=REMOTE,
+    )
+    assert response.status_code == 401
+    response = client.get(
+        "/metrics",
+        headers={"Authorization": "Bearer scrape-secret"},
+        environ_base=REMOTE,
+    )
+    assert response.status_code == 200
+    assert b"http_request_duration_seconds" in response.data
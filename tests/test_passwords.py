@@ -0,0 +1,62 @@
+from threading import Event, Thread
+import pytest
+from flask_security.utils import get_hmac
+from passlib.hash import bcrypt
+from backend.passwords import HashingBusy, PasswordHasher
+
+PASSWORD = "correct horse"
+
+
+@pytest.fixture
+def cheap_hash(app, database):
+    """A valid hash of PASSWORD made at a lower work factor than configured"""
+    return bcrypt.using(rounds=4).hash(get_hmac(PASSWORD))
+
+
+def login(client, password):
+    return client.post(
+        "/auth/login", json={"email": "customer@example.com", "password": password}
+    )
+
+
+def test_logins_upgrade_hashes_to_the_configured_work_factor(
+    app, database, client, make_user, cheap_hash
+):
+    user = make_user("customer", "customer", password=cheap_hash)
+
+    assert login(client, "wrong").status_code == 401
+    database.session.refresh(user)
+    assert user.password == cheap_hash  # only a verified password is rehashed
+
+    assert login(client, PASSWORD).status_code == 200
+    database.session.refresh(user)
+    assert user.password.startswith(f"$2b${app.config['BCRYPT_ROUNDS']:02d}$")
+    assert login(client, PASSWORD).status_code == 200
+
+
+def test_hashing_past_the_queue_is_turned_away(app):
+    hasher = PasswordHasher(workers=1, queue=0)
+    started, release = Event(), Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    def busy_worker():
+        with app.app_context():
+            hasher.run(hold)
+
+    worker = Thread(target=busy_worker)
+    worker.start()
+    started.wait(5)
+    try:
+        with app.app_context(), pytest.raises(HashingBusy) as busy:
+            hasher.run(lambda: None)
+        assert busy.value.code == 503
+        assert ("Retry-After", "1") in busy.value.get_headers()
+    finally:
+        release.set()
+        worker.join()
+
+    with app.app_context():
+        assert hasher.run(lambda: "hashed") == "hashed"  # the slot is free again
@@ -0,0 +1,15 @@
+from backend.models import ServiceRequest
+from backend.query_plans import check_query_plans
+
+
+def test_hot_queries_use_indexes(database):
+    failures = {
+        name: plan for name, (plan, scans) in check_query_plans().items() if scans
+    }
+    assert failures == {}
+
+
+def test_full_scans_are_reported(database):
+    unindexed = {"by rating": ServiceRequest.query.filter(ServiceRequest.rating == 5)}
+    plan, scans = check_query_plans(unindexed)["by rating"]
+    assert scans == ["SCAN service_request"]
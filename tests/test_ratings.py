@@ -0,0 +1,64 @@
+import pytest
+from backend import ratings
+from backend.models import ProfessionalRating, Service, ServiceRating, ServiceRequest
+
+
+@pytest.fixture
+def jobs(database, make_user):
+    """Two completed jobs of one professional for one customer"""
+    customer = make_user("customer", "customer")
+    professional = make_user("professional", "pro")
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    jobs = [
+        ServiceRequest(
+            customer=customer,
+            service=service,
+            professional=professional,
+            status="Completed",
+        )
+        for _ in range(2)
+    ]
+    database.session.add_all(jobs)
+    database.session.commit()
+    return jobs
+
+
+def totals(model):
+    return [
+        (row.rating_count, row.rating_sum, row.average, row.rating_3, row.rating_5)
+        for row in model.query
+    ]
+
+
+def rate(client, headers, job, rating):
+    response = client.post(
+        f"/api/request-service/{job.id}/rate", json={"rating": rating}, headers=headers
+    )
+    assert response.status_code == 200
+
+
+def test_deleted_requests_leave_the_totals(client, auth_headers, jobs):
+    headers = auth_headers(jobs[0].customer)
+    rate(client, headers, jobs[0], 5)
+    rate(client, headers, jobs[1], 3)
+    assert totals(ProfessionalRating) == [(2, 8, 4.0, 1, 1)]
+
+    response = client.delete(f"/api/request-service/{jobs[0].id}", headers=headers)
+    assert response.status_code == 200
+    assert totals(ProfessionalRating) == [(1, 3, 3.0, 1, 0)]
+    assert totals(ServiceRating) == [(1, 3, 3.0, 1, 0)]
+
+    response = client.delete(f"/api/request-service/{jobs[1].id}", headers=headers)
+    assert response.status_code == 200
+    assert totals(ProfessionalRating) == totals(ServiceRating) == []
+
+
+def test_dialects_without_upsert_update_or_insert(database, jobs, monkeypatch):
+    monkeypatch.setattr(ratings, "UPSERTS", {})
+
+    ratings.record_rating(jobs[0], 5)
+    ratings.record_rating(jobs[1], 3)
+    database.session.commit()
+
+    assert totals(ProfessionalRating) == [(2, 8, 4.0, 1, 1)]
+    assert totals(ServiceRating) == [(2, 8, 4.0, 1, 1)]
@@ -0,0 +1,136 @@
+from datetime import datetime
+import pytest
+from backend.models import Service, ServiceRequest
+
+
+@pytest.fixture
+def service(database):
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    database.session.add(service)
+    database.session.commit()
+    return service
+
+
+def test_professional_feed_loads_customers_and_services_with_the_jobs(
+    database, client, make_user, auth_headers, service, statements
+):
+    professional = make_user("professional", "pro", service_id=service.id)
+    for i in range(3):
+        customer = make_user("customer", f"customer{i}")
+        database.session.add(ServiceRequest(customer=customer, service=service))
+    database.session.commit()
+    headers = auth_headers(professional)
+    client.get("/api/service-requests", headers=headers)  # loads the revocations
+    database.session.remove()  # the request loads its own objects
+    statements.clear()
+
+    response = client.get("/api/service-requests", headers=headers)
+
+    assert response.status_code == 200
+    assert sorted(job["customer_name"] for job in response.get_json()) == [
+        "customer0",
+        "customer1",
+        "customer2",
+    ]
+    # the professional, then the jobs with their customers and service
+    assert len(statements) == 2
+
+
+def test_a_request_is_claimed_once(database, client, make_user, auth_headers, service):
+    first = make_user("professional", "first", service_id=service.id)
+    second = make_user("professional", "second", service_id=service.id)
+    job = ServiceRequest(customer=make_user("customer", "customer"), service=service)
+    database.session.add(job)
+    database.session.commit()
+    url = f"/api/service-requests/{job.id}/accept"
+
+    assert client.put(url, headers=auth_headers(first)).status_code == 200
+    response = client.put(url, headers=auth_headers(second))
+
+    assert response.status_code == 409
+    database.session.expire_all()
+    assert job.status == "Accepted"
+    assert job.professional_id == first.id
+
+
+def test_claiming_a_missing_request_is_not_found(
+    client, make_user, auth_headers, service
+):
+    professional = make_user("professional", "pro", service_id=service.id)
+    response = client.put(
+        "/api/service-requests/404/accept", headers=auth_headers(professional)
+    )
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def history(database, make_user, service):
+    """A customer's five requests, oldest first, each with its own professional"""
+    customer = make_user("customer", "customer")
+    requests = [
+        ServiceRequest(
+            customer=customer,
+            service=service,
+            professional=make_user("professional", f"pro{day}"),
+            status="Completed" if day % 2 else "Accepted",
+            created_at=datetime(2026, 3, day),
+        )
+        for day in range(1, 6)
+    ]
+    requests.append(
+        ServiceRequest(customer=make_user("customer", "other"), service=service)
+    )
+    database.session.add_all(requests)
+    database.session.commit()
+    return customer, [request.id for request in requests[:5]]
+
+
+def test_customer_history_is_paged_newest_first(client, auth_headers, history):
+    customer, ids = history
+    headers = auth_headers(customer)
+
+    pages, cursor = [], None
+    while True:
+        url = "/api/request-service?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url, headers=headers).get_json()
+        pages.append([item["id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == [ids[:2:-1], ids[2:0:-1], ids[:1]]
+
+
+def test_customer_history_is_filtered_and_projected(client, auth_headers, history):
+    customer, ids = history
+    headers = auth_headers(customer)
+
+    response = client.get(
+        "/api/request-service?status=Completed&created_from=2026-03-02"
+        "&created_to=2026-03-05&fields=id,status",
+        headers=headers,
+    )
+
+    assert response.get_json()["items"] == [
+        {"id": ids[4], "status": "Completed"},
+        {"id": ids[2], "status": "Completed"},
+    ]
+    response = client.get("/api/request-service?fields=id,secret", headers=headers)
+    assert response.status_code == 400
+
+
+def test_customer_history_pages_take_the_same_queries_at_any_size(
+    database, client, auth_headers, history, statements
+):
+    headers = auth_headers(history[0])
+    client.get("/api/request-service", headers=headers)  # loads the revocations
+
+    counts = []
+    for limit in (1, 5):
+        database.session.remove()
+        statements.clear()
+        response = client.get(f"/api/request-service?limit={limit}", headers=headers)
+        assert len(response.get_json()["items"]) == limit
+        counts.append(len(statements))
+
+    assert counts == [1, 1]  # the page, its services and professionals joined in
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+from flask_jwt_extended import decode_token
+from backend import token_blocklist
+from backend.extensions import cache
+from backend.models import RevokedToken
+
+
+def test_logged_out_tokens_stay_revoked_after_a_cache_flush(
+    client, make_user, auth_headers
+):
+    admin = make_user("admin", "admin")
+    headers = auth_headers(admin)
+    assert client.get("/api/users", headers=headers).status_code == 200
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/users", headers=headers).status_code == 401
+
+    cache.clear()  # flush, or a fresh Redis
+    token_blocklist._local_revoked.clear()  # another worker
+
+    assert client.get("/api/users", headers=headers).status_code == 401
+    assert client.get("/api/users", headers=auth_headers(admin)).status_code == 200
+
+
+def test_revocations_expire_with_the_token(client, make_user, auth_headers):
+    headers = auth_headers(make_user("admin", "admin"))
+    exp = decode_token(headers["Authorization"].split()[1])["exp"]
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+
+    expires_at = RevokedToken.query.one().expires_at
+    assert expires_at == datetime(1970, 1, 1) + timedelta(seconds=exp)  # naive UTC
@@ -0,0 +1,38 @@
+from backend.models import Service, ServiceRequest
+
+
+def test_user_list_shows_professionals_average_rating(
+    database, client, make_user, auth_headers
+):
+    admin = make_user("admin", "admin")
+    customer = make_user("customer", "customer")
+    professional = make_user("professional", "pro")
+    service = Service(name="Plumbing", description="Pipes", price=100.0)
+    database.session.add(service)
+    jobs = [
+        ServiceRequest(
+            customer=customer,
+            service=service,
+            professional=professional,
+            status="Completed",
+        )
+        for _ in range(3)
+    ]
+    database.session.add_all(jobs)
+    database.session.commit()
+    job_ids = [job.id for job in jobs]
+    headers = auth_headers(customer)
+
+    def average_ratings():
+        users = client.get("/api/users", headers=auth_headers(admin)).get_json()
+        return {user["username"]: user["average_rating"] for user in users}
+
+    assert average_ratings() == {"admin": None, "customer": None, "pro": None}
+    for job_id, rating in zip(job_ids, (5, 4, 4)):
+        response = client.post(
+            f"/api/request-service/{job_id}/rate",
+            json={"rating": rating},
+            headers=headers,
+        )
+        assert response.status_code == 200
+    assert average_ratings()["pro"] == 4.33